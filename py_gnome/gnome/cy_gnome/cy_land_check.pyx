@@ -6,6 +6,7 @@ have crossed land on the raster map
 """
 
 import cython
+from cython.parallel cimport prange
 
 import numpy as np
 from gnome.utilities.geometry.cy_point_in_polygon import points_in_poly
@@ -41,7 +42,7 @@ cdef int32_t c_overlap_grid(int32_t m,
                             int32_t y1,
                             int32_t x2,
                             int32_t y2,
-                            ):
+                            ) noexcept nogil:
     """
     check if the line segment from pt1 to pt could overlap the grid of
     size (m,n).
@@ -73,7 +74,7 @@ cdef bool c_find_first_pixel(uint8_t* grid,
                              int32_t *prev_y,
                              int32_t *hit_x,
                              int32_t *hit_y,
-                             ):
+                             ) noexcept nogil:
     """
     Marches along the grid to see if the LE movement crosses land
 
@@ -285,15 +286,77 @@ def check_land(cnp.ndarray[uint8_t, ndim=2, mode='c'] grid not None,
         return None
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void c_check_land_layers_le(uint8_t** dataptrs,
+                                 int32_t* widths,
+                                 int32_t* heights,
+                                 int32_t* ratios,
+                                 int32_t num_ratios,
+                                 int32_t* positions,
+                                 int32_t* end_positions,
+                                 int16_t* status_codes,
+                                 int32_t* last_water_positions,
+                                 Py_ssize_t i,
+                                 ) noexcept nogil:
+    """
+    check one LE against the layers -- see check_land_layers()
+
+    The position arrays are (N, 2) C arrays. Only row i of the arrays is
+    touched, so LEs can be checked in parallel.
+    """
+    cdef int32_t prev_x, prev_y, hit_x, hit_y, layer
+    cdef bool did_hit
+
+    #if the LE is on land, or if it starts and ends in the same water-only square on the coarsest grid, skip this LE
+    if status_codes[i] == type_defs.OILSTAT_ONLAND:
+        return
+
+    layer = 0
+    #begin the walk. If a hit is registered on the current grid, drop down one level and continue the walk.
+    #If a hit is registered on the lowest level, then LE has landed.
+    while True:
+        did_hit = c_find_first_pixel(dataptrs[layer],
+                                     widths[layer],
+                                     heights[layer],
+                                     div(positions[2 * i], ratios[layer]).quot,
+                                     div(positions[2 * i + 1], ratios[layer]).quot,
+                                     div(end_positions[2 * i], ratios[layer]).quot,
+                                     div(end_positions[2 * i + 1], ratios[layer]).quot,
+                                     &prev_x,
+                                     &prev_y,
+                                     &hit_x,
+                                     &hit_y,
+                                     )
+        if did_hit:
+            if layer == num_ratios - 1:
+                # hit on the lowest layer (confirmed land hit)
+                last_water_positions[2 * i] = prev_x
+                last_water_positions[2 * i + 1] = prev_y
+                end_positions[2 * i] = hit_x
+                end_positions[2 * i + 1] = hit_y
+                status_codes[i] = type_defs.OILSTAT_ONLAND
+                return
+            else:
+                # possible hit, go down a layer and try again
+                layer += 1
+        else:
+            # didn't hit land -- can move the LE
+            positions[2 * i] = end_positions[2 * i]
+            positions[2 * i + 1] = end_positions[2 * i + 1]
+            return
+
+
 ## called by a method in gnome.map.RasterMap class
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def check_land_layers(grid_layers,
-                cnp.ndarray[int32_t, ndim=1, mode='c'] grid_ratios,
-                cnp.ndarray[int32_t, ndim=2, mode='c'] positions,
-                cnp.ndarray[int32_t, ndim=2, mode='c'] end_positions,
-                cnp.ndarray[int16_t, ndim=1, mode='c'] status_codes,
-                cnp.ndarray[int32_t, ndim=2, mode='c'] last_water_positions):
+                      cnp.ndarray[int32_t, ndim=1, mode='c'] grid_ratios,
+                      int32_t[:, ::1] positions,
+                      int32_t[:, ::1] end_positions,
+                      int16_t[::1] status_codes,
+                      int32_t[:, ::1] last_water_positions,
+                      int num_threads=1):
         """
         Do the actual land-checking
 
@@ -303,18 +366,33 @@ def check_land_layers(grid_layers,
 
         This version will look through multiple layers of raster map
 
+        grid_layers is a sequence of uint8 rasters, coarsest first, and
+        grid_ratios the number of base raster cells per cell of each of them,
+        so the last layer is the raster itself (ratio 1). Each LE path is
+        walked on the coarsest layer, and only walked again on the next finer
+        layer when it crosses a (possible) land cell, all the way down to the
+        raster itself.
+
+        The LEs are independent, so they are checked without the GIL, split
+        across num_threads threads with OpenMP. num_threads=1 checks them
+        in the calling thread, num_threads=0 uses the OpenMP default (usually
+        one per core). If the module was built without OpenMP, they are
+        always checked in the calling thread.
         """
-        cdef int32_t  prev_x, prev_y, hit_x, hit_y, cur_ratio, layer, coarse_pos_x, num_ratios
-        cdef uint32_t i, num_le
-        cdef int32_t m, n
-        cdef bool did_hit
-        cdef int32_t* coarse_pos = <int32_t*> PyMem_Malloc (2*sizeof(int32_t))
-        cdef int32_t* coarse_end = <int32_t*> PyMem_Malloc (2*sizeof(int32_t))
+        cdef int32_t num_ratios
+        cdef Py_ssize_t i, num_le
+
+        if len(grid_layers) != grid_ratios.shape[0] or len(grid_layers) == 0:
+            raise ValueError('there must be one ratio for each grid layer')
+
+        if num_threads < 0:
+            raise ValueError('num_threads must be >= 0')
 
         num_ratios = grid_ratios.shape[0]
         cdef uint8_t** dataptrs = <uint8_t**> PyMem_Malloc(num_ratios*sizeof(uint8_t *))
         cdef int32_t* widths = <int32_t*> PyMem_Malloc(num_ratios*sizeof(int32_t))
         cdef int32_t* heights = <int32_t*> PyMem_Malloc(num_ratios*sizeof(int32_t))
+        cdef int32_t* ratios = <int32_t*> PyMem_Malloc(num_ratios*sizeof(int32_t))
 
         cdef cnp.ndarray[uint8_t, ndim=2, mode="c"] grid_arr
         for i in range(num_ratios):
@@ -322,62 +400,57 @@ def check_land_layers(grid_layers,
             widths[i] = grid_layers[i].shape[0]
             heights[i] = grid_layers[i].shape[1]
             dataptrs[i] = &grid_arr[0,0]
+            ratios[i] = grid_ratios[i]
 
         num_le = positions.shape[0]
+        if (positions.shape[1] != 2 or
+            end_positions.shape[0] != num_le or
+            end_positions.shape[1] != 2 or
+            last_water_positions.shape[0] != num_le or
+            last_water_positions.shape[1] != 2 or
+            status_codes.shape[0] != num_le):
+            raise ValueError('position arrays must all be (N, 2) '
+                             'and status_codes (N,)')
+
+        if num_le == 0:
+            return None
+
+        cdef int32_t* pos_ptr = &positions[0, 0]
+        cdef int32_t* end_ptr = &end_positions[0, 0]
+        cdef int16_t* status_ptr = &status_codes[0]
+        cdef int32_t* lwp_ptr = &last_water_positions[0, 0]
+
+        try:
+            if num_threads == 1:
+                with nogil:
+                    for i in range(num_le):
+                        c_check_land_layers_le(dataptrs, widths, heights,
+                                               ratios, num_ratios,
+                                               pos_ptr, end_ptr, status_ptr,
+                                               lwp_ptr, i)
+            elif num_threads == 0:
+                # the number of steps to a hit varies a lot from LE to LE,
+                # so hand them out dynamically
+                for i in prange(num_le, nogil=True, schedule='dynamic',
+                                chunksize=256):
+                    c_check_land_layers_le(dataptrs, widths, heights,
+                                           ratios, num_ratios,
+                                           pos_ptr, end_ptr, status_ptr,
+                                           lwp_ptr, i)
+            else:
+                for i in prange(num_le, nogil=True, schedule='dynamic',
+                                chunksize=256, num_threads=num_threads):
+                    c_check_land_layers_le(dataptrs, widths, heights,
+                                           ratios, num_ratios,
+                                           pos_ptr, end_ptr, status_ptr,
+                                           lwp_ptr, i)
+        finally:
+            PyMem_Free(dataptrs)
+            PyMem_Free(widths)
+            PyMem_Free(heights)
+            PyMem_Free(ratios)
 
-        for i in range(num_le):
-            #if the LE is on land, or if it starts and ends in the same water-only square on the coarsest grid, skip this LE
-            if status_codes[i] == type_defs.OILSTAT_ONLAND:
-                continue
-
-            layer = 0
-            #begin the walk. If a hit is registered on the current grid, drop down one level and continue the walk.
-            #If a hit is registered on the lowest level, then LE has landed.
-            while True:
-                coarse_pos[0] = div(positions[i,0], grid_ratios[layer]).quot
-                coarse_pos[1] = div(positions[i,1], grid_ratios[layer]).quot
-                coarse_end[0] = div(end_positions[i,0], grid_ratios[layer]).quot
-                coarse_end[1] = div(end_positions[i,1], grid_ratios[layer]).quot
-                cur_ratio = grid_ratios[layer]
-                did_hit = c_find_first_pixel(dataptrs[layer],
-                                         widths[layer],
-                                         heights[layer],
-                                         coarse_pos[0],
-                                         coarse_pos[1],
-                                         coarse_end[0],
-                                         coarse_end[1],
-                                         &prev_x,
-                                         &prev_y,
-                                         &hit_x,
-                                         &hit_y,
-                                         )
-                if did_hit:
-                    if layer == num_ratios - 1:
-                        # hit on the lowest layer (confirmed land hit)
-                        last_water_positions[i, 0] = prev_x
-                        last_water_positions[i, 1] = prev_y
-                        end_positions[i,0] = hit_x
-                        end_positions[i,1] = hit_y
-                        status_codes[i] = type_defs.OILSTAT_ONLAND
-                        break
-                    else:
-                        # possible hit, go down a layer and try again
-                        layer += 1
-                        coarse_pos[0] = div(positions[i,0], grid_ratios[layer]).quot
-                        coarse_pos[1] = div(positions[i,1], grid_ratios[layer]).quot
-                        coarse_end[0] = div(end_positions[i,0], grid_ratios[layer]).quot
-                        coarse_end[1] = div(end_positions[i,1], grid_ratios[layer]).quot
-                else:
-                    # didn't hit land -- can move the LE
-                    positions[i, 0] = end_positions[i, 0]
-                    positions[i, 1] = end_positions[i, 1]
-                    break
-
-        PyMem_Free(coarse_pos)
-        PyMem_Free(coarse_end)
-        PyMem_Free(dataptrs)
-        PyMem_Free(widths)
-        PyMem_Free(heights)
+        return None
 
 
 def move_particles(cnp.ndarray[cnp.float64_t, ndim=2, mode='c'] positions not None,
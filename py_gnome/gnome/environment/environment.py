@@ -160,6 +160,10 @@ def env_from_netCDF(filename=None, dataset=None,
 
         If you wish to limit the types of environment objects that will
         be used, pass a list of the types using "_cls_list" kwarg
+
+        To only load the part of the grid that covers a region, pass a
+        "bounding_box" kwarg: ((min_lon, min_lat), (max_lon, max_lat)), or a
+        map to take it from. See gnome.environment.subset
     '''
     def attempt_from_netCDF(cls, **klskwargs):
         obj = None
@@ -176,6 +180,7 @@ def env_from_netCDF(filename=None, dataset=None,
     from gnome.environment import PyGrid, Environment
 
     new_env = []
+    bounding_box = kwargs.pop('bounding_box', None)
 
     if filename is not None:
         data_file = filename
@@ -248,6 +253,10 @@ def env_from_netCDF(filename=None, dataset=None,
             if obj is not None:
                 new_env.append(obj)
 
+    if bounding_box is not None:
+        from gnome.environment.subset import subset_environments
+        subset_environments(new_env, bounding_box)
+
     return new_env
 
 
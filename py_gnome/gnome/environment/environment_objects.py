@@ -35,6 +35,7 @@ from .gridded_objects_base import (Time,
 from .gridcur import init_from_gridcur, GridCurReadError
 
 from .names import nc_names
+from . import sampling_cache
 
 
 class SteadyUniformCurrentSchema(ObjTypeSchema):
@@ -181,16 +182,39 @@ class VelocityTS(TimeseriesVector):
         return map(lambda t, x, y: (t, (x, y)), self._time, x, y)
 
 
+class VelocityGridSchema(VectorVariableSchema):
+    reuse_cell_locations = SchemaNode(
+        Boolean(), missing=drop, save=True, update=True
+    )
+
+
 class VelocityGrid(VectorVariable):
 
+    _schema = VelocityGridSchema
+
     _gnome_unit = 'm/s'
     comp_order = ['u', 'v', 'w']
 
+    # If True (and the grid supports it -- unstructured and structured
+    # grids do), the cell each element was found in is kept by element id,
+    # and checked first (with its neighbors) the next time. The movers pass
+    # the element ids in with track_elements(), and stop with
+    # track_elements(None) once they have their deltas.
+    reuse_cell_locations = False
+    _element_ids = None
+    _hints_key = False
+    _face_hints = None
+
     @combine_signatures
-    def __init__(self, angle=None, **kwargs):
+    def __init__(self, angle=None, reuse_cell_locations=False, **kwargs):
         """
             :param angle: scalar field of cell rotation angles (for rotated/distorted grids)
+
+            :param reuse_cell_locations=False: start looking for each
+                element from the cell it was in last time (see
+                track_elements())
         """
+        self.reuse_cell_locations = reuse_cell_locations
 
         if 'variables' in kwargs:
             variables = kwargs['variables']
@@ -226,11 +250,73 @@ class VelocityGrid(VectorVariable):
 
         super(VelocityGrid, self).__init__(**kwargs)
         
+    @classmethod
+    def new_from_dict(cls, dict_, **kwargs):
+        # not passed on to from_netCDF(), which would hand it to the
+        # component variables
+        reuse_cell_locations = dict_.pop('reuse_cell_locations', False)
+
+        vel = super(VelocityGrid, cls).new_from_dict(dict_, **kwargs)
+        vel.reuse_cell_locations = reuse_cell_locations
+
+        return vel
+
     def _set_timezone_offset(self, offset):
         super(VelocityGrid, self)._set_timezone_offset(offset)
         if self.angle is not None:
             self.angle._set_timezone_offset(offset)
 
+    def track_elements(self, element_ids, uncertain=False):
+        """
+        Set the ids of the elements the next calls to at() are for
+
+        Only used if reuse_cell_locations is on.
+
+        :param element_ids: the 'id' array of the elements, in the same
+                            order as the points passed to at() -- or None to
+                            stop tracking.
+        :param uncertain=False: if the elements are the uncertain ones. The
+                                ids are only unique within a spill
+                                container, so the cells are kept apart for
+                                the certain and uncertain elements.
+        """
+        self._element_ids = (None if element_ids is None
+                             else np.asarray(element_ids, dtype=np.intp))
+        self._hints_key = bool(uncertain)
+
+    def _locate_tracked_elements(self, points):
+        """
+        Locate the tracked elements starting from the cells they were last
+        found in, and put the result in the sampling cache, where the
+        interpolation will find it.
+        """
+        ids = self._element_ids
+
+        if (not self.reuse_cell_locations or ids is None or
+                len(ids) == 0 or len(ids) != len(points) or
+                not hasattr(self.grid, 'locate_faces_near')):
+            return
+
+        if self._face_hints is None:
+            self._face_hints = {}
+
+        # a face is a (row, column) pair on a structured grid
+        face_shape = (2,) if np.ndim(self.grid.node_lon) == 2 else ()
+
+        old = self._face_hints.get(self._hints_key)
+        hints = old
+        if hints is None or len(hints) <= ids.max():
+            hints = np.full((max(2 * (ids.max() + 1), 1024),) + face_shape,
+                            -1, dtype=np.intp)
+            if old is not None:
+                hints[:len(old)] = old
+            self._face_hints[self._hints_key] = hints
+
+        faces = self.grid.locate_faces_near(points, hints[ids])
+        hints[ids] = faces
+
+        sampling_cache.default_cache.seed_faces(self.grid, points, faces)
+
 
     def get_data_vectors(self):
         '''
@@ -470,6 +556,12 @@ class Bathymetry(Variable):
     cf_names = nc_names['bathymetry']['cf_names'] #['depth']
 
 
+class WaterLevel(Variable):
+    _gnome_unit = 'm'
+    default_names = nc_names['water_level']['default_names'] #['zeta', 'ssh', 'elev']
+    cf_names = nc_names['water_level']['cf_names'] #['sea_surface_height_above_geoid', ...]
+
+
 class GridCurrent(VelocityGrid):
     """
     GridCurrent is VelocityGrid that adds specific stuff for currents:
@@ -528,6 +620,7 @@ class GridCurrent(VelocityGrid):
         if extrapolate is None:
             extrapolate = self.extrapolation_is_allowed
 
+        self._locate_tracked_elements(points)
 
         value = super(GridCurrent, self).at(points, time,
                                             units=units,
@@ -642,6 +735,9 @@ class GridWind(VelocityGrid):
         if value is None:
             if extrapolate is None:
                 extrapolate = self.extrapolation_is_allowed
+
+            self._locate_tracked_elements(pts)
+
             value = super(GridWind, self).at(pts, time,
                                              units=units,
                                              extrapolate=extrapolate,
@@ -771,7 +867,7 @@ class IceVelocity(VelocityGrid):
 #                'v': ['northward_sea_ice_velocity']}
 
 
-class IceAwarePropSchema(VectorVariableSchema):
+class IceAwarePropSchema(VelocityGridSchema):
     ice_concentration = VariableSchema(
         missing=drop,
         save=True,
@@ -0,0 +1,120 @@
+"""
+On-disk cache of the search structures built for the grids
+
+Before points can be located on a grid, it builds a search structure: the
+cell tree for a structured grid comes from a list of its cells (with the
+masked ones removed) made in Python, and the face neighbors of an
+unstructured grid are found with a pass over all its edges. For big grids
+(multi-million node FVCOM or ROMS grids) this takes many seconds, and is
+repeated in every process that loads the grid -- each run, and each of the
+ModelBroadcaster's workers.
+
+The arrays they're built from are saved in the data cache (see
+gnome.utilities.data_cache), keyed on the geometry of the grid, and loaded
+from it memory-mapped the next time. The pages of the arrays are shared
+between all the processes using them. The cell tree itself is rebuilt from
+the cached arrays -- that part is fast.
+
+The cache is only used when the data cache is turned on (by setting the
+GNOME_DATA_CACHE_DIR environment variable -- which is passed on to the
+ModelBroadcaster's workers).
+"""
+
+import numpy as np
+
+from gnome.utilities import data_cache
+from gnome.environment.sampling_cache import SamplingCache
+
+# change when the cached arrays change
+CACHE_VERSION = 1
+
+
+def grid_cache_key(grid, what, *options):
+    """
+    The data cache key for a structure built for a grid
+
+    The grid is identified by its geometry, so identical grids (from the
+    same file, or a copy of it) share the entry, and a changed grid never
+    gets a stale one.
+    """
+    return data_cache.make_key('{}.{}'.format(type(grid).__name__, what),
+                               CACHE_VERSION,
+                               SamplingCache.grid_key(grid),
+                               [repr(o) for o in options])
+
+
+def build_celltree(grid, build, *args, **kwargs):
+    """
+    Build the cell tree of a structured grid, using the cached arrays if
+    there are some
+
+    :param grid: the grid
+    :param build: the grid's own build_celltree() -- used if the arrays
+                  are not in the cache. The other arguments are passed on
+                  to it.
+    """
+    cache = data_cache.default_cache
+
+    if not cache.enabled:
+        return build(*args, **kwargs)
+
+    key = grid_cache_key(grid, 'celltree', args, sorted(kwargs.items()))
+    entry = cache.load(key)
+
+    if entry is not None:
+        from cell_tree2d import CellTree
+
+        arrays, _meta = entry
+        nodes, faces = arrays['nodes'], arrays['faces']
+
+        grid._cell_tree = (CellTree(nodes, faces), nodes, faces)
+        grid._cell_tree_mask = arrays.get('mask')
+
+        return
+
+    build(*args, **kwargs)
+
+    _tree, nodes, faces = grid._cell_tree
+    arrays = {'nodes': nodes, 'faces': faces}
+
+    mask = getattr(grid, '_cell_tree_mask', None)
+    if mask is not None:
+        arrays['mask'] = np.asarray(mask)
+
+    cache.save(key, arrays)
+
+
+def build_face_face_connectivity(grid, build):
+    """
+    Find the face neighbors of an unstructured grid, using the cached
+    array if there is one
+
+    :param grid: the grid
+    :param build: the grid's own build_face_face_connectivity() -- used if
+                  the array is not in the cache.
+    """
+    cache = data_cache.default_cache
+
+    if not cache.enabled:
+        return build()
+
+    key = grid_cache_key(grid, 'face_face_connectivity')
+    entry = cache.load(key)
+
+    if entry is not None:
+        arrays, meta = entry
+        connectivity = arrays['face_face_connectivity']
+
+        if meta.get('masked', False):
+            connectivity = np.ma.masked_less(connectivity, 0)
+
+        grid.face_face_connectivity = connectivity
+
+        return
+
+    build()
+
+    connectivity = grid.face_face_connectivity
+    cache.save(key,
+               {'face_face_connectivity': np.ma.filled(connectivity, -1)},
+               {'masked': bool(np.ma.isMaskedArray(connectivity))})
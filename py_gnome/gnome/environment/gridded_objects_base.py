@@ -5,7 +5,7 @@ import copy
 import numpy as np
 # import logging
 import warnings
-from functools import wraps
+from functools import wraps, partial
 
 from colander import (SchemaNode, SequenceSchema,
                       String, Boolean, DateTime,
@@ -19,6 +19,9 @@ from gnome.gnomeobject import combine_signatures
 from gnome.persist import base_schema
 from gnome.gnomeobject import GnomeId
 from gnome.environment.environment import Environment
+from gnome.environment import sampling_cache, grid_cache
+from gnome.environment.prefetch import TimeSlabPrefetcher
+from gnome.environment.subset import subset_environment
 from gnome.persist import (GeneralGnomeObjectSchema, SchemaNode, SequenceSchema,
                            String, Boolean, DateTime, TimeDelta, drop, FilenameSchema)
 from gnome.persist.extend_colander import LocalDateTime, UnknownMappingSchema
@@ -86,6 +89,7 @@ class VariableSchemaBase(base_schema.ObjTypeSchema):
         isdatafile=True, test_equal=False, update=False
     )
     extrapolation_is_allowed = SchemaNode(Boolean())
+    bounding_box = base_schema.LongLatBounds(missing=drop)
     data_start = SchemaNode(LocalDateTime(), read_only=True)
     data_stop = SchemaNode(LocalDateTime(), read_only=True)
 
@@ -139,10 +143,110 @@ class Time(gridded.time.Time, GnomeId):
 # properly super-chain their __init__ currently (as of gridded 0.7.0). This causes certain
 # GnomeId class tricks to break. Once past gridded 0.7.0  we should be able to change 
 # all to (parent, GnomeId)
+def _points_in_cells(points, verts):
+    """
+    For each point, whether it is in (or on the edge of) its cell
+
+    :param points: Nx2 array of the points
+    :param verts: NxMx2 array of the corners of the cell of each point, in
+                  order around it (either way). The cells are assumed
+                  convex.
+    """
+    edges = np.roll(verts, -1, axis=1) - verts
+    rel = points[:, np.newaxis, :] - verts
+    cross = edges[..., 0] * rel[..., 1] - edges[..., 1] * rel[..., 0]
+
+    return np.all(cross >= 0, axis=1) | np.all(cross <= 0, axis=1)
+
+
 class Grid_U(gridded.grids.Grid_U, GnomeId):
 
     _schema = GridSchema
 
+    def locate_faces(self, points, *args, **kwargs):
+        """
+        Find the cells the points are in -- through the sampling cache, so
+        the lookup is shared with identical grids in the same time step
+        """
+        return sampling_cache.default_cache.locate_faces(
+            self, super(Grid_U, self).locate_faces, points, *args, **kwargs)
+
+    def build_face_face_connectivity(self, *args, **kwargs):
+        """
+        Find the neighbors of each face -- from the data cache, if it has
+        them for this grid (see gnome.environment.grid_cache)
+        """
+        grid_cache.build_face_face_connectivity(
+            self, partial(super(Grid_U, self).build_face_face_connectivity,
+                          *args, **kwargs))
+
+    def locate_faces_near(self, points, guesses):
+        """
+        Find the faces the points are in, starting from a guess for each
+
+        Each point is tested against its guessed face, and then that face's
+        neighbors. Only the points that are in none of those (or have no
+        guess) are looked up in the cell tree -- so if the guesses are where
+        the points were last time step, most of them never are.
+
+        :param points: the points to locate
+        :type points: Nx2 or Nx3 numpy array
+
+        :param guesses: a guess of the face index for each point -- -1 for
+                        no guess
+
+        :returns: array of the face index for each point, -1 for points not
+                  on the grid -- the same as locate_faces()
+        """
+        guesses = np.asarray(guesses, dtype=np.intp)
+        points = np.asarray(points, dtype=np.float64).reshape(len(guesses),
+                                                              -1)[:, :2]
+        faces = np.full(len(points), -1, dtype=np.intp)
+
+        if self.face_face_connectivity is None:
+            self.build_face_face_connectivity()
+
+        neighbors = np.ma.filled(self.face_face_connectivity, -1)
+
+        candidates = np.full((len(points), neighbors.shape[1] + 1), -1,
+                             dtype=np.intp)
+        has_guess = guesses >= 0
+        candidates[has_guess, 0] = guesses[has_guess]
+        candidates[has_guess, 1:] = neighbors[guesses[has_guess]]
+
+        for candidate in candidates.T:
+            check = np.flatnonzero((faces < 0) & (candidate >= 0))
+
+            if len(check) > 0:
+                inside = self._points_in_faces(points[check],
+                                               candidate[check])
+                faces[check[inside]] = candidate[check[inside]]
+
+        missed = np.flatnonzero(faces < 0)
+
+        if len(missed) > 0:
+            faces[missed] = np.asarray(self.locate_faces(points[missed])
+                                       ).reshape(-1)
+
+        return faces
+
+    def _points_in_faces(self, points, face_indices):
+        """
+        For each point, whether it is in (or on the edge of) the given face
+
+        The faces are assumed convex, in either winding order.
+        """
+        faces = self.faces[face_indices]
+
+        if np.ma.isMaskedArray(faces):
+            # faces with fewer nodes: repeat the first node, which adds an
+            # edge of zero length
+            faces = np.where(np.ma.getmaskarray(faces),
+                             np.ma.getdata(faces)[:, :1],
+                             np.ma.getdata(faces))
+
+        return _points_in_cells(points, np.asarray(self.nodes)[faces])
+
     def draw_to_plot(self, ax, features=None, style=None):
         import matplotlib
         def_style = {'color': 'blue',
@@ -214,6 +318,115 @@ class Grid_S(gridded.grids.Grid_S, GnomeId):
     def __init__(self, use_masked_boundary=True, *args, **kwargs):
         #set use_masked_boundary to True by default (gridded is False)
         super(Grid_S, self).__init__(*args, use_masked_boundary=use_masked_boundary, *args, **kwargs)
+
+    def locate_faces(self, points, *args, **kwargs):
+        """
+        Find the cells the points are in -- through the sampling cache, so
+        the lookup is shared with identical grids in the same time step
+        """
+        return sampling_cache.default_cache.locate_faces(
+            self, super(Grid_S, self).locate_faces, points, *args, **kwargs)
+
+    def locate_faces_near(self, points, guesses):
+        """
+        Find the cells the points are in, starting from a guess for each
+
+        Each point is tested against its guessed cell, and then the eight
+        cells around it. Only the points that are in none of those (or have
+        no guess) are looked up in the cell tree.
+
+        :param points: the points to locate
+        :type points: Nx2 or Nx3 numpy array
+
+        :param guesses: a guess of the (row, column) of the cell of each
+                        point -- (-1, -1) for no guess
+        :type guesses: Nx2 numpy array
+
+        :returns: Nx2 array of the (row, column) of the cell of each point,
+                  (-1, -1) for points not on the grid -- the same as
+                  locate_faces()
+        """
+        guesses = np.asarray(guesses, dtype=np.intp).reshape(-1, 2)
+        points = np.asarray(points, dtype=np.float64).reshape(len(guesses),
+                                                              -1)[:, :2]
+        faces = np.full((len(points), 2), -1, dtype=np.intp)
+
+        node_lon = np.ma.getdata(self.node_lon[:])
+        node_lat = np.ma.getdata(self.node_lat[:])
+        num_rows, num_cols = node_lon.shape[0] - 1, node_lon.shape[1] - 1
+
+        excluded = self._excluded_cells()
+
+        if excluded is not None:
+            if excluded.size != num_rows * num_cols:
+                # can't tell which cells the cell tree uses
+                return np.asarray(self.locate_faces(points)).reshape(-1, 2)
+
+            excluded = excluded.reshape(num_rows, num_cols)
+
+        has_guess = np.flatnonzero(guesses[:, 0] >= 0)
+
+        # the guess first, then its neighbors
+        offsets = [(0, 0)] + [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                              if (i, j) != (0, 0)]
+
+        for d_row, d_col in offsets:
+            check = has_guess[faces[has_guess, 0] < 0]
+            rows = guesses[check, 0] + d_row
+            cols = guesses[check, 1] + d_col
+
+            on_grid = ((rows >= 0) & (rows < num_rows) &
+                       (cols >= 0) & (cols < num_cols))
+            check, rows, cols = check[on_grid], rows[on_grid], cols[on_grid]
+
+            if excluded is not None:
+                used = ~excluded[rows, cols]
+                check, rows, cols = check[used], rows[used], cols[used]
+
+            if len(check) == 0:
+                continue
+
+            corner_rows = rows[:, None] + [0, 0, 1, 1]
+            corner_cols = cols[:, None] + [0, 1, 1, 0]
+            verts = np.stack((node_lon[corner_rows, corner_cols],
+                              node_lat[corner_rows, corner_cols]), axis=-1)
+
+            inside = _points_in_cells(points[check], verts)
+            faces[check[inside], 0] = rows[inside]
+            faces[check[inside], 1] = cols[inside]
+
+        missed = np.flatnonzero(faces[:, 0] < 0)
+
+        if len(missed) > 0:
+            faces[missed] = np.asarray(self.locate_faces(points[missed])
+                                       ).reshape(-1, 2)
+
+        return faces
+
+    def _excluded_cells(self):
+        """
+        The cells the cell tree leaves out, as a boolean array of the cells
+        -- None if it uses them all
+
+        With use_masked_boundary, the cells that are masked (land) are not
+        in the cell tree, so the points in them are not on the grid.
+        """
+        if not self.use_masked_boundary or self.center_mask is None:
+            return None
+
+        padding = self.get_padding_slices(self.center_padding)
+        mask = gridded.utilities.gen_celltree_mask_from_center_mask(
+            self.center_mask, padding)
+
+        return np.asarray(mask, dtype=bool)
+
+    def build_celltree(self, *args, **kwargs):
+        """
+        Build the cell tree -- from the arrays in the data cache, if it has
+        them for this grid (see gnome.environment.grid_cache)
+        """
+        grid_cache.build_celltree(self, super(Grid_S, self).build_celltree,
+                                  *args, **kwargs)
     
     
     @property
@@ -334,6 +547,14 @@ class Grid_R(gridded.grids.Grid_R, GnomeId):
 
     _schema = GridSchema
 
+    def locate_faces(self, points, *args, **kwargs):
+        """
+        Find the cells the points are in -- through the sampling cache, so
+        the lookup is shared with identical grids in the same time step
+        """
+        return sampling_cache.default_cache.locate_faces(
+            self, super(Grid_R, self).locate_faces, points, *args, **kwargs)
+
     @classmethod
     def new_from_dict(cls, dict_):
         read_only_attrs = cls._schema().get_nodes_by_attr('read_only')
@@ -405,6 +626,12 @@ class PyGrid(gridded.grids.Grid):
 class Variable(gridded.Variable, Environment):
     _schema = VariableSchema
 
+    # set by start_prefetching()
+    _prefetcher = None
+
+    # set by subset_environment()
+    bounding_box = None
+
     default_names = []
     cf_names = []
 
@@ -453,6 +680,7 @@ class Variable(gridded.Variable, Environment):
                          location=None,
                          load_all=False,
                          fill_value=0,
+                         bounding_box=None,
                          **kwargs
                          ):
         '''
@@ -508,6 +736,12 @@ class Variable(gridded.Variable, Environment):
         :type grid_file: string
 
         :param extrapolation_is_allowed:
+
+        :param bounding_box: Only load the part of the grid (and data) that
+                             covers this region. Either
+                             ((min_lon, min_lat), (max_lon, max_lat)), or a
+                             map, whose map_bounds (plus a margin) are used.
+                             See gnome.environment.subset
         '''
         Grid = self._default_component_types['grid']
         Time = self._default_component_types['time']
@@ -598,6 +832,9 @@ class Variable(gridded.Variable, Environment):
                       varname=varname,
                       **kwargs)
 
+        if bounding_box is not None:
+            subset_environment(self, bounding_box)
+
     @classmethod
     @combine_signatures
     def from_netCDF(cls, *args, **kwargs):
@@ -660,10 +897,19 @@ class Variable(gridded.Variable, Environment):
         read_only_attrs = cls._schema().get_nodes_by_attr('read_only')
 
         [dict_.pop(n, None) for n in read_only_attrs]
+
+        # the grid is loaded whole -- cut it down again
+        bounding_box = dict_.pop('bounding_box', None)
+
         if 'data' not in dict_:
-            return cls.from_netCDF(**dict_)
+            var = cls.from_netCDF(**dict_)
+        else:
+            var = super(Variable, cls).new_from_dict(dict_)
 
-        return super(Variable, cls).new_from_dict(dict_)
+        if bounding_box is not None:
+            subset_environment(var, bounding_box)
+
+        return var
 
     @classmethod
     def constant(cls, value, **kwargs):
@@ -698,6 +944,38 @@ class Variable(gridded.Variable, Environment):
     def data_stop(self):
         return self.time.max_time.replace(tzinfo=None)
 
+    def start_prefetching(self, memory_budget=256 * 2 ** 20, lookahead=1,
+                          background=True):
+        """
+        Load the time slices of the data the next model steps will need
+        ahead of time, keeping up to memory_budget bytes of them in memory
+        (least recently used are dropped first).
+
+        With background=True, the slices in netCDF files are read by a
+        separate process while the model computes; otherwise they are read
+        when each step is prepared.
+
+        See gnome.environment.prefetch
+        """
+        self.stop_prefetching()
+        self._prefetcher = TimeSlabPrefetcher([self],
+                                              memory_budget=memory_budget,
+                                              lookahead=lookahead,
+                                              background=background)
+
+    def stop_prefetching(self):
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
+    def prepare_for_model_run(self, model_time):
+        if self._prefetcher is not None:
+            self._prefetcher.reset()
+
+    def prepare_for_model_step(self, model_time):
+        if self._prefetcher is not None:
+            self._prefetcher.prepare_for_model_step(model_time)
+
     def save(self, saveloc='.', refs=None, overwrite=True):
         return GnomeId.save(self, saveloc=saveloc, refs=refs, overwrite=overwrite)
 
@@ -786,6 +1064,12 @@ class VectorVariable(gridded.VectorVariable, Environment):
 
     _schema = VectorVariableSchema
 
+    # set by start_prefetching()
+    _prefetcher = None
+
+    # set by subset_environment()
+    bounding_box = None
+
     _default_component_types = copy.deepcopy(gridded.VectorVariable
                                              ._default_component_types)
     _default_component_types.update({'time': Time,
@@ -844,6 +1128,7 @@ class VectorVariable(gridded.VectorVariable, Environment):
                          dataset=None,
                          load_all=False,
                          variables=None,
+                         bounding_box=None,
                          **kwargs
                          ):
         '''
@@ -878,6 +1163,9 @@ class VectorVariable(gridded.VectorVariable, Environment):
         
         :param units: Units
         :type units: string
+
+        :param bounding_box: Only load the part of the grid (and data) that
+                             covers this region. See Variable.init_from_netCDF
         '''
         Grid = self._default_component_types['grid']
         Time = self._default_component_types['time']
@@ -978,6 +1266,9 @@ class VectorVariable(gridded.VectorVariable, Environment):
                     load_all=load_all,
                     **kwargs)
 
+        if bounding_box is not None:
+            subset_environment(self, bounding_box)
+
     @combine_signatures
     @classmethod
     def from_netCDF(cls, *args, **kwargs):
@@ -1023,10 +1314,20 @@ class VectorVariable(gridded.VectorVariable, Environment):
         read_only_attrs = cls._schema().get_nodes_by_attr('read_only')
 
         [dict_.pop(n, None) for n in read_only_attrs]
+
+        # the grid is loaded whole -- cut it down again
+        bounding_box = dict_.pop('bounding_box', None)
+
         if not dict_.get('variables', False):
-            return super(VectorVariable, cls).new_from_dict(cls.from_netCDF(**dict_).to_dict(), **kwargs)
-        else:
-            return super(VectorVariable, cls).new_from_dict(dict_, **kwargs)
+            dict_ = cls.from_netCDF(**dict_).to_dict()
+            dict_.pop('bounding_box', None)
+
+        vec = super(VectorVariable, cls).new_from_dict(dict_, **kwargs)
+
+        if bounding_box is not None:
+            subset_environment(vec, bounding_box)
+
+        return vec
 
 
     @classmethod
@@ -1186,6 +1487,39 @@ class VectorVariable(gridded.VectorVariable, Environment):
         except TypeError: # cftime datetime objects don't have a tzinfo attribute.
             return self.time.max_time
 
+    def start_prefetching(self, memory_budget=256 * 2 ** 20, lookahead=1,
+                          background=True):
+        """
+        Load the time slices of the data the next model steps will need
+        ahead of time, keeping up to memory_budget bytes of them in memory
+        (least recently used are dropped first).
+
+        With background=True, the slices in netCDF files are read by a
+        separate process while the model computes; otherwise they are read
+        when each step is prepared.
+
+        See gnome.environment.prefetch
+        """
+        self.stop_prefetching()
+        self._prefetcher = TimeSlabPrefetcher(list(self.variables) +
+                                              [getattr(self, 'angle', None)],
+                                              memory_budget=memory_budget,
+                                              lookahead=lookahead,
+                                              background=background)
+
+    def stop_prefetching(self):
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
+    def prepare_for_model_run(self, model_time):
+        if self._prefetcher is not None:
+            self._prefetcher.reset()
+
+    def prepare_for_model_step(self, model_time):
+        if self._prefetcher is not None:
+            self._prefetcher.prepare_for_model_step(model_time)
+
     def save(self, saveloc='.', refs=None, overwrite=True):
         return GnomeId.save(self, saveloc=saveloc, refs=refs, overwrite=overwrite)
 
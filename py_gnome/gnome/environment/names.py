@@ -63,6 +63,14 @@ PyGNOME should be able to load the file.
   CF Standard Names: depth
 
 
+**water_level**
+
+  Default Names: ELEV, SSH, ZETA, elev, ssh, zeta
+
+
+  CF Standard Names: sea_surface_height_above_geoid, sea_surface_height, sea_surface_elevation
+
+
 **grid_current**
 
  Default Names for u: water_u, u_sur, WATER_U, CURR_UCMP, u_surface, u, U_SUR, U_SURFACE, U, curr_ucmp
@@ -125,6 +133,12 @@ nc_names = {
         'default_names': ['h'],
         'cf_names': ['depth']
     },
+    'water_level': {
+        'default_names': ['zeta', 'ssh', 'elev'],
+        'cf_names': ['sea_surface_height_above_geoid',
+                     'sea_surface_height',
+                     'sea_surface_elevation']
+    },
     'grid_current': {
         'default_names': {
             'u': ['u', 'U', 'water_u', 'curr_ucmp', 'u_surface', 'u_sur'],
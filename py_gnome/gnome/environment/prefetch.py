@@ -0,0 +1,452 @@
+"""
+Prefetching of time slabs of gridded environment data
+
+The gridded environment objects read their data from netCDF lazily: each
+time the model steps into a new time interval of the data, it stalls on the
+disk reads of the two time slices it needs (of u, v, and any other
+variables).
+
+A TimeSlabPrefetcher holds whole time slices ("slabs") of the data of a set
+of Variables in memory, and loads the ones the next model step will need
+when the step is prepared -- each slab is read from the file once, in one
+piece. The Variables' data are wrapped with a PrefetchedData, which serves
+reads of a single time slice from the slabs, and passes any other reads on
+to the file.
+
+The slabs are kept up to a memory budget, dropping the least recently used
+first.
+
+By default (background=True), the slabs that are in netCDF files are read
+by a separate process, while the current step computes. That process opens
+the files itself, so its reads don't share any netCDF (or HDF5) state with
+the model -- which isn't thread safe, and is used on the model thread by
+gridded, other objects on the same files, and the NetCDFOutput. The slabs
+are sent back through a pipe.
+
+Data that isn't in a netCDF file is read on the model thread when the step
+is prepared, as all of it is with background=False. If the reading process
+fails, the slabs are read on the model thread as they are needed.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import pickle
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import netCDF4
+
+from gnome.environment.subset import SubsetData
+
+
+class PrefetchedData(object):
+    """
+    Wrapper around the data of a Variable that reads single time slices
+    through a TimeSlabPrefetcher
+
+    Everything else is passed on to the wrapped data.
+    """
+
+    def __init__(self, data, prefetcher):
+        self.wrapped = data
+        self.prefetcher = prefetcher
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+    def __len__(self):
+        return len(self.wrapped)
+
+    @staticmethod
+    def _split_key(key):
+        """
+        split an index into (time index, rest of the index) -- or
+        (None, key) if it isn't for a single time
+        """
+        if isinstance(key, tuple) and len(key) > 0:
+            first, rest = key[0], key[1:]
+        else:
+            first, rest = key, ()
+
+        if isinstance(first, (int, np.integer)):
+            return int(first), rest
+
+        return None, key
+
+    def __getitem__(self, key):
+        time_index, rest = self._split_key(key)
+
+        if time_index is None:
+            return self.wrapped[key]
+
+        slab = self.prefetcher.get_slab(self, time_index)
+
+        return slab[rest] if rest else slab
+
+    def read_slab(self, time_index):
+        return self.wrapped[time_index]
+
+    @property
+    def slab_source(self):
+        """
+        Where the data can be read from by another process:
+        (file path, variable path, subset windows, auto mask, auto scale)
+        -- or None if it isn't a variable of a netCDF file
+        """
+        data, windows = self.wrapped, None
+
+        if isinstance(data, SubsetData):
+            data, windows = data.wrapped, data.windows
+
+        if not isinstance(data, netCDF4.Variable):
+            return None
+
+        group = data.group()
+        try:
+            filepath = group.filepath()
+        except ValueError:
+            # in memory, or the library can't tell
+            return None
+
+        path = data.name
+        while group.parent is not None:
+            path = group.name + '/' + path
+            group = group.parent
+
+        return (filepath, path, windows,
+                getattr(data, 'mask', True), getattr(data, 'scale', True))
+
+
+def _read_source(datasets, source, time_index):
+    """
+    Read the slab at time_index of a PrefetchedData.slab_source, opening its
+    file if it isn't in datasets yet
+    """
+    filepath, path, windows, mask, scale = source
+
+    dataset = datasets.get(filepath)
+    if dataset is None:
+        dataset = datasets[filepath] = netCDF4.Dataset(filepath)
+
+    data = dataset[path]
+    data.set_auto_mask(mask)
+    data.set_auto_scale(scale)
+
+    if windows is not None:
+        data = SubsetData(data, windows)
+
+    return data[time_index]
+
+
+def _serve_slabs(requests, results):
+    """
+    The loop of the slab reading process: reads (source, time index)
+    requests and writes back the slabs (or an error message), until the
+    requests are closed
+    """
+    datasets = {}
+
+    while True:
+        try:
+            source, time_index = pickle.load(requests)
+        except EOFError:
+            break
+
+        try:
+            result = (True, _read_source(datasets, source, time_index))
+        except Exception as excp:
+            result = (False, '{}: {}'.format(type(excp).__name__, excp))
+
+        pickle.dump(result, results, protocol=pickle.HIGHEST_PROTOCOL)
+        results.flush()
+
+    for dataset in datasets.values():
+        dataset.close()
+
+
+# the slabs go back on the original stdout -- anything printed goes to stderr
+_reader_code = """
+import os, sys
+results = os.fdopen(os.dup(1), 'wb')
+os.dup2(2, 1)
+from gnome.environment.prefetch import _serve_slabs
+_serve_slabs(sys.stdin.buffer, results)
+"""
+
+
+class SlabReader(object):
+    """
+    A process that reads slabs of netCDF variables, with its own file
+    handles
+
+    It is started on the first read. Reads are made one at a time. If the
+    process fails, it is stopped, and the reader is broken.
+    """
+
+    def __init__(self):
+        self._process = None
+        self._lock = threading.Lock()
+        self.broken = False
+
+    def _start(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+
+        self._process = subprocess.Popen([sys.executable, '-c', _reader_code],
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE,
+                                         env=env)
+
+    def read(self, source, time_index):
+        """
+        The slab at time_index of a PrefetchedData.slab_source
+        """
+        with self._lock:
+            if self.broken:
+                raise IOError('the slab reading process failed')
+
+            if self._process is None:
+                self._start()
+
+            try:
+                pickle.dump((source, time_index), self._process.stdin,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+                self._process.stdin.flush()
+
+                ok, result = pickle.load(self._process.stdout)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                self.broken = True
+                self._process.kill()
+                self._process.wait()
+                raise
+
+        if not ok:
+            raise IOError('reading a slab of {}: {}'.format(source[0],
+                                                            result))
+
+        return result
+
+    def close(self):
+        """
+        Stop the process
+        """
+        with self._lock:
+            if self._process is None:
+                return
+
+            process, self._process = self._process, None
+
+            try:
+                process.stdin.close()
+                process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+
+            process.stdout.close()
+
+
+class TimeSlabPrefetcher(object):
+    """
+    Holds time slabs of a set of Variables in memory, loading the ones
+    that will be needed next ahead of time
+    """
+
+    def __init__(self, variables, memory_budget=256 * 2 ** 20, lookahead=1,
+                 background=True):
+        """
+        :param variables: the Variables to prefetch. Those that don't vary
+                          with time (or don't have time as the first
+                          dimension) are left alone.
+
+        :param memory_budget=256MB: most bytes of slabs to keep, for all the
+                                    variables together.
+
+        :param lookahead=1: number of model steps ahead to prefetch
+
+        :param background=True: read the slabs of netCDF files in a
+                                separate process, while the model computes.
+                                Otherwise (and for data that isn't in a
+                                file), they are read when the step is
+                                prepared.
+        """
+        self.memory_budget = memory_budget
+        self.lookahead = lookahead
+
+        self.time_step = None
+        self._last_time = None
+
+        self._slabs = OrderedDict()
+        self._nbytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        # the thread only waits on the reading process
+        self._executor = (ThreadPoolExecutor(max_workers=1) if background
+                          else None)
+        self._reader = SlabReader() if background else None
+
+        self.variables = [v for v in variables if self._varies_in_time(v)]
+        for var in self.variables:
+            var.data = PrefetchedData(var.data, self)
+
+    @staticmethod
+    def _varies_in_time(var):
+        if var is None or isinstance(var.data, PrefetchedData):
+            return False
+
+        time = getattr(var, 'time', None)
+        if time is None or len(time.data) < 2:
+            return False
+
+        try:
+            return var.dimension_ordering[0] == 'time'
+        except (AttributeError, IndexError, TypeError):
+            return False
+
+    @property
+    def nbytes(self):
+        """
+        bytes of slabs in memory
+        """
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._slabs)
+
+    def get_slab(self, data, time_index):
+        """
+        The slab of data (a PrefetchedData) at time_index -- from memory,
+        the reading process, or the file, in that order.
+        """
+        key = (id(data), time_index)
+
+        with self._lock:
+            slab = self._slabs.get(key)
+
+            if slab is not None:
+                self._slabs.move_to_end(key)
+                return slab
+
+            future = self._pending.get(key)
+
+        if future is not None:
+            try:
+                return future.result()
+            except (IOError, OSError, EOFError, pickle.UnpicklingError):
+                # read it here instead
+                pass
+
+        return self._load(data, time_index)
+
+    def _load(self, data, time_index):
+        return self._store(data, time_index, data.read_slab(time_index))
+
+    def _load_remote(self, data, source, time_index):
+        """
+        load a slab through the reading process -- on the background thread
+        """
+        try:
+            slab = self._reader.read(source, time_index)
+        except Exception:
+            with self._lock:
+                self._pending.pop((id(data), time_index), None)
+            raise
+
+        return self._store(data, time_index, slab)
+
+    def _store(self, data, time_index, slab):
+        key = (id(data), time_index)
+
+        with self._lock:
+            self._pending.pop(key, None)
+
+            if key not in self._slabs:
+                self._slabs[key] = slab
+                self._nbytes += slab.nbytes
+
+                # drop the least recently used, but always keep this one
+                while (self._nbytes > self.memory_budget and
+                       len(self._slabs) > 1):
+                    _key, old = self._slabs.popitem(last=False)
+                    self._nbytes -= old.nbytes
+
+        return slab
+
+    def prefetch(self, time):
+        """
+        Start loading the slabs the variables need to be interpolated to time
+
+        :param time: the model time
+        :type time: datetime.datetime
+        """
+        for var in self.variables:
+            if self._executor is None or self._reader.broken:
+                source = None
+            else:
+                source = var.data.slab_source
+            index = var.time.index_of(time, extrapolate=True)
+            last = len(var.time.data) - 1
+
+            for time_index in sorted({min(max(index - 1, 0), last),
+                                      min(max(index, 0), last)}):
+                key = (id(var.data), time_index)
+
+                with self._lock:
+                    if key in self._slabs or key in self._pending:
+                        continue
+
+                    if source is not None:
+                        self._pending[key] = self._executor.submit(
+                            self._load_remote, var.data, source, time_index)
+                        continue
+
+                # on this thread
+                self._load(var.data, time_index)
+
+    def reset(self):
+        """
+        Forget the time step -- at the start of a model run
+        """
+        self.time_step = None
+        self._last_time = None
+
+    def prepare_for_model_step(self, model_time):
+        """
+        Prefetch for the next model step(s)
+
+        The time step (and run direction) is taken from the difference
+        between the times this is called with; on the first step, only the
+        current time is prefetched.
+        """
+        if self._last_time is not None and model_time != self._last_time:
+            self.time_step = model_time - self._last_time
+        self._last_time = model_time
+
+        if self.time_step is None:
+            self.prefetch(model_time)
+            return
+
+        # this step also samples at its end time (for the RK methods), so
+        # lookahead steps ahead means up to the end of the step after that
+        for i in range(self.lookahead + 2):
+            self.prefetch(model_time + i * self.time_step)
+
+    def close(self):
+        """
+        Stop the reading process, drop the slabs, and unwrap the data
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._reader.close()
+
+        for var in self.variables:
+            if isinstance(var.data, PrefetchedData):
+                var.data = var.data.wrapped
+
+        with self._lock:
+            self._slabs.clear()
+            self._pending.clear()
+            self._nbytes = 0
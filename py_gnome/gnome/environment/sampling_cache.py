@@ -0,0 +1,217 @@
+"""
+Cache of where points are on the environment grids
+
+Finding the grid cell each element is in is the expensive part of sampling a
+gridded environment object. In one time step the same element positions are
+sampled many times: by the wind and current movers, by each stage of a
+Runge-Kutta mover, and by the weatherers (through the wind and waves) -- and
+several variables are often on the same grid, or on identical grids loaded
+from the same file.
+
+The grids (see gnome.environment.gridded_objects_base) look up their cell
+locations here first. Entries are keyed on the geometry of the grid and the
+contents of the points, so variables on identical grids share them, and a
+changed set of points can never get a stale result.
+
+The Model clears the cache at the start of each time step -- the positions
+all change then -- so it only ever holds one step's worth of lookups.
+
+Cell locations found some other way (see VelocityGrid.reuse_cell_locations)
+can be put in the cache with seed_faces(), so the next lookup of those
+points finds them.
+"""
+
+from collections import OrderedDict
+import hashlib
+import inspect
+
+import numpy as np
+
+
+class SamplingCache(object):
+    """
+    A memo of grid cell locations, keyed on the grid geometry and points
+    """
+    # array attributes of the grid classes that define where the cells are
+    _geometry_attrs = ('node_lon', 'node_lat', 'nodes', 'faces',
+                       'node_mask', 'center_mask')
+
+    def __init__(self, max_entries=64):
+        """
+        :param max_entries=64: most lookups to keep -- the oldest is dropped
+                               when there are more.
+        """
+        self.max_entries = max_entries
+        self.model_time = None
+        self._cells = OrderedDict()
+        self._seeded = OrderedDict()
+
+    def __len__(self):
+        return len(self._cells)
+
+    def clear(self, model_time=None):
+        """
+        Drop all the lookups -- called by the Model at the start of each
+        time step
+
+        :param model_time=None: the time of the new step
+        """
+        self._cells.clear()
+        self._seeded.clear()
+        self.model_time = model_time
+
+    @classmethod
+    def grid_key(cls, grid):
+        """
+        A key for the geometry of a grid: the same for identical grids
+
+        It is computed once, and kept on the grid.
+        """
+        key = getattr(grid, '_sampling_key', None)
+
+        if key is None:
+            sha = hashlib.sha1(type(grid).__name__.encode('utf-8'))
+            sha.update(repr(getattr(grid, 'use_masked_boundary', None))
+                       .encode('utf-8'))
+
+            for name in cls._geometry_attrs:
+                arr = getattr(grid, name, None)
+
+                if arr is not None:
+                    arr = np.ma.getdata(arr[:])
+                    sha.update(name.encode('utf-8'))
+                    sha.update(repr(arr.shape).encode('utf-8'))
+                    sha.update(np.ascontiguousarray(arr).tobytes())
+
+            key = sha.hexdigest()
+            grid._sampling_key = key
+
+        return key
+
+    @staticmethod
+    def points_key(points):
+        """
+        A key for the horizontal positions in an array of points
+
+        Only the first two columns are used, so Nx2 and Nx3 arrays of the
+        same positions get the same key.
+        """
+        points = np.asarray(points)
+        points = np.ascontiguousarray(points.reshape(-1, points.shape[-1])
+                                      [:, :2])
+
+        sha = hashlib.sha1(repr((points.dtype.str, points.shape))
+                           .encode('utf-8'))
+        sha.update(points.tobytes())
+
+        return sha.hexdigest()
+
+    def locate_faces(self, grid, locate, points, *args, **kwargs):
+        """
+        The cells of grid that the points are in
+
+        :param grid: the grid
+        :param locate: the grid's own locate_faces(), called if the points
+                       have not been located on an identical grid yet.
+        :param points: the points to locate
+
+        The other arguments are passed on to locate(), and are part of the
+        key -- except for gridded's own memo options (_memo, _copy and
+        _hash). They are matched to the parameters of locate(), so they can
+        be passed by position or by name.
+
+        The result is shared with the other callers, and can't be changed,
+        unless a copy is asked for with _copy.
+        """
+        arguments = self._arguments(locate, points, args, kwargs)
+
+        if arguments is None:
+            # arguments locate() doesn't take -- let it complain
+            return locate(points, *args, **kwargs)
+
+        copy = arguments.get('_copy', False)
+        options = tuple(sorted((k, v) for k, v in arguments.items()
+                               if k not in ('_memo', '_copy', '_hash')))
+
+        try:
+            location = (self.grid_key(grid), self.points_key(points))
+            key = location + (options,)
+            hash(key)
+        except TypeError:
+            # unhashable options -- don't cache
+            return locate(points, *args, **kwargs)
+
+        cells = self._cells.get(key)
+
+        if cells is not None:
+            self._cells.move_to_end(key)
+        elif (arguments.get('method', 'celltree') == 'celltree' and
+              location in self._seeded):
+            cells = self._seeded[location]
+        else:
+            cells = locate(points, *args, **kwargs)
+
+            if isinstance(cells, np.ndarray):
+                if copy:
+                    cells = cells.copy()
+                cells.setflags(write=False)
+
+            self._cells[key] = cells
+            while len(self._cells) > self.max_entries:
+                self._cells.popitem(last=False)
+
+        if copy and isinstance(cells, np.ndarray):
+            return cells.copy()
+
+        return cells
+
+    @staticmethod
+    def _arguments(locate, points, args, kwargs):
+        """
+        The arguments of a call of locate(), other than the points, by
+        name -- with the defaults of the ones not passed
+
+        None if they don't fit its parameters.
+        """
+        try:
+            signature = inspect.signature(locate)
+            bound = signature.bind(points, *args, **kwargs)
+        except (TypeError, ValueError):
+            return None
+
+        bound.apply_defaults()
+
+        arguments = {}
+        for i, (name, value) in enumerate(bound.arguments.items()):
+            kind = signature.parameters[name].kind
+
+            if i == 0:
+                # the points
+                continue
+            elif kind == inspect.Parameter.VAR_KEYWORD:
+                arguments.update(value)
+            else:
+                arguments[name] = value
+
+        return arguments
+
+    def seed_faces(self, grid, points, faces):
+        """
+        Put the faces of grid that the points are in into the cache
+
+        They are used for the next cell tree lookup of the same points on
+        the same (or an identical) grid.
+
+        :param faces: the face index of each point, -1 for points not on
+                      the grid -- as returned by the grid's locate_faces()
+        """
+        faces = np.array(faces)
+        faces.setflags(write=False)
+
+        self._seeded[(self.grid_key(grid), self.points_key(points))] = faces
+        while len(self._seeded) > self.max_entries:
+            self._seeded.popitem(last=False)
+
+
+# the cache used by the grids
+default_cache = SamplingCache()
@@ -0,0 +1,487 @@
+"""
+Subsetting of gridded environment objects to a region
+
+Ocean and atmospheric model files often cover a much larger domain than a
+spill will ever reach, but the gridded objects load the whole grid: the cell
+tree is built for all of it, and every read of the data is of the whole
+domain.
+
+subset_environment() cuts a Variable or VectorVariable (and the grid, depth
+and component variables it uses) down to the part of the grid that covers a
+bounding box. The grid is rebuilt from just the nodes in that region, so the
+cell tree is only built for it, and the data is wrapped with a SubsetData,
+so only that window of the data is read from the file.
+
+The node coordinates of the whole grid are still read once, to find the
+window.
+
+The subset grid keeps the filename and grid_topology of the grid it came
+from, and the objects their bounding_box: they are saved as the whole grid
+is, and cut down again when they are loaded.
+
+Bounding boxes are ((min_lon, min_lat), (max_lon, max_lat)). One can be
+made from a map with bounding_box_from_map().
+"""
+
+import numpy as np
+
+
+# margin around the map bounds, in degrees
+DEFAULT_MARGIN = 0.5
+
+# array attributes of the structured grids that are on the nodes, centers
+# or edges -- they are cut with the same windows as the data
+_grid_s_arrays = ('node_lon', 'node_lat', 'node_mask',
+                  'center_lon', 'center_lat', 'center_mask',
+                  'edge1_lon', 'edge1_lat', 'edge1_mask',
+                  'edge2_lon', 'edge2_lat', 'edge2_mask',
+                  'angles')
+
+_grid_s_options = ('node_padding', 'center_padding',
+                   'edge1_padding', 'edge2_padding',
+                   'use_masked_boundary')
+
+
+def bounding_box_from_map(gnome_map, margin=DEFAULT_MARGIN):
+    """
+    The bounding box of a map's map_bounds, plus a margin
+
+    :param gnome_map: a map with a map_bounds polygon
+    :param margin=DEFAULT_MARGIN: degrees to add on each side
+    """
+    bounds = np.asarray(gnome_map.map_bounds, dtype=np.float64)
+
+    return ((bounds[:, 0].min() - margin, bounds[:, 1].min() - margin),
+            (bounds[:, 0].max() + margin, bounds[:, 1].max() + margin))
+
+
+def as_bounding_box(bounding_box):
+    """
+    A bounding box as ((min_lon, min_lat), (max_lon, max_lat)) floats
+
+    :param bounding_box: a bounding box, or a map (see
+                         bounding_box_from_map())
+    """
+    if hasattr(bounding_box, 'map_bounds'):
+        bounding_box = bounding_box_from_map(bounding_box)
+
+    bbox = np.asarray(bounding_box, dtype=np.float64)
+
+    if bbox.shape != (2, 2) or np.any(bbox[0] > bbox[1]):
+        raise ValueError('A bounding box must be ((min_lon, min_lat), '
+                         '(max_lon, max_lat)), not {}'.format(bounding_box))
+
+    return ((bbox[0, 0], bbox[0, 1]), (bbox[1, 0], bbox[1, 1]))
+
+
+class SubsetData(object):
+    """
+    A window of an array-like (e.g. a netCDF4 Variable)
+
+    The trailing (spatial) dimensions of the data are cut down to the
+    windows: a range for each of them (structured grids), or an array of
+    indices into the last one (unstructured grids). Reads of the subset are
+    translated into reads of just that part of the wrapped data.
+
+    Everything else is passed on to the wrapped data.
+    """
+
+    def __init__(self, data, windows):
+        """
+        :param data: the data to subset
+        :param windows: a range, or an array of indices, for each of the
+                        trailing dimensions of data
+        """
+        self.wrapped = data
+        self.windows = tuple(w if isinstance(w, range)
+                             else np.asarray(w, dtype=np.int64)
+                             for w in windows)
+
+        if len(self.windows) > len(data.shape):
+            raise ValueError('More windows than dimensions of the data')
+
+    def __getattr__(self, name):
+        # not the array interface of the wrapped data -- that's the whole
+        # thing
+        if name == 'wrapped' or name.startswith('__array'):
+            raise AttributeError(name)
+
+        return getattr(self.wrapped, name)
+
+    @property
+    def shape(self):
+        lead = tuple(self.wrapped.shape)[:self.ndim - len(self.windows)]
+
+        return lead + tuple(len(w) for w in self.windows)
+
+    @property
+    def ndim(self):
+        return len(self.wrapped.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        arr = np.asarray(self[...])
+
+        return arr if dtype is None else arr.astype(dtype)
+
+    def _full_key(self, key):
+        """
+        the key with one entry for each dimension
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        if any(k is Ellipsis for k in key):
+            i = [k is Ellipsis for k in key].index(True)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:i] + fill + key[i + 1:]
+
+        if len(key) > self.ndim:
+            raise IndexError('too many indices for the data')
+
+        return key + (slice(None),) * (self.ndim - len(key))
+
+    def __getitem__(self, key):
+        key = self._full_key(key)
+
+        num = len(self.windows)
+        lead, spatial = key[:self.ndim - num], key[self.ndim - num:]
+
+        if isinstance(self.windows[0], range):
+            return self.wrapped[lead + tuple(self._in_range(w, k)
+                                             for w, k in zip(self.windows,
+                                                             spatial))]
+
+        # unstructured: read the span of the indices, and pick them out
+        # of it
+        index = self.windows[0][spatial[0]]
+
+        if np.ndim(index) == 0:
+            return self.wrapped[lead + (int(index),)]
+
+        if len(index) == 0:
+            return np.take(self.wrapped[lead + (slice(0, 1),)], index, axis=-1)
+
+        lo = int(index.min())
+        span = self.wrapped[lead + (slice(lo, int(index.max()) + 1),)]
+
+        return np.take(span, index - lo, axis=-1)
+
+    @staticmethod
+    def _in_range(window, key):
+        """
+        the key into the wrapped data for the key into the window
+        """
+        if isinstance(key, (int, np.integer)):
+            return window[key]
+
+        if isinstance(key, slice):
+            sub = window[key]
+
+            if sub.step > 0:
+                return slice(sub.start, sub.stop, sub.step)
+
+            return np.array(sub)
+
+        return np.asarray(window)[key]
+
+
+def _overlapping(cell_min, cell_max, lo, hi):
+    """
+    mask of the cells whose extents overlap [lo, hi]
+    """
+    with np.errstate(invalid='ignore'):
+        return (cell_max >= lo) & (cell_min <= hi)
+
+
+def _corners(arr):
+    """
+    the four corners of each cell of a 2D array of node values
+    """
+    return np.stack((arr[:-1, :-1], arr[:-1, 1:], arr[1:, :-1], arr[1:, 1:]))
+
+
+def _node_range(overlaps, axis):
+    """
+    range of the nodes of the cells that overlap, along an axis
+    """
+    if overlaps.ndim > 1:
+        other = tuple(i for i in range(overlaps.ndim) if i != axis)
+        overlaps = overlaps.any(axis=other)
+
+    cells = np.flatnonzero(overlaps)
+
+    return range(int(cells[0]), int(cells[-1]) + 2)
+
+
+class GridSubset(object):
+    """
+    The part of a grid that covers a bounding box
+
+    Knows the windows of the original grid the subset grid came from, so
+    the data on the grid can be cut down to match.
+    """
+
+    def __init__(self, grid, bounding_box):
+        (x0, y0), (x1, y1) = as_bounding_box(bounding_box)
+
+        self.original = grid
+        self.grid = grid
+
+        # set by the _subset_* methods
+        self.node_windows = None
+        self.node_shape = None
+        self.faces = None
+        self.nodes = None
+
+        if np.ndim(getattr(grid, 'node_lon', None)) == 2:
+            self._subset_structured(grid, x0, y0, x1, y1)
+        elif getattr(grid, 'faces', None) is not None:
+            self._subset_unstructured(grid, x0, y0, x1, y1)
+        else:
+            self._subset_rectangular(grid, x0, y0, x1, y1)
+
+    @property
+    def is_subset(self):
+        return self.grid is not self.original
+
+    def _subset_rectangular(self, grid, x0, y0, x1, y1):
+        lon = np.ma.getdata(grid.node_lon[:]).astype(np.float64)
+        lat = np.ma.getdata(grid.node_lat[:]).astype(np.float64)
+        self.node_shape = (len(lat), len(lon))
+
+        in_lon = _overlapping(np.minimum(lon[:-1], lon[1:]),
+                              np.maximum(lon[:-1], lon[1:]), x0, x1)
+        in_lat = _overlapping(np.minimum(lat[:-1], lat[1:]),
+                              np.maximum(lat[:-1], lat[1:]), y0, y1)
+
+        if not (in_lon.any() and in_lat.any()):
+            raise ValueError('The bounding box is not on the grid')
+
+        self.node_windows = (_node_range(in_lat, 0), _node_range(in_lon, 0))
+
+        if self.node_shape == tuple(len(w) for w in self.node_windows):
+            return
+
+        rows, cols = self.node_windows
+        self._set_grid(type(grid)(node_lon=lon[cols.start:cols.stop],
+                                  node_lat=lat[rows.start:rows.stop]))
+
+    def _subset_structured(self, grid, x0, y0, x1, y1):
+        lon = np.ma.getdata(grid.node_lon[:]).astype(np.float64)
+        lat = np.ma.getdata(grid.node_lat[:]).astype(np.float64)
+        self.node_shape = lon.shape
+
+        # the extents of each cell, from its four corner nodes
+        lon_c, lat_c = _corners(lon), _corners(lat)
+
+        overlaps = (_overlapping(lon_c.min(axis=0), lon_c.max(axis=0),
+                                 x0, x1) &
+                    _overlapping(lat_c.min(axis=0), lat_c.max(axis=0),
+                                 y0, y1))
+
+        if not overlaps.any():
+            raise ValueError('The bounding box is not on the grid')
+
+        self.node_windows = (_node_range(overlaps, 0),
+                             _node_range(overlaps, 1))
+
+        if self.node_shape == tuple(len(w) for w in self.node_windows):
+            return
+
+        kwargs = {}
+        for name in _grid_s_arrays:
+            arr = getattr(grid, name, None)
+
+            if arr is not None and np.ndim(arr) == 2:
+                windows = self.windows_for(arr.shape)
+                kwargs[name] = SubsetData(arr, windows)[:]
+
+        for name in _grid_s_options:
+            if getattr(grid, name, None) is not None:
+                kwargs[name] = getattr(grid, name)
+
+        self._set_grid(type(grid)(**kwargs))
+
+    def _subset_unstructured(self, grid, x0, y0, x1, y1):
+        nodes = np.ma.getdata(grid.nodes[:]).astype(np.float64)
+        faces = grid.faces[:]
+
+        # mixed triangles and quads have the missing corners masked --
+        # use the first corner again for those
+        if np.ma.is_masked(faces):
+            faces = np.where(np.ma.getmaskarray(faces), faces[:, :1],
+                             np.ma.getdata(faces))
+        faces = np.asarray(faces, dtype=np.int64)
+
+        corners = nodes[faces]
+
+        overlaps = (_overlapping(corners[..., 0].min(axis=1),
+                                 corners[..., 0].max(axis=1), x0, x1) &
+                    _overlapping(corners[..., 1].min(axis=1),
+                                 corners[..., 1].max(axis=1), y0, y1))
+
+        if not overlaps.any():
+            raise ValueError('The bounding box is not on the grid')
+
+        self.faces = np.flatnonzero(overlaps)
+        self.nodes = np.unique(faces[self.faces])
+
+        if len(self.faces) == len(faces):
+            return
+
+        new_faces = np.searchsorted(self.nodes, np.asarray(grid.faces[:])
+                                    [self.faces])
+
+        if np.ma.is_masked(grid.faces[:]):
+            new_faces = np.ma.MaskedArray(new_faces,
+                                          mask=np.ma.getmaskarray(
+                                              grid.faces[:])[self.faces])
+
+        self._set_grid(type(grid)(nodes=nodes[self.nodes], faces=new_faces))
+
+    def _set_grid(self, grid):
+        """
+        use a subset grid -- with the file and topology of the original, so
+        it is saved (and loaded) as the original is
+        """
+        for name in ('filename', 'grid_topology'):
+            if getattr(self.original, name, None) is not None:
+                setattr(grid, name, getattr(self.original, name))
+
+        self.grid = grid
+
+    def windows_for(self, shape):
+        """
+        The windows of data of this shape on the grid
+
+        Structured data has a range for each of its last two dimensions;
+        its location (nodes, centers, or edges, with or without padding)
+        is worked out from how much bigger or smaller than the nodes it is.
+        Unstructured data has an array of node or face indices.
+        """
+        if self.faces is not None:
+            size = shape[-1] if len(shape) > 0 else None
+
+            if size == len(self.original.nodes):
+                return (self.nodes,)
+            if size == len(self.original.faces):
+                return (self.faces,)
+
+        elif len(shape) >= 2:
+            windows = []
+
+            for window, n, length in zip(self.node_windows, self.node_shape,
+                                         shape[-2:]):
+                diff = length - n
+
+                if diff not in (-1, 0, 1):
+                    break
+
+                windows.append(range(window.start,
+                                     window.stop + diff))
+            else:
+                return tuple(windows)
+
+        raise ValueError('Data of shape {} is not on the grid'
+                         .format(tuple(shape)))
+
+
+def _components(obj):
+    """
+    the objects on the grid that make up a Variable or VectorVariable
+    """
+    yield obj
+
+    for var in getattr(obj, 'variables', None) or []:
+        yield var
+
+    depth = getattr(obj, 'depth', None)
+    if depth is not None:
+        yield depth
+
+        for name in ('bathymetry', 'zeta'):
+            var = getattr(depth, name, None)
+
+            if var is not None:
+                yield var
+
+
+def _grid_subset(grid, bounding_box):
+    """
+    The GridSubset of a grid for a bounding box -- kept on the grid, so the
+    objects that share a grid share its subset, even when they are cut down
+    one at a time (as they are when loaded from a save file)
+    """
+    subsets = getattr(grid, '_subsets', None)
+
+    if subsets is None:
+        subsets = grid._subsets = {}
+
+    if bounding_box not in subsets:
+        subset = GridSubset(grid, bounding_box)
+        subsets[bounding_box] = subset
+
+        if subset.is_subset:
+            # the subset grid is already cut down to the box
+            subset.grid._subsets = {bounding_box: subset}
+
+    return subsets[bounding_box]
+
+
+def subset_environment(obj, bounding_box):
+    """
+    Cut a gridded environment object down to the part of its grid that
+    covers a bounding box -- in place.
+
+    The grid of the object (and of its component variables and depth) is
+    replaced with the subset grid, and the data with a SubsetData. The
+    bounding box is kept as the bounding_box of the object and its
+    component variables, to be saved with them.
+
+    :param obj: a Variable or VectorVariable
+    :param bounding_box: ((min_lon, min_lat), (max_lon, max_lat)), or a
+                         map to take the bounding box from (see
+                         bounding_box_from_map())
+
+    :returns: the object
+    """
+    bounding_box = as_bounding_box(bounding_box)
+
+    for component in _components(obj):
+        if hasattr(component, 'bounding_box'):
+            component.bounding_box = bounding_box
+
+        grid = getattr(component, 'grid', None)
+
+        if grid is None:
+            continue
+
+        subset = _grid_subset(grid, bounding_box)
+
+        if subset.grid is grid:
+            # already done, or nothing to cut
+            continue
+
+        data = getattr(component, 'data', None)
+        if data is not None and not isinstance(data, SubsetData):
+            component.data = SubsetData(data, subset.windows_for(data.shape))
+
+        component.grid = subset.grid
+
+    return obj
+
+
+def subset_environments(objs, bounding_box):
+    """
+    subset_environment() for a set of objects, which keep sharing their
+    grids
+
+    :returns: the objects
+    """
+    for obj in objs:
+        subset_environment(obj, bounding_box)
+
+    return objs
@@ -24,11 +24,11 @@ As well as a few implementations of actual maps
 
 
 import os
-import math
 import warnings
 
 import py_gd
 import numpy as np
+from scipy.ndimage import distance_transform_cdt
 from gnome.persist import SchemaNode, String, Float, Boolean, drop
 
 from geojson import FeatureCollection, Feature, MultiPolygon
@@ -48,12 +48,14 @@ from gnome.utilities.projections import (FlatEarthProjection,
                                          RegularGridProjection)
 from gnome.utilities.map_canvas import MapCanvas
 from gnome.utilities.file_tools import haz_files
+from gnome.utilities import data_cache, rand
 # from gnome.utilities.file_tools.osgeo_helpers import (ogr_layers)
 # from gnome.utilities.file_tools.osgeo_helpers import (ogr_features)
 # from gnome.utilities.file_tools.osgeo_helpers import (ogr_open_file)
 
 from gnome.utilities.geometry.polygons import PolygonSet
-from gnome.utilities.geometry import points_in_poly, point_in_poly
+from gnome.utilities.geometry import (points_in_poly, point_in_poly,
+                                      PolygonIndex)
 from gnome.utilities.appearance import AppearanceSchema
 
 from gnome.cy_gnome.cy_land_check import check_land_layers, move_particles
@@ -81,7 +83,7 @@ class ParamMapSchema(GnomeMapSchema):
 
 # fixme: shouldn't the rasterMap have the raster size? and the raster itself?
 class RasterMapSchema(GnomeMapSchema):
-    pass
+    num_threads = SchemaNode(Int(), missing=drop)
 
 
 class MapFromBNASchema(RasterMapSchema):
@@ -216,6 +218,23 @@ class GnomeMap(GnomeId):
                            (360, 90), (360, -90)),
                           dtype=np.float64)
         self._map_bounds = np.array(mb)
+        self._map_bounds_index = None
+
+    @property
+    def map_bounds_index(self):
+        """
+        A PolygonIndex of the map bounds, for fast on_map tests.
+
+        Rebuilt if the map bounds have changed -- even in place.
+        """
+        index = self._map_bounds_index
+
+        if (index is None or
+                not np.array_equal(index.polygon,
+                                   np.reshape(self._map_bounds, (-1, 2)))):
+            index = self._map_bounds_index = PolygonIndex(self._map_bounds)
+
+        return index
 
     def get_map_bounding_box(self):
         """
@@ -311,7 +330,7 @@ class GnomeMap(GnomeId):
         """
         coords = np.asarray(coords, dtype=world_point_type)
 
-        return points_in_poly(self.map_bounds, coords)
+        return self.map_bounds_index.contains(coords)
 
     def on_land(self, coord):
         """
@@ -420,6 +439,21 @@ class GnomeMap(GnomeId):
         """
         pass
 
+    def _refloat_random(self, spill_container, r_idx, model_time):
+        """
+        Uniform random numbers in [0, 1) for refloating the elements r_idx
+
+        With a model_time, they come from the random streams, keyed on the
+        element ids, so they are the same however the elements are split up.
+        """
+        if model_time is None:
+            return np.random.uniform(0, 1, len(r_idx))
+
+        return rand.streams.element_uniform(spill_container['id'][r_idx],
+                                            'GnomeMap.refloat',
+                                            int(spill_container.uncertain),
+                                            model_time.isoformat())
+
     def resurface_airborne_elements(self, spill_container):
         """
         Takes any elements that are left above the water surface (z < 0.0)
@@ -553,7 +587,7 @@ class ParamMap(GnomeMap):
           coord is 3-d, but the concept of "on the map" is 2-d in this context,
           so depth is ignored.
         """
-        return points_in_poly(self.map_bounds, coord)
+        return self.map_bounds_index.contains(coord)
 
     def on_land(self, coord):
         """
@@ -674,7 +708,7 @@ class ParamMap(GnomeMap):
             # refloat particles based on probability
             refloat_probability = 1.0 - 0.5 ** (float(time_step) /
                                                 self._refloat_halflife)
-            rnd = np.random.uniform(0, 1, len(r_idx))
+            rnd = self._refloat_random(spill_container, r_idx, model_time)
 
             # subset of indices that will refloat
             # maybe we should rename refloat_probability since
@@ -745,10 +779,15 @@ class RasterMap(GnomeMap):
 
     land_flag = 1
 
+    # elements further than this (in raster cells) from land are never
+    # skipped by the distance to land test -- keeps the distance raster small
+    max_land_distance = 2 ** 16 - 1
+
     def __init__(self,
                  raster=None,
                  projection=None,
                  refloat_halflife=1,
+                 num_threads=1,
                  **kwargs):
         """
         create a new RasterMap
@@ -772,6 +811,12 @@ class RasterMap(GnomeMap):
                                  < 0.0 means never re-float.
         :type refloat_halflife: float. Units are hours
 
+        :param num_threads: The number of threads used to check the elements
+                            for crossing land. 1 checks them in the calling
+                            thread, 0 uses the OpenMP default (usually one
+                            per core).
+        :type num_threads: int
+
         :param map_bounds: The polygon bounding the map -- could be larger
                            or smaller than the land raster
         :type map_bounds: (N,2) numpy array of floats
@@ -786,6 +831,7 @@ class RasterMap(GnomeMap):
         """
         super(RasterMap, self).__init__(**kwargs)
         self._refloat_halflife = refloat_halflife * self.seconds_in_hour
+        self.num_threads = num_threads
 
         if raster is None:
             self.raster = np.zeros((1024, 1024))
@@ -818,38 +864,86 @@ class RasterMap(GnomeMap):
         then land was hit.
         """
         self.logger.info('generating coarser rasters')
-        self.layers = []
-        base_w = self.raster.shape[0]
-        base_h = self.raster.shape[1]
+        layers = []
+
+        # build each layer from the finest layer already built that it is
+        # a multiple of, rather than from the full raster each time.
+        # ceil(ceil(w / a) / b) == ceil(w / (a * b)), so the shapes match
+        source, source_ratio = self.raster, 1
 
-        for ratio in self.ratios[:-1]:
-            genned_layer = np.zeros((int(math.ceil(float(base_w) / ratio)),
-                                     int(math.ceil(float(base_h) / ratio))),
-                                    dtype=np.uint8, order='C')
+        for ratio in self.ratios[::-1][1:]:
+            if ratio % source_ratio == 0:
+                genned_layer = self._block_reduce(source, ratio // source_ratio)
+            else:
+                genned_layer = self._block_reduce(self.raster, ratio)
 
-            for j in range(0, genned_layer.shape[1]):
-                for i in range(0, genned_layer.shape[0]):
-                    genned_layer[i, j] = np.any(self.raster[
-                                                i * ratio:(i + 1) * ratio,
-                                                j * ratio:(j + 1) * ratio
-                                                ])
+            source, source_ratio = genned_layer, ratio
+            layers.append(genned_layer)
 
-            self.layers.append(genned_layer)
+        layers.reverse()
+        layers.append(self.raster)
 
-        self.layers.append(self.raster)
-        # self.layers = np.array(self.layers)
-        # print("the layers array:", self.layers)
+        self._layers = layers
+
+    @property
+    def layers(self):
+        """
+        The land check layers, coarsest first, ending with the raster
+        itself -- see build_coarser_rasters().
+
+        Built the first time they are needed.
+        """
+        if self._layers is None:
+            self.build_coarser_rasters()
+        return self._layers
+
+    @staticmethod
+    def _block_reduce(raster, ratio):
+        """
+        Returns a raster ratio times coarser than the one passed in:
+        a cell is 1 if any of the (ratio x ratio) cells it covers are not 0.
+
+        The raster is padded with water if its shape is not a multiple of
+        ratio.
+        """
+        w, h = raster.shape
+        coarse_w = -(-w // ratio)
+        coarse_h = -(-h // ratio)
+
+        if (coarse_w * ratio, coarse_h * ratio) != (w, h):
+            padded = np.zeros((coarse_w * ratio, coarse_h * ratio),
+                              dtype=raster.dtype)
+            padded[:w, :h] = raster
+            raster = padded
+
+        blocks = raster.reshape(coarse_w, ratio, coarse_h, ratio)
+
+        return np.ascontiguousarray(blocks.any(axis=(1, 3)), dtype=np.uint8)
 
     @property
     def ratios(self):
+        """
+        The ratios of cells in the raster to cells in each of the land
+        check layers, coarsest first -- the last one is always 1: the
+        raster itself.
+
+        More levels means less of the raster is walked for elements far from
+        land, at the cost of the memory for the extra layers.
+        """
         if self._ratios is None:
-            self._ratios = (16, 1)
+            self._ratios = np.array((16, 1), dtype=np.int32)
         return self._ratios
 
     @ratios.setter
     def ratios(self, r):
+        r = np.array(r, dtype=np.int32).reshape(-1)
+
+        if len(r) == 0 or r[-1] != 1 or np.any(r[:-1] <= r[1:]):
+            raise ValueError('ratios must be decreasing, ending in 1. '
+                             'Got: {}'.format(r))
+
         self._ratios = r
-        self.build_coarser_rasters()
+        self._layers = None
 
     @property
     def raster(self):
@@ -865,7 +959,31 @@ class RasterMap(GnomeMap):
             self._ratios = np.array((16, 1,), dtype=np.int32)
 
         self._raster = np.ascontiguousarray(arr)
-        self.build_coarser_rasters()
+        self._layers = None
+        self._distance_to_land = None
+
+    @property
+    def distance_to_land(self):
+        """
+        The distance, in raster cells, from each cell of the raster to the
+        nearest land cell -- 0 on land. This is the chessboard distance:
+        the larger of the x and y distances, capped at max_land_distance.
+
+        Built from the raster the first time it is needed.
+        """
+        if self._distance_to_land is None:
+            self.logger.info('generating distance to land raster')
+            water = self.raster == 0
+            if water.all():
+                dist = np.full(water.shape, self.max_land_distance,
+                               dtype=np.uint16)
+            else:
+                dist = distance_transform_cdt(water, metric='chessboard')
+                dist = np.minimum(dist,
+                                  self.max_land_distance).astype(np.uint16)
+            self._distance_to_land = dist
+
+        return self._distance_to_land
 
     @property
     def refloat_halflife(self):
@@ -1022,10 +1140,32 @@ class RasterMap(GnomeMap):
 
         # call the actual hit code:
         # the status_code and last_water_point arrays are altered in-place
-        # only check the ones that aren't already beached?
-        self._check_land_layers(self.layers, self.ratios,
-                                start_pos_pixel, next_pos_pixel,
-                                status_codes, last_water_pos_pixel)
+        # only the elements that could get to land this step are checked
+        to_check = self._may_reach_land(start_pos_pixel, next_pos_pixel)
+        num_checked = np.count_nonzero(to_check)
+
+        self.logger.debug('land check: skipped {} of {} elements that are '
+                          'too far from land to reach it'
+                          .format(len(to_check) - num_checked,
+                                  len(to_check)))
+
+        if num_checked == len(to_check):
+            self._check_land_layers(self.layers, self.ratios,
+                                    start_pos_pixel, next_pos_pixel,
+                                    status_codes, last_water_pos_pixel)
+        elif num_checked > 0:
+            idx = np.nonzero(to_check)[0]
+            check_next = next_pos_pixel[idx]
+            check_status = status_codes[idx]
+            check_last_water = last_water_pos_pixel[idx]
+
+            self._check_land_layers(self.layers, self.ratios,
+                                    start_pos_pixel[idx], check_next,
+                                    check_status, check_last_water)
+
+            next_pos_pixel[idx] = check_next
+            status_codes[idx] = check_status
+            last_water_pos_pixel[idx] = check_last_water
 
         # transform the points back to lat-long.
         beached = status_codes == oil_status.on_land
@@ -1067,7 +1207,7 @@ class RasterMap(GnomeMap):
 
             refloat_probability = 1.0 - 0.5 ** (float(time_step) /
                                                 self._refloat_halflife)
-            rnd = np.random.uniform(0, 1, len(r_idx))
+            rnd = self._refloat_random(spill_container, r_idx, model_time)
 
             # subset of indices that will refloat
             # maybe we should rename refloat_probability since
@@ -1085,20 +1225,46 @@ class RasterMap(GnomeMap):
                 spill_container['last_water_positions'][r_idx]
             spill_container['status_codes'][r_idx] = oil_status.in_water
 
+    def _may_reach_land(self, start_pixel, end_pixel):
+        """
+        Returns a boolean array that is True for the elements that could hit
+        land moving from start_pixel to end_pixel.
+
+        The land check only walks cells between the start and the end, none
+        of which are further from the start than the larger of the x and y
+        steps. So an element whose step is shorter than the (chessboard)
+        distance to land from its start can't hit land. Elements that start
+        off the raster are always checked.
+        """
+        dist = self.distance_to_land
+        x = start_pixel[:, 0]
+        y = start_pixel[:, 1]
+
+        on_raster = ((x >= 0) & (x < dist.shape[0]) &
+                     (y >= 0) & (y < dist.shape[1]))
+        step = np.abs(end_pixel.astype(np.int64) - start_pixel).max(axis=1)
+
+        to_check = np.ones(len(start_pixel), dtype=bool)
+        to_check[on_raster] = (step[on_raster] >=
+                               dist[x[on_raster], y[on_raster]])
+
+        return to_check
+
     def _check_land_layers(self, raster_map_layers, ratios,
                            positions, end_positions,
                            status_codes, last_water_positions):
         """
         Do the actual land-checking.
         This method simply calls a Cython version:
-            gnome.cy_gnome.cy_land_check.check_land()
+            gnome.cy_gnome.cy_land_check.check_land_layers()
 
         The arguments 'status_codes', 'positions' and 'last_water_positions'
         are altered in place.
         """
         check_land_layers(raster_map_layers, ratios,
                           positions, end_positions,
-                          status_codes, last_water_positions)
+                          status_codes, last_water_positions,
+                          num_threads=self.num_threads)
 
     def allowable_spill_position(self, coord):
         """
@@ -1254,7 +1420,20 @@ class MapFromBNA(RasterMap):
                 map_bounds = BB.AsPoly()
 
         # get the raster as a numpy array:
-        raster, projection = self.build_raster(land_polys, BB)
+        # rasterizing a large map is slow, so it is kept in the data cache
+        cache = data_cache.default_cache
+        cache_key = self._raster_cache_key(BB) if cache.enabled else None
+        cached = None if cache_key is None else cache.load(cache_key)
+
+        if cached is None:
+            raster, projection = self.build_raster(land_polys, BB)
+        else:
+            self.logger.info('loading raster from the data cache')
+            arrays, meta = cached
+            raster = arrays['raster']
+            projection = FlatEarthProjection(
+                bounding_box=tuple(map(tuple, meta['viewport'])),
+                image_size=tuple(meta['image_size']))
 
         super(MapFromBNA, self).__init__(
             raster=raster,
@@ -1263,8 +1442,45 @@ class MapFromBNA(RasterMap):
             spillable_area=spillable_area,
             land_polys=land_polys,
             **kwargs)
+
+        if cached is not None:
+            self._ratios = np.array(meta['ratios'], dtype=np.int32)
+            self._layers = ([arrays['layer_{}'.format(i)]
+                             for i in range(len(self._ratios) - 1)] +
+                            [self.raster])
+            self._distance_to_land = arrays['distance_to_land']
+        elif cache_key is not None:
+            self._save_raster_cache(cache, cache_key, BB)
+
         return None
 
+    def _raster_cache_key(self, BB):
+        """
+        The data cache key for the raster built from this file with these
+        options.
+        """
+        return data_cache.make_key('MapFromBNA.raster', 1,
+                                   data_cache.file_hash(self.filename),
+                                   float(self.raster_size),
+                                   self.shift_lons,
+                                   np.asarray(BB, dtype=np.float64).tolist())
+
+    def _save_raster_cache(self, cache, cache_key, BB):
+        """
+        Save the raster, the land check layers, the distance to land and
+        what's needed to rebuild the projection to the data cache.
+        """
+        arrays = {'raster': self.raster,
+                  'distance_to_land': self.distance_to_land}
+        for i, layer in enumerate(self.layers[:-1]):
+            arrays['layer_{}'.format(i)] = layer
+
+        meta = {'viewport': np.asarray(BB, dtype=np.float64).tolist(),
+                'image_size': [int(s) for s in self.projection.image_size],
+                'ratios': self.ratios.tolist()}
+
+        cache.save(cache_key, arrays, meta)
+
 
     def build_raster(self, land_polys=None, BB=None):
         """
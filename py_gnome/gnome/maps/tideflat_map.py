@@ -21,6 +21,8 @@ from gnome.utilities.time_utils import asdatetime
 
 from gnome.utilities.geometry import (points_in_poly,
                                       )
+from gnome.environment.gridded_objects_base import Variable
+from gnome.environment.environment_objects import Bathymetry, WaterLevel
 
 
 class TideflatMap(GnomeId):
@@ -101,7 +103,7 @@ class TideflatMap(GnomeId):
             status_codes[tf_idx[now_wet]] = oil_status.in_water
 
         # Pass off to the map
-        self.land_map.refloat_elements(spill_container, time_step)
+        self.land_map.refloat_elements(spill_container, time_step, model_time)
 
 
 class TideflatBase(GnomeId):
@@ -176,3 +178,157 @@ class SimpleTideflat(TideflatBase):
             return np.zeros(points.shape[0], dtype=bool)
 
         return points_in_poly(self.bounds, points)
+
+
+class GriddedTideflat(TideflatBase):
+    """
+    Tideflat from the water level and bathymetry of a hydrodynamic model
+
+    Elements are dry where the total water depth (bathymetry plus water
+    level) is less than min_depth. If the model provides a wet/dry mask
+    (1 for wet, 0 for dry -- e.g. FVCOM's wet_nodes or wet_cells), that can
+    be used instead.
+
+    The wet/dry field on the grid is computed once per model time and
+    cached, so checking for elements going dry and elements coming back
+    wet at the same time share it. The elements are then all located on
+    the grid and the field interpolated to them in one vectorized call.
+    """
+
+    def __init__(self,
+                 water_level=None,
+                 bathymetry=None,
+                 wet_dry_mask=None,
+                 min_depth=0.05,
+                 *args,
+                 **kwargs):
+        """
+        :param water_level: water level (sea surface height), positive up
+        :type water_level: :class:`gnome.environment.environment_objects.WaterLevel`
+
+        :param bathymetry: depth of the bottom below the datum of the water
+                           level, positive down. It must be on the same grid
+                           points as the water level.
+        :type bathymetry: :class:`gnome.environment.environment_objects.Bathymetry`
+
+        :param wet_dry_mask: wet/dry mask from the model: 1 for wet, 0 for
+                             dry. Used in place of the water level and
+                             bathymetry.
+        :type wet_dry_mask: :class:`gnome.environment.gridded_objects_base.Variable`
+
+        :param min_depth=0.05: total water depth (in meters) below which an
+                               element is on a tideflat.
+        """
+        super(GriddedTideflat, self).__init__(*args, **kwargs)
+
+        if wet_dry_mask is None and (water_level is None or
+                                     bathymetry is None):
+            raise ValueError('GriddedTideflat needs either a water level and '
+                             'a bathymetry, or a wet/dry mask')
+
+        self.water_level = water_level
+        self.bathymetry = bathymetry
+        self.wet_dry_mask = wet_dry_mask
+        self.min_depth = min_depth
+
+        source = water_level if wet_dry_mask is None else wet_dry_mask
+        self.grid = source.grid
+
+        self._depth = None
+        self._field_time = None
+        self._field = None
+
+    @classmethod
+    def from_netCDF(cls,
+                    filename,
+                    water_level_varname=None,
+                    bathymetry_varname=None,
+                    wet_dry_varname=None,
+                    **kwargs):
+        """
+        Create a GriddedTideflat from a model's netCDF output
+
+        The water level and bathymetry are found by their standard names if
+        their variable names are not given. If wet_dry_varname is given,
+        that wet/dry mask is used instead.
+
+        Other keyword arguments are passed to __init__
+        """
+        if wet_dry_varname is not None:
+            wet_dry_mask = Variable.from_netCDF(filename=filename,
+                                                varname=wet_dry_varname)
+            return cls(wet_dry_mask=wet_dry_mask, **kwargs)
+
+        water_level = WaterLevel.from_netCDF(filename=filename,
+                                             varname=water_level_varname)
+        bathymetry = Bathymetry.from_netCDF(filename=filename,
+                                            varname=bathymetry_varname,
+                                            grid=water_level.grid)
+
+        return cls(water_level=water_level, bathymetry=bathymetry, **kwargs)
+
+    @staticmethod
+    def _data_at_time(variable, model_time):
+        """
+        The data of variable on its grid, interpolated to model_time
+        """
+        time = variable.time
+
+        if len(time) == 1:
+            return np.ma.asarray(variable.data[0], dtype=np.float64)
+
+        t1 = time.index_of(model_time, extrapolate=True)
+        t1 = min(max(t1, 1), len(time) - 1)
+        alpha = np.clip(time.interp_alpha(model_time, extrapolate=True),
+                        0.0, 1.0)
+
+        d0 = np.ma.asarray(variable.data[t1 - 1], dtype=np.float64)
+        d1 = np.ma.asarray(variable.data[t1], dtype=np.float64)
+
+        return d0 + alpha * (d1 - d0)
+
+    def wet_field(self, model_time):
+        """
+        The wet/dry field on the grid at model_time: positive where wet,
+        negative where dry.
+
+        Masked (land) points count as wet -- the land map deals with them.
+        """
+        if self._field is None or self._field_time != model_time:
+            if self.wet_dry_mask is not None:
+                field = self._data_at_time(self.wet_dry_mask, model_time) - 0.5
+            else:
+                if self._depth is None:
+                    self._depth = np.ma.asarray(self.bathymetry.data[:],
+                                                dtype=np.float64)
+
+                water_level = self._data_at_time(self.water_level, model_time)
+                field = self._depth + water_level - self.min_depth
+
+            self._field = np.ascontiguousarray(np.ma.filled(field, 1.0))
+            self._field_time = model_time
+
+        return self._field
+
+    def is_dry(self, points, model_time):
+        """
+        :param points: locations for testing if the locations are dry.
+        :type points: Nx3 numpy array or equivalent.
+
+        :param time: time at which to check for wet/dry
+
+        :return: numpy array of bools one for each point. Points off the
+                 grid are never dry.
+        """
+        points = np.array(points, dtype=np.float64).reshape((-1, 3))
+
+        if len(points) == 0:
+            return np.zeros((0,), dtype=bool)
+
+        values = self.grid.interpolate_var_to_points(
+            np.ascontiguousarray(points[:, :2]),
+            self.wet_field(model_time),
+            fill_value=1.0)
+        values = np.ma.filled(values, 1.0).reshape(-1)
+
+        return values < 0.0
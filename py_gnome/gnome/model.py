@@ -61,6 +61,7 @@ from gnome.maps.map import (GnomeMapSchema,
 
 from gnome.environment import Environment, Wind
 from gnome.environment.water import Water
+from gnome.environment import sampling_cache
 from gnome.array_types import gat
 from gnome.environment import schemas as env_schemas
 
@@ -73,8 +74,10 @@ from gnome.weatherers import (weatherer_sort,
                               weatherers_by_name,
                               standard_weatherering_sets,
                               )
+from gnome.weatherers.fused import can_fuse, weather_elements_fused
 from gnome.outputters import Outputter, NetCDFOutput, WeatheringOutput
 from gnome.outputters import schemas as out_schemas
+from gnome.outputters.executor import OutputExecutor
 from gnome.persist import (extend_colander,
                            validators,
                            References)
@@ -96,6 +99,8 @@ class ModelSchema(ObjTypeSchema):
     'Colander schema for Model object'
     time_step = SchemaNode(Float())
     weathering_substeps = SchemaNode(Int(), read_only=True)
+    fused_weathering = SchemaNode(Bool(), missing=drop)
+    parallel_output = SchemaNode(Bool(), missing=drop)
     start_time = SchemaNode(
         extend_colander.LocalDateTime(),
         validator=validators.convertible_to_seconds
@@ -196,6 +201,8 @@ class Model(GnomeId):
                  start_time=round_time(datetime.now(), 3600),
                  duration=timedelta(days=1),
                  weathering_substeps=1,
+                 fused_weathering=False,
+                 parallel_output=False,
                  map=None,
                  uncertain=False,
                  cache_enabled=False,
@@ -231,6 +238,17 @@ class Model(GnomeId):
         :param weathering_substeps=1: How many weathering substeps to
                                           run inside a single model time step.
 
+        :param fused_weathering=False: If True, and all the weatherers are
+                                       from the standard set, run them in a
+                                       single pass per substep that shares
+                                       the data and environment values. See
+                                       ``gnome.weatherers.fused``
+
+        :param parallel_output=False: If True, run each outputter on its
+                                      own worker thread, so the model does
+                                      not wait for the output of each step.
+                                      See ``gnome.outputters.executor``
+
         :param map=gnome.map.GnomeMap(): The land-water map.
 
         :param uncertain=False: Flag for setting uncertainty.
@@ -265,6 +283,10 @@ class Model(GnomeId):
         self._cache = ElementCache()
         self._cache.enabled = cache_enabled
 
+        self.parallel_output = parallel_output
+        # set up in setup_model_run()
+        self._output_executor = None
+
         # default to now, rounded to the nearest hour
         self.start_time = start_time
         self._duration = duration
@@ -284,6 +306,7 @@ class Model(GnomeId):
                                  .format(weathering_substeps))
 
         self.weathering_substeps = weathering_substeps
+        self.fused_weathering = fused_weathering
 
         if not map:
             map = GnomeMap()
@@ -403,8 +426,12 @@ class Model(GnomeId):
         # set rand before each call so windages are set correctly
         gnome.utilities.rand.seed(1)
 
+        # stop the outputters of the last run before they are rewound
+        self._stop_output_executor(raise_errors=False)
+
         # clear the cache:
         self._cache.rewind()
+        sampling_cache.default_cache.clear()
 
         for outputter in self.outputters:
             outputter.rewind()
@@ -928,6 +955,11 @@ class Model(GnomeId):
                                             model_time_step=self.time_step,
                                             map=self.map,
                                             model_name=self.name)
+
+        self._stop_output_executor(raise_errors=False)
+        if self.parallel_output:
+            self._output_executor = OutputExecutor(self.outputters)
+
         self.logger.debug("{0._pid} setup_model_run complete for: "
                           "{0.name}".format(self))
 
@@ -936,11 +968,19 @@ class Model(GnomeId):
         A place where the model goes through all collections and calls
         post_model_run if the object has it.
         '''
+        # make sure the cached steps are all on disk before the outputters
+        # finish up
+        self._cache.flush()
+
         for env in self.environment:
             env.post_model_run()
         for mov in self.movers:
             if mov.on:
                 mov.post_model_run()
+
+        # the outputters finish writing the run first
+        self._stop_output_executor()
+
         for out in self.outputters:
             if out.on:
                 out.post_model_run()
@@ -952,6 +992,10 @@ class Model(GnomeId):
         '''
         sets up everything for the current time_step:
         '''
+        # the elements have moved -- the grid locations from the last step
+        # won't be used again
+        sampling_cache.default_cache.clear(self.model_time)
+
         # initialize movers differently if model uncertainty is on
         for m in self.movers:
             for sc in self.spills.items():
@@ -967,7 +1011,8 @@ class Model(GnomeId):
             environment.prepare_for_model_step(self.model_time)
 
         for outputter in self.outputters:
-            outputter.prepare_for_model_step(self.time_step, self.model_time)
+            self._call_outputter(outputter, 'prepare_for_model_step',
+                                 self.time_step, self.model_time)
 
     def move_elements(self):
         '''
@@ -1061,6 +1106,14 @@ class Model(GnomeId):
             sc.reset_fate_dataview()
 
             if not sc.uncertain:
+                # so the weatherers get views of the data rather than copies
+                sc.partition_by_fate()
+
+                if self.fused_weathering and can_fuse(self.weatherers):
+                    weather_elements_fused(sc, self.weatherers,
+                                           self._split_into_substeps())
+                    continue
+
                 for w in self.weatherers:
                     for model_time, time_step in self._split_into_substeps():
                         # change 'mass_components' in weatherer
@@ -1118,7 +1171,7 @@ class Model(GnomeId):
                 w.model_step_is_done(sc)
 
         for outputter in self.outputters:
-            outputter.model_step_is_done()
+            self._call_outputter(outputter, 'model_step_is_done')
 
         for sc in self.spills.items():
             # removes elements with oil_status.to_be_removed
@@ -1128,15 +1181,37 @@ class Model(GnomeId):
             # let time increase also for backwards run
             sc['age'][:] = sc['age'][:] + abs(self.time_step)
 
+    def _call_outputter(self, outputter, method, *args, **kwargs):
+        '''
+        Call a method of an outputter -- on its worker, if the output is
+        run in parallel, in which case None is returned.
+        '''
+        if self._output_executor is None:
+            return getattr(outputter, method)(*args, **kwargs)
+
+        return self._output_executor.call(outputter, method, *args, **kwargs)
+
+    def _stop_output_executor(self, raise_errors=True):
+        '''
+        wait for the outputters running in parallel to finish
+        '''
+        executor, self._output_executor = self._output_executor, None
+
+        if executor is not None:
+            executor.join(raise_errors=raise_errors)
+
     def write_output(self, valid, messages=None):
         output_info = {'step_num': self.current_time_step,
                        'step_time': self.model_time.isoformat(timespec='minutes')}
 
         for outputter in self.outputters:
             if self.current_time_step == self.num_time_steps - 1:
-                output = outputter.write_output(self.current_time_step, islast_step=True)
+                output = self._call_outputter(outputter, 'write_output',
+                                              self.current_time_step,
+                                              islast_step=True)
             else:
-                output = outputter.write_output(self.current_time_step)
+                output = self._call_outputter(outputter, 'write_output',
+                                              self.current_time_step)
 
             if output is not None:
                 output_info[outputter.__class__.__name__] = output
@@ -1474,6 +1549,8 @@ class Model(GnomeId):
                                      uncertain=self.uncertain,
                                      spills=self.spills)
         nc_out.write_output(self.current_time_step)
+        # writes the buffered step and closes the files
+        nc_out.post_model_run()
 
         if isinstance(saveloc, zipfile.ZipFile):
             saveloc.write(nc_filename, nc_filename)
@@ -142,7 +142,12 @@ class WindMoversBase(CyMover):
                                     sc['windage_range'][:, 1],
                                     sc['windages'],
                                     sc['windage_persist'],
-                                    time_step)
+                                    time_step,
+                                    element_ids=sc['id'],
+                                    key=('{}.windages'
+                                         .format(type(self).__name__),
+                                         self.name, int(sc.uncertain),
+                                         model_time_datetime.isoformat()))
 
     def get_move(self, sc, time_step, model_time_datetime):
         """
@@ -10,7 +10,8 @@ from gnome.basic_types import (world_point,
                                spill_type,
                                status_code_type)
 
-from gnome.utilities import time_utils
+from gnome.utilities import time_utils, rand
+from gnome.cy_gnome import cy_helpers
 from gnome.persist.base_schema import ObjTypeSchema
 from gnome.cy_gnome.cy_rise_velocity_mover import CyRiseVelocityMover
 from gnome import GnomeId
@@ -358,6 +359,7 @@ class CyMover(Mover):
                                                 dtype=np.int32)
 
             seconds = self.datetime_to_seconds(model_time_datetime)
+            self.seed_c_random('prepare', sc, model_time_datetime)
 
             try:
                 self.mover.prepare_for_model_step(seconds,
@@ -438,6 +440,19 @@ class CyMover(Mover):
 
         self.delta = np.zeros(len(self.positions), dtype=world_point)
 
+        self.seed_c_random('get_move', sc, model_time_datetime)
+
+    def seed_c_random(self, purpose, sc, model_time_datetime):
+        """
+        Seed the C random number generator the C++ mover draws from with
+        the random stream for this mover, the spill container and the time
+
+        :param purpose: what the numbers are for -- 'prepare' or 'get_move'
+        """
+        cy_helpers.srand(rand.streams.c_seed(
+            '{}.{}'.format(type(self).__name__, purpose), self.name,
+            int(sc.uncertain), model_time_datetime.isoformat()))
+
     def model_step_is_done(self, sc=None):
         """
         This method gets called by the model after everything else is done
@@ -7,6 +7,7 @@ import warnings
 from colander import (SchemaNode, Bool, Float, drop)
 
 from gnome.basic_types import oil_status
+from gnome.utilities import rand
 # from gnome.basic_types import (world_point_type,
 #                                status_code_type)
 
@@ -199,10 +200,18 @@ class CurrentMover(movers.PyMover):
             status = sc['status_codes'] != oil_status.in_water
             pos = positions[:]
 
-            res = self.delta_method(num_method)(sc, time_step,
-                                                model_time_datetime,
-                                                pos,
-                                                self.current)
+            tracking = getattr(self.current, 'reuse_cell_locations', False)
+            if tracking:
+                self.current.track_elements(sc['id'], sc.uncertain)
+
+            try:
+                res = self.delta_method(num_method)(sc, time_step,
+                                                    model_time_datetime,
+                                                    pos,
+                                                    self.current)
+            finally:
+                if tracking:
+                    self.current.track_elements(None)
 
             if res.shape[1] == 2:
                 deltas = np.zeros_like(positions)
@@ -226,13 +235,53 @@ class CurrentMover(movers.PyMover):
         return deltas
 
 
-    def _update_uncertainty(self, num_les, elapsed_time):
+    def _random_key(self, *parts):
+        """
+        key of the random streams for this mover -- the class and name, so
+        it's the same in every process (and run) the mover is loaded in
+        """
+        return ('{}.{}'.format(type(self).__name__, parts[0]),
+                self.name) + parts[1:]
+
+    def _random_uncertainty_terms(self, num_les, element_ids=None,
+                                  counter=0):
+        """
+        random (along, cross) uncertainty terms for num_les elements
+
+        :param element_ids=None: the ids of the elements. If given, the
+                                 terms come from the random streams, keyed
+                                 on the ids and the counter, so they don't
+                                 depend on how the elements are split up.
+                                 If None, numpy's global random state is
+                                 used.
+        :param counter=0: changes the terms drawn for the same elements --
+                          the elapsed time.
+        """
+        bounds = np.array([self.uncertain_along, self.uncertain_cross])
+
+        if element_ids is None:
+            return np.random.uniform(-bounds, bounds, size=(num_les, 2))
+
+        rnd = rand.streams.element_uniform(
+            element_ids, *self._random_key('uncertainty', counter), size=2)
+
+        return bounds * (2. * rnd - 1.)
+
+    def _update_uncertainty(self, num_les, elapsed_time, element_ids=None):
         """
         update uncertainty
 
         :param num_les: the number released so far
         :param elapsed_time: time in seconds since model run started
+        :param element_ids=None: the ids of the elements -- the uncertainty
+                                 terms are drawn from the random streams for
+                                 them. If None, numpy's global random state
+                                 is used.
         """
+        if element_ids is not None and len(element_ids) != num_les:
+            # not lined up with the uncertainty list
+            element_ids = None
+
         need_to_reinit = False
         need_to_reallocate = False
 
@@ -259,14 +308,11 @@ class CurrentMover(movers.PyMover):
             need_to_reinit = True
 
         if need_to_reallocate and uncertain_list_size != 0:
-            a_append = np.zeros((num_les - uncertain_list_size, ) + self.shape,
-                                dtype=np.float64)
-            a_append[:, 0] = np.random.uniform(-self.uncertain_along,
-                                               self.uncertain_along,
-                                               size=(num_les - uncertain_list_size, ))
-            a_append[:, 1] = np.random.uniform(-self.uncertain_cross,
-                                               self.uncertain_cross,
-                                               size=(num_les - uncertain_list_size, ))
+            a_append = self._random_uncertainty_terms(
+                num_les - uncertain_list_size,
+                element_ids=(None if element_ids is None
+                             else element_ids[uncertain_list_size:]),
+                counter=elapsed_time)
             self._uncertainty_list = np.r_[self._uncertainty_list, a_append]
 #             for i in range(uncertain_list_size,num_les):
 #                 self._uncertainty_list[i:,0] = np.random.uniform(-self.uncertain_along, self.uncertain_along)
@@ -274,26 +320,27 @@ class CurrentMover(movers.PyMover):
 
         if need_to_reinit:
             self._allocate_uncertainty(num_les)
-            self._update_uncertainty_values(elapsed_time)
+            self._update_uncertainty_values(elapsed_time, element_ids)
         elif elapsed_time >= self.time_uncertainty_was_set + self.uncertain_duration:
-            self._update_uncertainty_values(elapsed_time)
+            self._update_uncertainty_values(elapsed_time, element_ids)
 
         return
 
 
-    def _update_uncertainty_values(self, elapsed_time):
+    def _update_uncertainty_values(self, elapsed_time, element_ids=None):
         """
         update uncertainty values
 
         :param elapsed_time: time in seconds since model run started
+        :param element_ids=None: the ids of the elements
         """
         self.time_uncertainty_was_set = elapsed_time
         num_les = len(self._uncertainty_list)
         if num_les==0:
             return
 
-        self._uncertainty_list[:,0] = np.random.uniform(-self.uncertain_along, self.uncertain_along, size=(num_les,))
-        self._uncertainty_list[:,1] = np.random.uniform(-self.uncertain_cross, self.uncertain_cross, size=(num_les,))
+        self._uncertainty_list[:] = self._random_uncertainty_terms(
+            num_les, element_ids=element_ids, counter=elapsed_time)
 
 
     def _allocate_uncertainty(self, num_les):
@@ -323,7 +370,6 @@ class CurrentMover(movers.PyMover):
             unrec = self._uncertainty_list
             u = new_deltas[:, 0]
             v = new_deltas[:, 1]
-            lengthS = np.hypot(u, v)
 
             #alpha = unrec.downStream
             #beta = unrec.crossStream
@@ -366,7 +412,8 @@ class CurrentMover(movers.PyMover):
 
         if sc.uncertain:
             elapsed_time = abs(seconds - self.model_start_time)
-            self._update_uncertainty(sc.num_released, elapsed_time)
+            self._update_uncertainty(sc.num_released, elapsed_time,
+                                     element_ids=sc['id'])
 
         return
 
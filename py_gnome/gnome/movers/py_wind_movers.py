@@ -183,12 +183,17 @@ class WindMover(movers.PyMover):
                                     sc['windage_range'][:, 1],
                                     sc['windages'],
                                     sc['windage_persist'],
-                                    time_step)
+                                    time_step,
+                                    element_ids=sc['id'],
+                                    key=self._random_key(
+                                        'windages', sc.uncertain,
+                                        model_time_datetime.isoformat()))
 
             if sc.uncertain:
                 elapsed_time = abs(seconds - self.model_start_time)
                 eddy_diffusion = 1000000.	#this is fixed, should it be an input?
-                self.update_uncertainty(sc.num_released, elapsed_time)
+                self.update_uncertainty(sc.num_released, elapsed_time,
+                                        element_ids=sc['id'])
                 self.uncertain_diffusion = np.sqrt(6 * (eddy_diffusion / 10000.) / abs(time_step))
 
         return
@@ -220,13 +225,29 @@ class WindMover(movers.PyMover):
         else:
             return super(WindMover, self).get_bounds()
 
-    def update_uncertainty(self, num_les, elapsed_time):
+    def _random_key(self, *parts):
+        """
+        key of the random streams for this mover -- the class and name, so
+        it's the same in every process (and run) the mover is loaded in
+        """
+        return ('{}.{}'.format(type(self).__name__, parts[0]),
+                self.name) + parts[1:]
+
+    def update_uncertainty(self, num_les, elapsed_time, element_ids=None):
         """
         update uncertainty
 
         :param num_les: the number released so far
         :param elapsed_time: time in seconds since model run started
+        :param element_ids=None: the ids of the elements -- the random terms
+                                 are drawn from the random streams for them.
+                                 If None, numpy's global random state is
+                                 used.
         """
+        if element_ids is not None and len(element_ids) != num_les:
+            # not lined up with the uncertainty list
+            element_ids = None
+
         need_to_reinit = False
         need_to_reallocate = False
 
@@ -254,31 +275,11 @@ class WindMover(movers.PyMover):
             need_to_reinit = True
 
         if need_to_reallocate and uncertain_list_size!=0:
-            a_append = np.zeros((num_les-uncertain_list_size,)+self.shape,dtype=np.float64)
-            cos_arg = np.zeros((num_les-uncertain_list_size,)+self.shape,dtype=np.float64)
-            srt = np.zeros((num_les-uncertain_list_size,)+self.shape,dtype=np.float64)
-            cos_arg = 2. * np.pi * np.random.uniform(0,1, size=(num_les-uncertain_list_size,))
-            srt = np.sqrt(-2. * np.log(np.random.uniform(0.001,.999, size=(num_les-uncertain_list_size,))))
-            # need a loop to check TermsLessThanMax fabs(self.sigma_theta * sinTerm/rndv2) <= angleMax (60)
-#             for i in range(num_les-uncertain_list_size):
-#                 for j in range(10):
-#                     if np.abs(self.sigma_theta * srt[i] * np.sin(cos_arg[i])) <= 60.:
-#                         break
-#                     cos_arg[i] = 2. * np.pi * np.random.uniform(0,1)
-#                     srt[i] = np.sqrt(-2. * np.log(np.random.uniform(0.001,.999)))
-#
-            bad_values = np.flatnonzero(np.abs(self.sigma_theta * srt * np.sin(cos_arg)) > 60.)
-            for i in bad_values:
-                for j in range(10):
-                    c = 2. * np.pi * np.random.uniform(0, 1)
-                    s = np.sqrt(-2. * np.log(np.random.uniform(0.001, .999)))
-                    if np.abs(self.sigma_theta * s * np.sin(c)) <= 60.:
-                        cos_arg[i] = c
-                        srt[i] = s
-                        break
-
-            a_append[:,0] = srt * np.cos(cos_arg) #cos term
-            a_append[:,1] = srt * np.sin(cos_arg) #sin term
+            a_append = self._random_uncertainty_terms(
+                num_les - uncertain_list_size,
+                element_ids=(None if element_ids is None
+                             else element_ids[uncertain_list_size:]),
+                counter=elapsed_time)
             self.uncertainty_list = np.r_[self.uncertainty_list, a_append]
 
         # question - should self.sigma2 change only when the duration value is exceeded ??
@@ -290,53 +291,89 @@ class WindMover(movers.PyMover):
 
         if need_to_reinit:
             self.allocate_uncertainty(num_les)
-            self.update_uncertainty_values(elapsed_time)
+            self.update_uncertainty_values(elapsed_time, element_ids)
         elif elapsed_time >= self.time_uncertainty_was_set + self.uncertain_duration:
-            self.update_uncertainty_values(elapsed_time)
+            self.update_uncertainty_values(elapsed_time, element_ids)
 
         return
 
 
-    def update_uncertainty_values(self, elapsed_time):
+    def update_uncertainty_values(self, elapsed_time, element_ids=None):
         """
         update uncertainty values
 
         :param elapsed_time: time in seconds since model run started
+        :param element_ids=None: the ids of the elements
         """
         self.time_uncertainty_was_set = elapsed_time
         num_les = len(self.uncertainty_list)
         if num_les==0:
             return
 
-        cos_arg = np.zeros((num_les,)+self.shape,dtype=np.float64)
-        srt = np.zeros((num_les,)+self.shape,dtype=np.float64)
-        cos_arg = 2. * np.pi * np.random.uniform(0,1, size=(num_les,))
-        srt = np.sqrt(-2. * np.log(np.random.uniform(0.001,.999, size=(num_les,))))
-        # need a loop to check TermsLessThanMax: fabs(self.sigma_theta * sinTerm/rndv2) <= angleMax (60)
-#         for i in range(0,num_les):
-#             for j in range(10):
-#                 if np.abs(self.sigma_theta * srt[i] * np.sin(cos_arg[i])) <= 60.:
-#                     print("values clean",i,j)
-#                     break
-#                 cos_arg[i] = 2. * np.pi * np.random.uniform(0,1)
-#                 srt[i] = np.sqrt(-2. * np.log(np.random.uniform(0.001,.999)))
-#
-#             #self.uncertainty_list[i,0] = srt * np.cos(cos_arg[i]) #cos term
-#             #self.uncertainty_list[i,1] = srt * np.sin(cos_arg[i]) #sin term
-#         self.uncertainty_list[:,0] = srt * np.cos(cos_arg) #cos term
-#         self.uncertainty_list[:,1] = srt * np.sin(cos_arg) #sin term
-        bad_values = np.flatnonzero(np.abs(self.sigma_theta * srt * np.sin(cos_arg)) > 60.)
-        for i in bad_values:
-            for j in range(10):
-                c = 2. * np.pi * np.random.uniform(0, 1)
-                s = np.sqrt(-2. * np.log(np.random.uniform(0.001, .999)))
-                if np.abs(self.sigma_theta * s * np.sin(c)) <= 60.:
-                    cos_arg[i] = c
-                    srt[i] = s
-                    break
-
-        self.uncertainty_list[:,0] = srt * np.cos(cos_arg) #cos term
-        self.uncertainty_list[:,1] = srt * np.sin(cos_arg) #sin term
+        self.uncertainty_list[:] = self._random_uncertainty_terms(
+            num_les, element_ids=element_ids, counter=elapsed_time)
+
+    def _uniform_pairs(self, num_les, element_ids, counter, attempt):
+        """
+        (num_les, 2) uniform random numbers in [0, 1) -- from the random
+        streams, keyed on the element ids, if there are ids
+        """
+        if element_ids is None:
+            return np.random.uniform(0, 1, size=(num_les, 2))
+
+        return rand.streams.element_uniform(
+            element_ids, *self._random_key('uncertainty', counter, attempt),
+            size=2)
+
+    def _random_uncertainty_terms(self, num_les, element_ids=None,
+                                  counter=0):
+        """
+        random (cos, sin) uncertainty terms for num_les elements
+
+        The terms are redrawn (up to 10 times) for the elements where
+        fabs(sigma_theta * sin term) > the max angle (60), as in
+        TermsLessThanMax in the C++ code -- all the elements that still need
+        it are redrawn together.
+
+        :param element_ids=None: the ids of the elements. If given, the
+                                 terms come from the random streams, keyed
+                                 on the ids, the counter and the attempt,
+                                 so they don't depend on how the elements
+                                 are split up.
+        :param counter=0: changes the terms drawn for the same elements --
+                          the elapsed time.
+        """
+        max_angle = 60.
+        max_tries = 10
+
+        rnd = self._uniform_pairs(num_les, element_ids, counter, 0)
+        cos_arg = 2. * np.pi * rnd[:, 0]
+        srt = np.sqrt(-2. * np.log(0.001 + 0.998 * rnd[:, 1]))
+
+        bad = np.flatnonzero(np.abs(self.sigma_theta * srt * np.sin(cos_arg))
+                             > max_angle)
+
+        for j in range(max_tries):
+            if len(bad) == 0:
+                break
+
+            rnd = self._uniform_pairs(len(bad),
+                                      None if element_ids is None
+                                      else element_ids[bad],
+                                      counter, j + 1)
+            c = 2. * np.pi * rnd[:, 0]
+            s = np.sqrt(-2. * np.log(0.001 + 0.998 * rnd[:, 1]))
+
+            good = np.abs(self.sigma_theta * s * np.sin(c)) <= max_angle
+            cos_arg[bad[good]] = c[good]
+            srt[bad[good]] = s[good]
+            bad = bad[~good]
+
+        terms = np.empty((num_les, 2), dtype=np.float64)
+        terms[:, 0] = srt * np.cos(cos_arg)  # cos term
+        terms[:, 1] = srt * np.sin(cos_arg)  # sin term
+
+        return terms
 
     def allocate_uncertainty(self, num_les):
         """
@@ -350,16 +387,22 @@ class WindMover(movers.PyMover):
         return
 
 
-    def add_uncertainty(self, deltas, time_step):
+    def add_uncertainty(self, deltas, time_step, element_ids=None,
+                        counter=None):
         """
         add uncertainty
 
         :param deltas: the movement for the current time step
+        :param element_ids=None: the ids of the elements -- the random
+                                 diffusion of the ones in low winds is drawn
+                                 from the random streams for them. If None,
+                                 numpy's global random state is used.
+        :param counter=None: changes the numbers drawn for the same
+                             elements -- the model time.
         """
         if self.uncertainty_list is None or len(self.uncertainty_list)==0:
             return deltas # this is our clue to not add uncertainty
 
-        num_les = len(self.uncertainty_list)
         if len(self.uncertainty_list)>0:
             #make a copy of deltas
             new_deltas=deltas.copy()
@@ -394,12 +437,20 @@ class WindMover(movers.PyMover):
             deltas[:,0] = (u * cos_theta - v * sin_theta) * time_step
             deltas[:,1] = (v * cos_theta + u * sin_theta) * time_step
 
-            for i in range(0,num_les):
-                if norm[i] < 1:
-                    rand1 = np.random.uniform(-1., 1.)
-                    rand2 = np.random.uniform(-1., 1.)
-                    deltas[i,0] = u[i] * self.uncertain_diffusion * rand1
-                    deltas[i,1] = v[i] * self.uncertain_diffusion * rand2
+            # low wind speeds just get diffusion
+            slow = np.flatnonzero(norm < 1)
+            if len(slow) > 0:
+                if element_ids is None:
+                    rnd = np.random.uniform(-1., 1., size=(len(slow), 2))
+                else:
+                    rnd = rand.streams.element_uniform(
+                        np.asarray(element_ids)[slow],
+                        *self._random_key('diffusion', counter),
+                        size=2) * 2. - 1.
+                deltas[slow, 0] = (u[slow] * self.uncertain_diffusion *
+                                   rnd[:, 0])
+                deltas[slow, 1] = (v[slow] * self.uncertain_diffusion *
+                                   rnd[:, 1])
 
         else:
             raise ValueError("something wrong with uncertainty")
@@ -430,10 +481,20 @@ class WindMover(movers.PyMover):
             status = sc['status_codes'] != oil_status.in_water
             pos = positions[:]
 
-            deltas = self.delta_method(num_method)(sc, time_step, model_time_datetime, pos, self.wind)
+            tracking = getattr(self.wind, 'reuse_cell_locations', False)
+            if tracking:
+                self.wind.track_elements(sc['id'], sc.uncertain)
+
+            try:
+                deltas = self.delta_method(num_method)(sc, time_step, model_time_datetime, pos, self.wind)
+            finally:
+                if tracking:
+                    self.wind.track_elements(None)
 
             if sc.uncertain:
-                deltas = self.add_uncertainty(deltas, time_step)
+                deltas = self.add_uncertainty(
+                    deltas, time_step, element_ids=sc['id'],
+                    counter=model_time_datetime.isoformat())
 
             deltas[:, 0] *= sc['windages'] * self.scale_value
             deltas[:, 1] *= sc['windages'] * self.scale_value
@@ -16,9 +16,36 @@ from gnome.environment.gridded_objects_base import VariableSchema
 
 from gnome.movers import CyMover, ProcessSchema
 from gnome.persist.extend_colander import LocalDateTime
+from gnome.utilities import rand
 from gnome.utilities.inf_datetime import InfTime, MinusInfTime
 
 
+# as in the C++ (METERSPERDEGREELAT, INFINITE_DEPTH)
+METERS_PER_DEGREE_LAT = 111120.00024
+INFINITE_DEPTH = 5000.
+
+
+def _random_walk_uniforms(mover, sc, model_time_datetime, moving, size):
+    """
+    (number moving, size) uniform random numbers in [0, 1) for the elements
+    that move -- from the random streams, keyed on the element ids, so an
+    element moves the same however the elements are split up
+
+    The key also has the number of moves the mover has made for the spill
+    container this run (mover._num_moves), so the numbers change even if
+    it is called at the same time again.
+    """
+    uncertain = int(sc.uncertain)
+    num_moves = mover._num_moves[uncertain]
+    mover._num_moves[uncertain] += 1
+
+    return rand.streams.element_uniform(
+        sc['id'][moving],
+        '{}.diffusion'.format(type(mover).__name__), mover.name,
+        uncertain, model_time_datetime.isoformat(), num_moves,
+        size=size)
+
+
 class RandomMoverSchema(ProcessSchema):
     diffusion_coef = SchemaNode(Float(), save=True, update=True, missing=drop)
     uncertain_factor = SchemaNode(Float(), save=True, update=True,
@@ -30,7 +57,8 @@ class RandomMoverSchema(ProcessSchema):
 class RandomMover(CyMover):
     # This mover class inherits from CyMover and contains CyRandomMover
 
-    # The real work is done by CyRandomMover.
+    # CyRandomMover holds the parameters. The move is computed here, with
+    # the random numbers from the random streams.
     # CyMover sets everything up that is common to all movers.
     """
     "Random Walk" diffusion mover
@@ -64,6 +92,10 @@ class RandomMover(CyMover):
 
         super(RandomMover, self).__init__(**kwargs)
 
+        # set by prepare_for_model_run(), as in the C++
+        self._first_step = False
+        self._num_moves = [0, 0]
+
     @property
     def data_start(self):
         return MinusInfTime()
@@ -88,6 +120,59 @@ class RandomMover(CyMover):
     def uncertain_factor(self, value):
         self.mover.uncertain_factor = value
 
+    def prepare_for_model_run(self):
+        super(RandomMover, self).prepare_for_model_run()
+
+        self._first_step = True
+        self._num_moves = [0, 0]
+
+    def model_step_is_done(self, sc=None):
+        super(RandomMover, self).model_step_is_done(sc)
+
+        self._first_step = False
+
+    def get_move(self, sc, time_step, model_time_datetime):
+        """
+        The random walk of the elements in the water at the surface
+
+        The same walk as the C++ mover (Random_c::GetMove) -- a random
+        vector in the unit circle on the first step, and in the unit square
+        after that, scaled by the diffusion -- with the random numbers from
+        the random streams.
+
+        :param sc: spill_container.SpillContainer object
+        :param time_step: time step in seconds
+        :param model_time_datetime: current model time as datetime object
+        """
+        positions = sc['positions']
+        deltas = np.zeros_like(positions)
+
+        if not self.active:
+            return deltas
+
+        # for pyGNOME, subsurface diffusion is done by the vertical movers
+        moving = ((sc['status_codes'] == oil_status.in_water) &
+                  (positions[:, 2] <= 0))
+
+        factor = self.uncertain_factor if sc.uncertain else 1.
+        coef = (np.sqrt(factor * 6. * (self.diffusion_coef / 10000.) *
+                        abs(time_step)) / METERS_PER_DEGREE_LAT)
+
+        rnd = _random_walk_uniforms(self, sc, model_time_datetime, moving, 2)
+
+        if self._first_step:
+            radius = np.sqrt(rnd[:, 0])
+            angle = 2. * np.pi * rnd[:, 1]
+            rand1, rand2 = radius * np.cos(angle), radius * np.sin(angle)
+        else:
+            rand1, rand2 = 2. * rnd[:, 0] - 1., 2. * rnd[:, 1] - 1.
+
+        lat = np.deg2rad(positions[moving, 1])
+        deltas[moving, 0] = rand1 * coef / np.cos(lat)
+        deltas[moving, 1] = rand2 * coef
+
+        return deltas
+
     def __repr__(self):
         return ('RandomMover(diffusion_coef={0}, uncertain_factor={1}, '
                 'active_range={2}, on={3})'
@@ -196,7 +281,8 @@ class RandomMover3D(CyMover):
     """
     This mover class inherits from CyMover and contains CyRandomMover3D
 
-    The real work is done by CyRandomMover3D.
+    CyRandomMover3D holds the parameters. The move is computed here, with
+    the random numbers from the random streams.
     CyMover sets everything up that is common to all movers.
     """
     _schema = RandomMover3DSchema
@@ -238,6 +324,8 @@ class RandomMover3D(CyMover):
                                      )
         super().__init__(**kwargs)
 
+        self._num_moves = [0, 0]
+
     @property
     def horizontal_diffusion_coef_above_ml(self):
         return self.mover.horizontal_diffusion_coef_above_ml
@@ -286,6 +374,110 @@ class RandomMover3D(CyMover):
     def surface_is_allowed(self, value):
         self.mover.surface_is_allowed = value
 
+    def prepare_for_model_run(self):
+        super().prepare_for_model_run()
+
+        self._num_moves = [0, 0]
+
+    def get_move(self, sc, time_step, model_time_datetime):
+        """
+        The horizontal and vertical random walk of the elements in the water
+
+        The same walk as the C++ mover (RandomVertical_c::GetMove), with the
+        random numbers from the random streams: diffusion in the mixed
+        layer, reflected at its bottom, then the diffusion below it for all
+        the elements, reflected at the surface. There is no bathymetry --
+        the depth is INFINITE_DEPTH everywhere.
+
+        :param sc: spill_container.SpillContainer object
+        :param time_step: time step in seconds
+        :param model_time_datetime: current model time as datetime object
+        """
+        positions = sc['positions']
+        deltas = np.zeros_like(positions)
+
+        if not self.active:
+            return deltas
+
+        moving = sc['status_codes'] == oil_status.in_water
+        if self.surface_is_allowed:
+            moving &= positions[:, 2] > 0
+
+        eps = 1.e-6
+        dt = abs(time_step)
+        depth = INFINITE_DEPTH
+        mixed_layer_depth = min(self.mixed_layer_depth, depth)
+
+        z = positions[moving, 2]
+        rnd = _random_walk_uniforms(self, sc, model_time_datetime, moving, 6)
+
+        # horizontal
+        above = np.sqrt(6. * (self.horizontal_diffusion_coef_above_ml /
+                              10000.) * dt) / METERS_PER_DEGREE_LAT
+        below = np.sqrt(6. * (self.horizontal_diffusion_coef_below_ml /
+                              10000.) * dt) / METERS_PER_DEGREE_LAT
+        coef = np.where(z > self.mixed_layer_depth, below, above)
+
+        lat = np.deg2rad(positions[moving, 1])
+        deltas[moving, 0] = (2. * rnd[:, 0] - 1.) * coef / np.cos(lat)
+        deltas[moving, 1] = (2. * rnd[:, 1] - 1.) * coef
+
+        # vertical -- in the mixed layer
+        dz = np.zeros_like(z)
+        total = z.copy()
+        in_ml = z <= mixed_layer_depth
+
+        if self.vertical_diffusion_coef_above_ml == 0:
+            # these don't move vertically at all
+            done = in_ml
+        else:
+            done = np.zeros_like(in_ml)
+
+            coef = np.sqrt(6. * (self.vertical_diffusion_coef_above_ml /
+                                 10000.) * dt)
+            dz[in_ml] = (2. * rnd[in_ml, 2] - 1.) * coef
+            total[in_ml] = z[in_ml] + dz[in_ml]
+
+            # reflect about the mixed layer depth -- if that goes above the
+            # surface, put it randomly into the mixed layer
+            over = in_ml & (total > mixed_layer_depth)
+            dz[over] = mixed_layer_depth - (total[over] -
+                                            mixed_layer_depth) - z[over]
+
+            surfaced = over & (z + dz <= 0)
+            dz[surfaced] = (eps + (mixed_layer_depth - eps) *
+                            rnd[surfaced, 3] - z[surfaced])
+
+        # below the mixed layer -- for all of them
+        if (mixed_layer_depth != depth and
+                self.vertical_diffusion_coef_below_ml != 0):
+            coef = np.sqrt(6. * (self.vertical_diffusion_coef_below_ml /
+                                 10000.) * dt)
+            dz = dz + (2. * rnd[:, 4] - 1.) * coef
+            total = z + dz
+
+        # the surface and bottom
+        at_surface = ~done & (total == 0)
+        dz[at_surface] = eps - z[at_surface]
+
+        reflected = ~done & (total < 0)
+        dz[reflected] = -total[reflected] - z[reflected]
+
+        at_bottom = ~done & (total == depth)
+        dz[at_bottom] = depth - eps - z[at_bottom]
+
+        bounced = ~done & (total > depth)
+        dz[bounced] = depth - (total[bounced] - depth) - z[bounced]
+
+        # put the ones that went out the other way randomly into the column
+        lost = (reflected & (z + dz > depth)) | (bounced & (z + dz <= 0))
+        dz[lost] = eps + (depth - 2. * eps) * rnd[lost, 5] - z[lost]
+
+        dz[done] = 0.
+        deltas[moving, 2] = dz
+
+        return deltas
+
     def __repr__(self):
         return ('RandomMover3D(vertical_diffusion_coef_above_ml={0}, '
                 'vertical_diffusion_coef_below_ml={1}, mixed_layer_depth={2}, '
@@ -164,7 +164,12 @@ class ShipDriftMover(Mover):
                                          sc['windage_range'][:, 1],
                                          sc['windages'],
                                          sc['windage_persist'],
-                                         time_step)
+                                         time_step,
+                                         element_ids=sc['id'],
+                                         key=('ShipDriftMover.windages',
+                                              self.name, int(sc.uncertain),
+                                              model_time_datetime
+                                              .isoformat()))
 
     def prepare_data_for_get_move(self, sc, model_time_datetime):
         """
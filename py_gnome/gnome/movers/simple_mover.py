@@ -14,11 +14,10 @@ import copy
 
 import numpy as np
 
-from numpy import random
-
 from colander import (SchemaNode, Float)
 
 from gnome.basic_types import oil_status, mover_type
+from gnome.utilities import rand
 from gnome.utilities.projections import FlatEarthProjection as proj
 
 from gnome.movers import Mover, ProcessSchema
@@ -124,15 +123,17 @@ class SimpleMover(Mover):
             # add some random stuff if uncertainty is on
 
             if spill.uncertain:
-                num = sum(in_water_mask)
                 scale = self.uncertainty_scale * self.velocity \
                     * time_step
-                delta[in_water_mask, 0] += random.uniform(-scale[0], scale[0],
-                                                          num)
-                delta[in_water_mask, 1] += random.uniform(-scale[1], scale[1],
-                                                          num)
-                delta[in_water_mask, 2] += random.uniform(-scale[2], scale[2],
-                                                          num)
+
+                # from the random streams, keyed on the element ids, so an
+                # element moves the same however the elements are split up
+                rnd = rand.streams.element_uniform(
+                    spill['id'][in_water_mask],
+                    'SimpleMover.uncertainty', self.name,
+                    model_time.isoformat(),
+                    size=3)
+                delta[in_water_mask] += scale * (2. * rnd - 1.)
 
             # scale for projection
 
@@ -198,6 +198,9 @@ class ModelConsumer(mp.Process):
         for dl in del_list:
             del self.model.outputters[dl.id]
 
+        # the WeatheringOutput only needs the mass balance
+        self.model._cache.cache_elements = False
+
 
 class ModelBroadcaster(GnomeId):
     '''
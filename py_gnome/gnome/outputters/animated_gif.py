@@ -130,7 +130,8 @@ class Animation(Renderer):
             self.copy_back_to_fore()
 
         # draw data for self.draw_ontop second so it draws on top
-        scp = self.cache.load_timestep(step_num).items()
+        scp = self.cache.load_timestep(step_num,
+                                       array_names=self.draw_arrays).items()
         if len(scp) == 1:
             self.draw_elements(scp[0])
         else:
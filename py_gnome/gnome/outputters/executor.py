@@ -0,0 +1,181 @@
+"""
+Running the outputters on their own threads
+
+The model calls the outputters after every step, on its own thread, and
+waits for them: rendering the PNG images, building hulls for the shape
+files, writing the KMZ and netcdf files all add to the time of each step.
+
+With the OutputExecutor, each outputter gets a worker thread and a queue
+of the calls the model makes to it -- prepare_for_model_step(),
+model_step_is_done() and write_output() -- which it runs in order. The
+model only waits when an outputter falls max_queued steps behind.
+
+write_output() gets a StepView of the cache (see gnome.utilities.cache) for
+its step: the read-only snapshot of the element data saved for the step, so
+the model can go on changing the elements. What write_output() returns is
+not passed back to the model, so these outputters are not in the output
+info of the steps.
+
+At the end of the run, join() waits for all the workers to finish, in the
+order of the outputters, and raises an OutputError if any of them failed --
+after which the model calls the outputters' post_model_run().
+
+Outputters that sample the movers or the environment when they write a step
+(the ice and current outputters, a Renderer drawing vector properties) set
+_parallel_output = False: they are called on the model thread, as before.
+So does the NetCDFOutput: the netCDF library is not thread safe, and the
+model reads its environment data from netCDF files on its own thread.
+"""
+
+import queue
+import threading
+
+from gnome.utilities.cache import StepView
+
+
+class OutputError(Exception):
+    'an outputter failed on its worker thread'
+    pass
+
+
+def _worker(tasks, errors):
+    """
+    body of an outputter's worker thread
+
+    Once a call has failed, the rest are skipped -- the outputter is in an
+    unknown state.
+    """
+    while True:
+        item = tasks.get()
+        try:
+            if item is None:
+                return
+
+            if not errors:
+                call, args, kwargs = item
+                call(*args, **kwargs)
+        except Exception as excp:
+            errors.append(excp)
+        finally:
+            tasks.task_done()
+
+
+def _write_step(outputter, cache, view, args, kwargs):
+    'write_output() with the StepView as the cache'
+    outputter.cache = view
+    try:
+        outputter.write_output(*args, **kwargs)
+    finally:
+        outputter.cache = cache
+
+
+class OutputWorker():
+    """
+    The worker thread and queue of calls of one outputter
+    """
+    def __init__(self, outputter, max_queued=4):
+        self.outputter = outputter
+
+        # outputter.cache is a StepView while it writes a step
+        self.cache = outputter.cache
+
+        # calls for max_queued steps -- three per step
+        self._tasks = queue.Queue(maxsize=3 * max_queued)
+        self.errors = []
+
+        self._thread = threading.Thread(target=_worker,
+                                        args=(self._tasks, self.errors),
+                                        name='OutputWorker-{}'
+                                        .format(outputter.name),
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, call, *args, **kwargs):
+        """
+        queue a call -- blocks if the queue is full
+
+        Raises an OutputError if an earlier call failed.
+        """
+        if self.errors:
+            raise OutputError('{} failed: {!r}'
+                              .format(self.outputter.name, self.errors[0]))
+
+        self._tasks.put((call, args, kwargs))
+
+    def join(self):
+        """
+        run all the queued calls and stop the thread
+
+        :returns: the exceptions raised by the calls
+        """
+        if self._thread is not None:
+            self._tasks.put(None)
+            self._thread.join()
+            self._thread = None
+
+        return self.errors
+
+
+class OutputExecutor():
+    """
+    Runs the outputters of a model run on worker threads
+    """
+    def __init__(self, outputters, max_queued=4):
+        """
+        :param outputters: the outputters of the model. The ones with
+                           _parallel_output set to False are called
+                           directly.
+
+        :param max_queued=4: the number of steps an outputter can fall
+                             behind before the model waits for it.
+        """
+        self._workers = {}
+
+        for outputter in outputters:
+            if outputter._parallel_output:
+                self._workers[id(outputter)] = OutputWorker(outputter,
+                                                            max_queued)
+
+    def call(self, outputter, method, *args, **kwargs):
+        """
+        Call a method of an outputter
+
+        The call is queued on the outputter's worker if it has one, and
+        None is returned. Otherwise it is made now, and the result is
+        returned.
+        """
+        worker = self._workers.get(id(outputter))
+
+        if worker is None:
+            return getattr(outputter, method)(*args, **kwargs)
+
+        if method == 'write_output':
+            # the step as it is now, for when the worker gets to it
+            step_num = args[0] if args else kwargs['step_num']
+            view = StepView(worker.cache, step_num)
+
+            worker.submit(_write_step, outputter, worker.cache, view,
+                          args, kwargs)
+        else:
+            worker.submit(getattr(outputter, method), *args, **kwargs)
+
+    def join(self, raise_errors=True):
+        """
+        Wait for the outputters to finish, one after the other in order,
+        and stop the workers
+
+        :param raise_errors=True: raise an OutputError if any of the
+                                  outputters failed.
+        """
+        failed = []
+        for worker in self._workers.values():
+            errors = worker.join()
+            if errors:
+                failed.append('{}: {!r}'.format(worker.outputter.name,
+                                                errors[0]))
+
+        self._workers = {}
+
+        if failed and raise_errors:
+            raise OutputError('outputters failed: {}'
+                              .format(', '.join(failed)))
@@ -4,17 +4,19 @@ Does not contain a schema for persistence yet
 '''
 
 import os
+import json
 from collections.abc import Iterable
 from glob import glob
 
 import numpy as np
 
 from geojson import (Feature, FeatureCollection, dump,
-                     Point, MultiPolygon)
+                     MultiPolygon)
 from gnome.persist import (SchemaNode, String, drop, Int, Boolean,
                            SequenceSchema, GeneralGnomeObjectSchema)
 
 from gnome.utilities.time_utils import date_to_sec
+from gnome.utilities import json_encoding
 
 from .outputter import Outputter, BaseOutputterSchema
 from gnome.movers.c_current_movers import IceMoverSchema
@@ -33,6 +35,12 @@ class TrajectoryGeoJsonSchema(BaseOutputterSchema):
     output_dir = SchemaNode(
         String(), missing=drop, save=True, update=True
     )
+    multipoint = SchemaNode(
+        Boolean(), missing=drop, save=True, update=True
+    )
+    binary_sidecar = SchemaNode(
+        Boolean(), missing=drop, save=True, update=True
+    )
 
 
 class TrajectoryGeoJsonOutput(Outputter):
@@ -68,6 +76,31 @@ class TrajectoryGeoJsonOutput(Outputter):
             ...
         }
 
+    With multipoint=True, each spill container is instead one Feature, with
+    a MultiPoint of all the elements, and the properties as lists in the
+    same order::
+
+        {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "MultiPoint",
+                    "coordinates": [[<LONGITUDE>, <LATITUDE>], ...]
+                },
+                "properties": {
+                    "sc_type": <FORECAST OR UNCERTAIN>,
+                    "id": [<PARTICLE_ID>, ...],
+                    "status_code": [...],
+                    "mass": [...],
+                    "spill_num": [...]
+                }
+            }
+        }
+
+    Either way, the JSON is written straight from the element arrays (see
+    gnome.utilities.json_encoding).
     '''
     _schema = TrajectoryGeoJsonSchema
 
@@ -75,6 +108,8 @@ class TrajectoryGeoJsonOutput(Outputter):
                  round_data=True,
                  round_to=4,
                  output_dir=None,
+                 multipoint=False,
+                 binary_sidecar=False,
                  **kwargs):
         '''
         :param bool round_data=True: if True, then round the numpy arrays
@@ -83,14 +118,21 @@ class TrajectoryGeoJsonOutput(Outputter):
         :param int round_to=4: round float arrays to these number of digits.
             Default is 4.
         :param str output_dir=None: output directory for geojson files. Default
-            is None since data is returned in dict for webapi. For using
+            is None since data is returned in dict for webapi. If it is set,
+            the data is only written to the files. For using
             write_output_post_run(), this must be set
+        :param bool multipoint=False: if True, output one MultiPoint Feature
+            per spill container, rather than a Point Feature per element.
+        :param bool binary_sidecar=False: if True, also write the element
+            data to a numpy .npz file next to each geojson file.
 
         use super to pass optional ``**kwargs`` to base class __init__ method
         '''
         self.round_data = round_data
         self.round_to = round_to
         self.output_dir = output_dir
+        self.multipoint = multipoint
+        self.binary_sidecar = binary_sidecar
 
         super(TrajectoryGeoJsonOutput, self).__init__(output_dir=output_dir,
                                                       **kwargs)
@@ -119,63 +161,110 @@ class TrajectoryGeoJsonOutput(Outputter):
         if not self._write_step:
             return None
 
-        # one feature per element client; replaced with multipoint
-        # because client performance is much more stable with one
-        # feature per step rather than (n) features per step.features = []
-        c_features = []
-        uc_features = []
+        c_geojson = uc_geojson = self._feature_collection_json([])
+        sidecar = {}
 
         for sc in self.cache.load_timestep(step_num).items():
-            position = self._dataarray_p_types(sc['positions'])
-            status = self._dataarray_p_types(sc['status_codes'])
-            mass = self._dataarray_p_types(sc['mass'])
-
             sc_type = 'uncertain' if sc.uncertain else 'forecast'
-            spill_num = self._dataarray_p_types(sc['spill_num'])
-
-            # break elements into multipoint features based on their
-            # status code
-            #   evaporated : 10
-            #   in_water : 2
-            #   not_released : 0
-            #   off_maps : 7
-            #   on_land : 3
-            #   to_be_removed : 12
-            for ix, pos in enumerate(position):
-                feature = Feature(geometry=Point(pos[:2]), id=ix,
-                                  properties={'status_code': status[ix],
-                                              'sc_type': sc_type,
-                                              'mass': mass[ix],
-                                              'spill_num': spill_num[ix]}
-                                  )
-                if sc.uncertain:
-                    uc_features.append(feature)
-                else:
-                    c_features.append(feature)
-
-        c_geojson = FeatureCollection(c_features)
-        uc_geojson = FeatureCollection(uc_features)
+            columns = {'longitude': sc['positions'][:, 0],
+                       'latitude': sc['positions'][:, 1],
+                       'status_code': sc['status_codes'],
+                       'mass': sc['mass'],
+                       'spill_num': sc['spill_num']}
 
-        # default geojson should not output data to file
-        # read data from file and send it to web client
-        output_info = {'time_stamp': sc.current_time_stamp.isoformat(),
-                       'certain': c_geojson,
-                       'uncertain': uc_geojson}
+            if self.multipoint:
+                features = [self._multipoint_json(columns, sc_type)]
+            else:
+                features = self._point_features_json(columns, sc_type)
+
+            if sc.uncertain:
+                uc_geojson = self._feature_collection_json(features)
+            else:
+                c_geojson = self._feature_collection_json(features)
+
+            sidecar.update({'{}_{}'.format(sc_type, name): arr
+                            for name, arr in columns.items()})
+
+        output_info = {'time_stamp': sc.current_time_stamp.isoformat()}
 
         if self.output_dir:
+            # the JSON is in the file -- it is not parsed back
             output_info['output_filename'] = self.output_to_file(c_geojson,
                                                                  step_num)
             self.output_to_file(uc_geojson, step_num)
 
+            if self.binary_sidecar:
+                json_encoding.write_sidecar(
+                    os.path.splitext(output_info['output_filename'])[0] +
+                    '.npz', sidecar)
+        else:
+            # default geojson should not output data to file
+            # the features are sent to the web client
+            output_info['certain'] = json.loads(c_geojson)
+            output_info['uncertain'] = json.loads(uc_geojson)
+
         return output_info
 
+    @property
+    def _decimals(self):
+        return self.round_to if self.round_data else None
+
+    def _point_features_json(self, columns, sc_type):
+        """
+        JSON text of a Point Feature for each element -- as a list of one
+        string, with all the features separated by commas
+        """
+        if len(columns['longitude']) == 0:
+            return []
+
+        def fmt(name):
+            return json_encoding.format_values(columns[name], self._decimals)
+
+        ids = json_encoding.format_values(np.arange(len(columns['mass'])))
+
+        records = json_encoding.format_records(
+            b'{"type": "Feature", "geometry": {"type": "Point", '
+            b'"coordinates": [', fmt('longitude'), b', ', fmt('latitude'),
+            b']}, "id": ', ids,
+            b', "properties": {"status_code": ', fmt('status_code'),
+            b', "sc_type": "', sc_type.encode('ascii'),
+            b'", "mass": ', fmt('mass'),
+            b', "spill_num": ', fmt('spill_num'), b'}}')
+
+        return [json_encoding.join_values(records).decode('ascii')]
+
+    def _multipoint_json(self, columns, sc_type):
+        """
+        JSON text of one MultiPoint Feature of all the elements
+        """
+        coords = np.column_stack((columns['longitude'], columns['latitude']))
+        properties = {'sc_type': sc_type,
+                      'id': np.arange(len(coords)),
+                      'status_code': columns['status_code'],
+                      'mass': columns['mass'],
+                      'spill_num': columns['spill_num']}
+
+        return json_encoding.encode({'type': 'Feature',
+                                     'geometry': {'type': 'MultiPoint',
+                                                  'coordinates': coords},
+                                     'properties': properties},
+                                    decimals=self._decimals)
+
+    @staticmethod
+    def _feature_collection_json(features):
+        return ('{"type": "FeatureCollection", "features": [' +
+                ', '.join(features) + ']}')
+
     def output_to_file(self, json_content, step_num):
         file_format = 'geojson_{0:06d}.geojson'
         filename = os.path.join(self.output_dir,
                                 file_format.format(step_num))
 
         with open(filename, 'w+', encoding='utf-8') as outfile:
-            dump(json_content, outfile, indent=4)
+            if isinstance(json_content, str):
+                outfile.write(json_content)
+            else:
+                dump(json_content, outfile, indent=4)
 
         return filename
 
@@ -264,6 +353,9 @@ class IceGeoJsonOutput(Outputter):
     '''
     _schema = IceGeoJsonSchema
 
+    # samples the movers -- run on the model thread
+    _parallel_output = False
+
     def __init__(self, ice_movers, **kwargs):
         '''
             :param ice_movers: ice_movers associated with this outputter.
@@ -47,6 +47,9 @@ class IceImageOutput(Outputter):
     '''
     _schema = IceImageSchema
 
+    # samples the movers -- run on the model thread
+    _parallel_output = False
+
     def __init__(self, ice_movers=None,
                  image_size=(800, 600),
                  projection=None,
@@ -191,7 +194,8 @@ class IceImageOutput(Outputter):
 
         # fixme -- doing all this cache stuff just to get the timestep..
         # maybe timestep should be passed in.
-        for sc in self.cache.load_timestep(step_num).items():
+        for sc in self.cache.load_timestep(step_num,
+                                           array_names=()).items():
             model_time = date_to_sec(sc.current_time_stamp)
             iso_time = sc.current_time_stamp.isoformat()
 
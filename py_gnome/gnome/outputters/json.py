@@ -3,6 +3,7 @@ JSON outputter
 Does not contain a schema for persistence yet
 '''
 
+import os
 import copy
 import numpy as np
 import json
@@ -23,6 +24,7 @@ from gnome.movers.c_current_movers import CatsMoverSchema,\
     IceMoverSchema
 from gnome.movers.c_wind_movers import PointWindMoverSchema
 from gnome.utilities.hull import calculate_hull, calculate_contours
+from gnome.utilities import json_encoding
 
 
 class SpillJsonSchema(BaseOutputterSchema):
@@ -158,12 +160,14 @@ class SpillJsonOutput(Outputter):
 
         sp = self.cache.load_timestep(step_num).items()
         for sc in sp:
+            # the arrays are rounded here, and converted to lists (or
+            # written to a file) at the end
             position = sc['positions']
-            longitude = np.around(position[:, 0], 5).tolist()
-            latitude = np.around(position[:, 1], 5).tolist()
-            status = sc['status_codes'].tolist()
-            mass = np.around(sc['mass'], 4).tolist()
-            spill_num = sc['spill_num'].tolist()
+            longitude = np.around(position[:, 0], 5)
+            latitude = np.around(position[:, 1], 5)
+            status = sc['status_codes']
+            mass = np.around(sc['mass'], 4)
+            spill_num = sc['spill_num']
             # break elements into multipoint features based on their
             # status code
             #   evaporated : 10
@@ -184,9 +188,9 @@ class SpillJsonOutput(Outputter):
             if self._additional_data and len(self._additional_data) > 0:
                 for d in self._additional_data:
                     if d == 'viscosity' or d == 'surface_concentration':
-                        out[d] = np.around(sc[d], 8).tolist()
+                        out[d] = np.around(sc[d], 8)
                     else:
-                        out[d] = np.around(sc[d], 4).tolist()
+                        out[d] = np.around(sc[d], 4)
 
             if sc.uncertain:
                 uncertain_scs.append(out)
@@ -262,12 +266,29 @@ class SpillJsonOutput(Outputter):
                        'uncertain_bounds': uncertain_bounds_scs}
 
         if self.output_dir:
-            output_info['output_filename'] = self.output_to_file(certain_scs,
+            output_info['output_filename'] = self.output_to_file(output_info,
                                                                  step_num)
-            self.output_to_file(uncertain_scs, step_num)
+
+        for out in certain_scs + uncertain_scs:
+            for name, val in out.items():
+                if isinstance(val, np.ndarray):
+                    out[name] = val.tolist()
 
         return output_info
 
+    def output_to_file(self, output_info, step_num):
+        '''
+        write the output of a step to a JSON file -- straight from the
+        element arrays (see gnome.utilities.json_encoding)
+        '''
+        filename = os.path.join(self.output_dir,
+                                'spill_json_{0:06d}.json'.format(step_num))
+
+        with open(filename, 'w', encoding='utf-8') as outfile:
+            outfile.write(json_encoding.encode(output_info))
+
+        return filename
+
 
 class CurrentJsonSchema(BaseOutputterSchema):
     current_movers = SequenceSchema(
@@ -316,6 +337,9 @@ class CurrentJsonOutput(Outputter):
     '''
     _schema = CurrentJsonSchema
 
+    # samples the movers -- run on the model thread
+    _parallel_output = False
+
     def __init__(self, current_movers, **kwargs):
         '''
         :param list current_movers: A list or collection of current grid mover
@@ -435,6 +459,9 @@ class IceJsonOutput(Outputter):
     '''
     _schema = IceJsonSchema
 
+    # samples the movers -- run on the model thread
+    _parallel_output = False
+
     def __init__(self, ice_movers, **kwargs):
         '''
             :param ice_movers: ice_movers associated with this outputter.
@@ -119,7 +119,10 @@ class KMZOutput(OutputterFilenameMixin, Outputter):
 
         # add to the kml list:
         if self._write_step:
-            for sc in self.cache.load_timestep(step_num).items():
+            for sc in self.cache.load_timestep(step_num,
+                                               array_names=('positions',
+                                                            'status_codes')
+                                               ).items():
                 # loop through uncertain and certain LEs
                 # extract the data
                 start_time = sc.current_time_stamp
@@ -35,6 +35,13 @@ var_attributes = {
                        'long_name': 'number of particles in a given timestep',
                        'ragged_row_count': 'particle count at nth timestep',
                        },
+    'particle_start_index': {'units': '1',
+                             'long_name': ('index of the first particle in a '
+                                           'given timestep'),
+                             'comment': ('cumulative sum of particle_count -- '
+                                         'so a timestep can be read without '
+                                         'summing the counts before it'),
+                             },
     'longitude': {'long_name': 'longitude of the particle',
                   'standard_name': 'longitude',
                   'units': 'degrees_east',
@@ -178,6 +185,9 @@ class NetCDFOutputSchema(BaseOutputterSchema):
     zip_output = SchemaNode(
         Boolean(), missing=drop, save=True, update=True
     )
+    output_buffer_steps = SchemaNode(
+        Int(), missing=drop, save=True, update=True
+    )
 
 
 class NetCDFOutput(Outputter, OutputterFilenameMixin):
@@ -218,6 +228,20 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
     which_data_lu = {'standard', 'most', 'all'}
     compress_lu = {True, False}
 
+    # the netCDF library is not thread safe, and the model reads its
+    # environment data from netCDF files -- run on the model thread
+    _parallel_output = False
+
+    # chunk size limits (in particles) for the per-particle variables when
+    # chunksize is not set.
+    # 1k is about right for 1000LEs and one time step.
+    # up to 0.5MB tested better for large datasets, but
+    # we don't want to have far-too-large files for the
+    # smaller ones
+    # The default in netcdf4 is 1 -- which works really badly
+    default_chunksize = 1024
+    max_chunksize = 128 * 1024
+
     cf_attributes = {'comment': 'Particle output from the NOAA PyGnome model',
                      'source': 'PyGnome version {0}'.format(__version__),
                      'references': 'TBD',
@@ -278,7 +302,9 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
                  # FIXME: this should not be default, but since we don't have
                  #        a way for WebGNOME to set it yet..
                  surface_conc="kde",
+                 output_buffer_steps=10,
                  # _middle_of_run=False,
+                 # ignored -- it is where the files are up to
                  _start_idx=0,
                  **kwargs):
         """
@@ -301,6 +327,12 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
             attributes
         :type which_data: string -- one of {'standard', 'most', 'all'}
 
+        :param output_buffer_steps=10: number of output steps to hold in
+            memory before they are written to the file. The files are kept
+            open for the run, and the buffered steps are written as one
+            contiguous block per variable. The buffer is always written at the
+            last step and in post_model_run.
+
         NOTE: if you want a custom set of output arrays, you can cahnge the
         `.self.arrays_to_output` set after initialization.
 
@@ -365,16 +397,17 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
         else:
             raise ValueError('compress must be one of: {True, False}')
 
-        # 1k is about right for 1000LEs and one time step.
-        # up to 0.5MB tested better for large datasets, but
-        # we don't want to have far-too-large files for the
-        # smaller ones
-        # The default in netcdf4 is 1 -- which works really badly
-        self._chunksize = 1024
+        # chunk size of the per-particle variables
+        # if None, it is set from the number of elements in
+        # prepare_for_model_run
+        self._chunksize = None
+
+        self.output_buffer_steps = output_buffer_steps
 
-        # need to keep track of starting index for writing data since variable
-        # number of particles are released
-        self._start_idx = _start_idx
+        # the open datasets, and the output steps waiting to be written to
+        # them -- keyed by the uncertain flag
+        self._datasets = {}
+        self._buffers = {}
 
         # define NetCDF variable attributes that are instance attributes here
         # It is set in prepare_for_model_run():
@@ -411,8 +444,27 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
             raise ValueError('which_data must be one of: '
                              '{"standard", "most", "all"}')
 
+    @property
+    def _start_idx(self):
+        '''
+        where the data of the next output step starts in the (certain)
+        file: the elements written to it, and the ones buffered -- the
+        particle_start_index the step will get. 0 if no file is open.
+        '''
+        rootgrp = self._datasets.get(False)
+
+        if rootgrp is None or not rootgrp.isopen():
+            return 0
+
+        return (len(rootgrp.dimensions['data']) +
+                sum(step[1] for step in self._buffers[False]))
+
     @property
     def chunksize(self):
+        '''
+        chunk size of the per-particle variables. If None, it is set from
+        the number of elements the spills release
+        '''
         return self._chunksize
 
     @chunksize.setter
@@ -484,6 +536,23 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
 
         return rootgrp
 
+    def _data_chunksize(self, spills):
+        '''
+        chunk size for the per-particle variables
+
+        If chunksize is not set, make a chunk about the size of one buffered
+        write for the number of elements the spills will release, between
+        default_chunksize and max_chunksize
+        '''
+        if self._chunksize is not None:
+            return self._chunksize
+
+        num_elements = sum(spill.num_elements or 0 for spill in spills)
+
+        return int(np.clip(num_elements * self.output_buffer_steps,
+                           self.default_chunksize,
+                           self.max_chunksize))
+
     def _update_arrays_to_output(self, sc):
         'create list of variables that we want to put in the file'
         if self.which_data in ('all', 'most'):
@@ -569,6 +638,11 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
         self._check_is_dir(self.filename)
         self._update_var_attributes(spills)
 
+        # in case the last run was not finished
+        self._close_datasets()
+
+        chunksize = self._data_chunksize(spills)
+
         for sc in self.sc_pair.items():
             if sc.uncertain:
                 file_ = self._u_filename
@@ -578,75 +652,79 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
             self._file_exists_error(file_)
 
             # create the netcdf files and write the standard stuff:
-            with nc.Dataset(file_, 'w', format=self._format) as rootgrp:
-                self._initialize_rootgrp(rootgrp, sc)
-
-                # create a dict with dims {2: 'two', 3: 'three' ...}
-                # use this to define the NC variable's shape in code below
-                d_dims = {len(dim): name
-                          for name, dim in rootgrp.dimensions.items()
-                          if len(dim) > 0}
-
-                # create the time/particle_count variables
-                self._create_nc_var(rootgrp, 'time', np.float64,
-                                    ('time', ), (self._chunksize,))
-                self._create_nc_var(rootgrp, 'particle_count', np.int32,
-                                    ('time', ), (self._chunksize,))
-
-                self._update_arrays_to_output(sc)
-
-                for var_name in self.arrays_to_output:
-                    # the special cases:
-                    if var_name in ('latitude', 'longitude', 'depth'):
-                        # these don't  map directly to an array_type
-                        dt = world_point_type
-                        shape = ('data', )
-                        chunksz = (self._chunksize,)
+            # the file is kept open for the run
+            rootgrp = nc.Dataset(file_, 'w', format=self._format)
+            self._datasets[sc.uncertain] = rootgrp
+            self._buffers[sc.uncertain] = []
+
+            self._initialize_rootgrp(rootgrp, sc)
+
+            # create a dict with dims {2: 'two', 3: 'three' ...}
+            # use this to define the NC variable's shape in code below
+            d_dims = {len(dim): name
+                      for name, dim in rootgrp.dimensions.items()
+                      if len(dim) > 0}
+
+            # create the time/particle_count variables
+            self._create_nc_var(rootgrp, 'time', np.float64,
+                                ('time', ), (self.default_chunksize,))
+            self._create_nc_var(rootgrp, 'particle_count', np.int32,
+                                ('time', ), (self.default_chunksize,))
+            self._create_nc_var(rootgrp, 'particle_start_index', np.int64,
+                                ('time', ), (self.default_chunksize,))
+
+            self._update_arrays_to_output(sc)
+
+            for var_name in self.arrays_to_output:
+                # the special cases:
+                if var_name in ('latitude', 'longitude', 'depth'):
+                    # these don't  map directly to an array_type
+                    dt = world_point_type
+                    shape = ('data', )
+                    chunksz = (chunksize,)
+                else:
+                    # in prepare_for_model_run, nothing is released but
+                    # numpy arrays are initialized with 0 elements so use
+                    # the arrays to get shape and dtype instead of the
+                    # array_types since array_type could contain None for
+                    # shape
+                    try:
+                        dt = sc[var_name].dtype
+                    except KeyError:  # ignore arrays that aren't there
+                        pass
                     else:
-                        # in prepare_for_model_run, nothing is released but
-                        # numpy arrays are initialized with 0 elements so use
-                        # the arrays to get shape and dtype instead of the
-                        # array_types since array_type could contain None for
-                        # shape
-                        try:
-                            dt = sc[var_name].dtype
-                        except KeyError:  # ignore arrays that aren't there
-                            pass
+                        if len(sc[var_name].shape) == 1:
+                            shape = ('data',)
+                            chunksz = (chunksize,)
                         else:
-                            if len(sc[var_name].shape) == 1:
-                                shape = ('data',)
-                                chunksz = (self._chunksize,)
-                            else:
-                                y_sz = d_dims[sc[var_name].shape[1]]
-                                shape = ('data', y_sz)
-                                chunksz = (self._chunksize,
-                                           sc[var_name].shape[1])
-
-                    self._create_nc_var(rootgrp, var_name, dt, shape, chunksz)
-
-                # Add subgroup for mass_balance - could do it w/o subgroup
-                if sc.mass_balance:
-                    grp = rootgrp.createGroup('mass_balance')
-
-                    # give this grp a dimension for time
-                    grp.createDimension('time', None)  # unlimited
-
-                    for key in sc.mass_balance:
-                        # mass_balance variables get a smaller chunksize
-                        self._create_nc_var(grp,
-                                            var_name=key,
-                                            dtype='float',
-                                            shape=('time',),
-                                            chunksz=(256,))
+                            y_sz = d_dims[sc[var_name].shape[1]]
+                            shape = ('data', y_sz)
+                            chunksz = (chunksize,
+                                       sc[var_name].shape[1])
+
+                self._create_nc_var(rootgrp, var_name, dt, shape, chunksz)
+
+            # Add subgroup for mass_balance - could do it w/o subgroup
+            if sc.mass_balance:
+                grp = rootgrp.createGroup('mass_balance')
+
+                # give this grp a dimension for time
+                grp.createDimension('time', None)  # unlimited
+
+                for key in sc.mass_balance:
+                    # mass_balance variables get a smaller chunksize
+                    self._create_nc_var(grp,
+                                        var_name=key,
+                                        dtype='float',
+                                        shape=('time',),
+                                        chunksz=(256,))
+
+            rootgrp.sync()
 
         # so that we can guard against post_model_run being called twice.
         # called after the netcdf file is created
         self.cleaned_up = False  # so that we can guard against post_model_run being called twice.
 
-        # need to keep track of starting index for writing data since variable
-        # number of particles are released
-        self._start_idx = 0
-
     def _create_nc_var(self, grp, var_name, dtype, shape, chunksz):
         # fixme: why is this even here? it's wrapping a single call???
         if dtype == bool:
@@ -717,73 +795,126 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
         if self.on is False:
             return None
 
-        if self._write_step:
-            for sc in self.cache.load_timestep(step_num).items():
-                if sc.uncertain and self._u_filename is not None:
-                    file_ = self._u_filename
-                else:
-                    file_ = self.forecast_filename
-
-                time_stamp = sc.current_time_stamp
-
-                with nc.Dataset(file_, 'a') as rootgrp:
-                    rg_vars = rootgrp.variables
-                    idx = len(rg_vars['time'])
-
-                    rg_vars['time'][idx] = nc.date2num(time_stamp,
-                                                       rg_vars['time'].units,
-                                                       rg_vars['time'].calendar)
-                    pc = rg_vars['particle_count']
-                    pc[idx] = len(sc)
-
-                    _end_idx = self._start_idx + pc[idx]
-
-                    # add the data:
-                    for var_name in self.arrays_to_output:
-                        # special case positions:
-                        if var_name == 'longitude':
-                            rg_vars['longitude'][self._start_idx:_end_idx] = sc['positions'][:, 0]
-                        elif var_name == 'latitude':
-                            rg_vars['latitude'][self._start_idx:_end_idx] = sc['positions'][:, 1]
-                        elif var_name == 'depth':
-                            rg_vars['depth'][self._start_idx:_end_idx] = sc['positions'][:, 2]
-                        else:
-                            rg_vars[var_name][self._start_idx:_end_idx] = sc[var_name]
-
-                    # write mass_balance data
-                    if sc.mass_balance:
-                        grp = rootgrp.groups['mass_balance']
-                        for key, val in sc.mass_balance.items():
-                            if key not in grp.variables:
-                                self._create_nc_var(grp,
-                                                    key, 'float', ('time', ),
-                                                    (self._chunksize,)
-                                                    )
-                            grp.variables[key][idx] = val
-
-        # if islast_step:
-        #     if self.zip_output is True:
-        #         self._zip_output_files()
-
         if not self._write_step:
             return None
 
-        self._start_idx = _end_idx  # set _start_idx for the next timestep
+        # only load the arrays that are written
+        array_names = self.arrays_to_output - self.special_arrays
+        array_names.add('positions')
+
+        for sc in self.cache.load_timestep(step_num,
+                                           array_names=array_names).items():
+            time_stamp = sc.current_time_stamp
+
+            data = {}
+            for var_name in self.arrays_to_output:
+                # special case positions:
+                if var_name == 'longitude':
+                    data[var_name] = sc['positions'][:, 0]
+                elif var_name == 'latitude':
+                    data[var_name] = sc['positions'][:, 1]
+                elif var_name == 'depth':
+                    data[var_name] = sc['positions'][:, 2]
+                else:
+                    data[var_name] = sc[var_name]
+
+            # the cached arrays are read-only, so they are not copied
+            self._buffers[sc.uncertain].append((time_stamp,
+                                                len(sc),
+                                                data,
+                                                dict(sc.mass_balance)))
+
+        if (islast_step or
+                len(self._buffers[False]) >= self.output_buffer_steps):
+            self._flush()
+
+        if islast_step:
+            # write_output_post_run() does not call post_model_run()
+            self._close_datasets()
 
         return {'filename': (self.filename,
                              self._u_filename),
                 'time_stamp': time_stamp.isoformat()}
 
+    def _flush(self):
+        '''
+        write the buffered output steps to the files
+
+        each variable is written as one contiguous block for all the
+        buffered steps
+        '''
+        for uncertain, steps in self._buffers.items():
+            if not steps:
+                continue
+
+            rootgrp = self._datasets[uncertain]
+            rg_vars = rootgrp.variables
+
+            time_idx = len(rootgrp.dimensions['time'])
+            data_idx = len(rootgrp.dimensions['data'])
+
+            time_stamps, counts, data, mass_balance = zip(*steps)
+            time_end = time_idx + len(steps)
+            data_end = data_idx + sum(counts)
+
+            rg_vars['time'][time_idx:time_end] = \
+                nc.date2num(list(time_stamps),
+                            rg_vars['time'].units,
+                            rg_vars['time'].calendar)
+            rg_vars['particle_count'][time_idx:time_end] = counts
+            rg_vars['particle_start_index'][time_idx:time_end] = \
+                data_idx + np.cumsum((0,) + counts[:-1])
+
+            # add the data:
+            for var_name in self.arrays_to_output:
+                rg_vars[var_name][data_idx:data_end] = \
+                    np.concatenate([d[var_name] for d in data])
+
+            # write mass_balance data
+            if any(mass_balance):
+                grp = rootgrp.groups['mass_balance']
+
+                for key in {key for mb in mass_balance for key in mb}:
+                    if key not in grp.variables:
+                        self._create_nc_var(grp,
+                                            key, 'float', ('time', ),
+                                            (self.default_chunksize,)
+                                            )
+
+                    # steps without this key are left as fill values
+                    vals = np.ma.masked_all((len(steps),))
+                    for ix, mb in enumerate(mass_balance):
+                        if key in mb:
+                            vals[ix] = mb[key]
+
+                    grp.variables[key][time_idx:time_end] = vals
+
+            rootgrp.sync()
+            del steps[:]
+
+    def _close_datasets(self):
+        '''
+        close the files -- anything in the buffer that was not flushed is
+        dropped
+        '''
+        for rootgrp in self._datasets.values():
+            if rootgrp.isopen():
+                rootgrp.close()
+
+        self._datasets = {}
+        self._buffers = {}
+
     def post_model_run(self):
         """
         This is where to clean up -- close files, etc.
         """
-        # NOTE: netcdf files are opened and closed with each write_timestep
-        #       so they don't need to be closed here.
-
         # Guard against being called twice
         # shouldn't be necessary, but the model is buggy in this regard ...
         if not self.cleaned_up:
+            if self._datasets:
+                self._flush()
+                self._close_datasets()
+
             if self.zip_output is True:
                 self._zip_output_files()
         self.cleaned_up = True
@@ -834,7 +965,7 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
         '''
         super(NetCDFOutput, self).rewind()
 
-        self._start_idx = 0
+        self._close_datasets()
 
     # fixme: we should use the code in nc_particles for this!!!
     @classmethod
@@ -904,10 +1035,7 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
         if not os.path.exists(netcdf_file):
             raise IOError('File not found: {0}'.format(netcdf_file))
 
-        arrays_dict = {}
         with nc.Dataset(netcdf_file) as data:
-            _start_ix = 0
-
             # first find the index of index in which we are interested
             time_ = data.variables['time']
 
@@ -933,45 +1061,157 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
                     if index < 0:
                         index = len(time_) + index
 
-            for idx in range(index):
-                _start_ix += data.variables['particle_count'][idx]
-
-            _stop_ix = _start_ix + data.variables['particle_count'][index]
-            elem = data.variables['particle_count'][index]
-
-            c_time = nc.num2date(time_[index], time_.units,
-                                 calendar=time_.calendar)
-
-            arrays_dict['current_time_stamp'] = np.array(c_time)
-
-            # figure out what arrays to read in:
-            if which_data == 'standard':
-                data_arrays = set(klass.standard_arrays)
-
-                # swap out positions:
-                [data_arrays.discard(x) for x in ('latitude',
-                                                  'longitude',
-                                                  'depth')]
-                data_arrays.add('positions')
-            elif which_data == 'all':
-                # pull them from the nc file
-                data_arrays = set(data.variables.keys())
-
-                # remove the irrelevant ones:
-                [data_arrays.discard(x) for x in ('time',
-                                                  'particle_count',
-                                                  'latitude',
-                                                  'longitude',
-                                                  'depth')]
-                data_arrays.add('positions')
-            else:  # should be list of data arrays
-                data_arrays = set(which_data)
-
-            # get the data
+            return klass._read_steps(data, [index], which_data)[0]
+
+    @classmethod
+    def read_data_steps(klass,
+                        netcdf_file,
+                        indices=None,
+                        start_time=None,
+                        end_time=None,
+                        which_data='standard'):
+        """
+        Read the data for many timesteps of a netcdf file that was created
+        with NetCDFOutput class.
+
+        Each variable is read once for each run of consecutive timesteps,
+        rather than once per timestep.
+
+        :param netcdf_file: Name of the NetCDF file from which to read the data
+
+        :param indices=None: indices of the 'time' variable to read. Negative
+                             indices count from the end. If None, the
+                             timesteps between start_time and end_time are
+                             read.
+
+        :param start_time=None: read the timesteps at or after this time.
+                                If None, from the first one.
+
+        :param end_time=None: read the timesteps at or before this time.
+                              If None, to the last one.
+
+        :param which_data='standard': Which data arrays are desired -- as for
+                                      read_data()
+
+        :return: A list of (arrays_dict, weathering_data) tuples, one for each
+                 timestep, as returned by read_data()
+        """
+        if not os.path.exists(netcdf_file):
+            raise IOError('File not found: {0}'.format(netcdf_file))
+
+        with nc.Dataset(netcdf_file) as data:
+            time_ = data.variables['time']
+
+            if indices is None:
+                times = time_[:]
+                mask = np.ones(len(times), dtype=bool)
+
+                if start_time is not None:
+                    mask &= times >= nc.date2num(start_time, time_.units,
+                                                 calendar=time_.calendar)
+                if end_time is not None:
+                    mask &= times <= nc.date2num(end_time, time_.units,
+                                                 calendar=time_.calendar)
+
+                indices = np.flatnonzero(mask)
+            else:
+                indices = np.asarray(indices, dtype=int)
+                indices = np.where(indices < 0, indices + len(time_), indices)
+
+            return klass._read_steps(data, indices, which_data)
+
+    @staticmethod
+    def _step_offsets(data):
+        '''
+        Returns the index of the first particle of each timestep, with the
+        total number of particles appended, so timestep i is
+        offsets[i]:offsets[i + 1]
+
+        Uses the particle_start_index variable if the file has it, otherwise
+        it is computed from particle_count
+        '''
+        counts = np.asarray(data.variables['particle_count'][:], dtype=np.int64)
+
+        if 'particle_start_index' in data.variables:
+            starts = np.asarray(data.variables['particle_start_index'][:],
+                                dtype=np.int64)
+        else:
+            starts = np.cumsum(counts) - counts
+
+        if len(counts) == 0:
+            return np.zeros((1,), dtype=np.int64)
+
+        return np.append(starts, starts[-1] + counts[-1])
+
+    @classmethod
+    def _data_arrays_to_read(klass, data, which_data):
+        '''
+        figure out what arrays to read in
+        '''
+        if which_data == 'standard':
+            data_arrays = set(klass.standard_arrays)
+
+            # swap out positions:
+            [data_arrays.discard(x) for x in ('latitude',
+                                              'longitude',
+                                              'depth')]
+            data_arrays.add('positions')
+        elif which_data == 'all':
+            # pull them from the nc file
+            data_arrays = set(data.variables.keys())
+
+            # remove the irrelevant ones:
+            [data_arrays.discard(x) for x in ('time',
+                                              'particle_count',
+                                              'particle_start_index',
+                                              'latitude',
+                                              'longitude',
+                                              'depth')]
+            data_arrays.add('positions')
+        else:  # should be list of data arrays
+            data_arrays = set(which_data)
+
+        return data_arrays
+
+    @classmethod
+    def _read_steps(klass, data, indices, which_data):
+        '''
+        read the timesteps in indices from the open dataset
+        '''
+        time_ = data.variables['time']
+        offsets = klass._step_offsets(data)
+        data_arrays = klass._data_arrays_to_read(data, which_data)
+
+        mass_balance = {}
+        if 'mass_balance' in data.groups:
+            for key, val in data.groups['mass_balance'].variables.items():
+                mass_balance[key] = val[:]
+
+        results = [None] * len(indices)
+        if len(indices) == 0:
+            return results
+
+        indices = np.asarray(indices, dtype=int)
+        times = nc.num2date(time_[:][indices], time_.units,
+                            calendar=time_.calendar)
+
+        # read each run of consecutive timesteps in one go
+        order = np.argsort(indices, kind='stable')
+        sorted_ix = indices[order]
+        breaks = np.flatnonzero(np.diff(sorted_ix) != 1) + 1
+
+        for run in np.split(np.arange(len(sorted_ix)), breaks):
+            first = sorted_ix[run[0]]
+            last = sorted_ix[run[-1]]
+            _start_ix = offsets[first]
+            _stop_ix = offsets[last + 1]
+
+            slab = {}
             for array_name in data_arrays:
-                # special case time and positions:
+                # special case positions:
                 if array_name == 'positions':
-                    positions = np.zeros((elem, 3), dtype=world_point_type)
+                    positions = np.zeros((_stop_ix - _start_ix, 3),
+                                         dtype=world_point_type)
 
                     positions[:, 0] = \
                         data.variables['longitude'][_start_ix:_stop_ix]
@@ -980,25 +1220,33 @@ class NetCDFOutput(Outputter, OutputterFilenameMixin):
                     positions[:, 2] = \
                         data.variables['depth'][_start_ix:_stop_ix]
 
-                    arrays_dict['positions'] = positions
+                    slab['positions'] = positions
                 else:
                     try:
-                        arrays_dict[array_name] = data.variables[array_name][_start_ix:_stop_ix]
+                        slab[array_name] = \
+                            data.variables[array_name][_start_ix:_stop_ix]
                     except KeyError:
                         # it's OK if it's not there, not all standard_arrays
                         # will always be output
                         pass
 
-            # get mass_balance
-            weathering_data = {}
-            if 'mass_balance' in data.groups:
-                mb = data.groups['mass_balance']
+            for ix in run:
+                index = sorted_ix[ix]
+                pos = order[ix]
+                i0 = offsets[index] - _start_ix
+                i1 = offsets[index + 1] - _start_ix
+
+                arrays_dict = {'current_time_stamp': np.array(times[pos])}
+                for array_name, arr in slab.items():
+                    arrays_dict[array_name] = arr[i0:i1]
+
+                # assume SI units
+                weathering_data = {key: val[index]
+                                   for key, val in mass_balance.items()}
 
-                for key, val in mb.variables.items():
-                    # assume SI units
-                    weathering_data[key] = val[index]
+                results[pos] = (arrays_dict, weathering_data)
 
-        return (arrays_dict, weathering_data)
+        return results
 
     def to_dict(self, json_=None):
         dict_ = super(NetCDFOutput, self).to_dict(json_)
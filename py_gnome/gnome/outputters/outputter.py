@@ -66,6 +66,11 @@ class Outputter(GnomeId):
 
     _surf_conc_computed = False
 
+    # can be run on a worker thread by the OutputExecutor -- False for
+    # outputters that use the movers or environment in write_output(), or
+    # read or write netCDF files (the netCDF library is not thread safe)
+    _parallel_output = True
+
     def __init__(self,
                  cache=None,
                  on=True,
@@ -118,8 +123,8 @@ class Outputter(GnomeId):
         :param surface_conc=None: Compute surface concentration
                                   Any non-empty string will compute (and output)
                                   the surface concentration. The contents of the
-                                  string determine the algorithm used. "kde" is
-                                  currently the only available option.
+                                  string determine the algorithm used: "kde",
+                                  or "grid" (much faster for many elements).
         :type surface_conc: str or None
         """
 
@@ -467,8 +472,7 @@ class Outputter(GnomeId):
 
         for step_num in range(num_time_steps):
             if (step_num > 0 and step_num < num_time_steps - 1):
-                next_ts = (self.cache.load_timestep(step_num).items()[0].
-                           current_time_stamp)
+                next_ts = self.cache.load_mass_balance(step_num)[1]
                 ts = next_ts - model_time
 
                 self.prepare_for_model_step(ts.seconds, model_time)
@@ -478,8 +482,7 @@ class Outputter(GnomeId):
 
             self.write_output(step_num, last_step)
 
-            model_time = (self.cache.load_timestep(step_num).items()[0]
-                          .current_time_stamp)
+            model_time = self.cache.load_mass_balance(step_num)[1]
 
     @property
     def middle_of_run(self):
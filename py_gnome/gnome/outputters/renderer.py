@@ -76,6 +76,9 @@ class Renderer(Outputter, MapCanvas):
     foreground_filename_format = 'foreground_{0:05d}.'
     foreground_filename_glob = 'foreground_?????.*'
 
+    # the data arrays draw_elements() needs from the cache
+    draw_arrays = ('positions', 'status_codes')
+
     _schema = RendererSchema
 
     def __init__(self,
@@ -293,6 +296,14 @@ class Renderer(Outputter, MapCanvas):
     def map_filename(self, name):
         self._filename = name
 
+    @property
+    def _parallel_output(self):
+        '''
+        the vector properties are sampled from the environment objects,
+        which read from netCDF files -- with them, run on the model thread
+        '''
+        return not self.props
+
     @property
     def draw_ontop(self):
         return self._draw_ontop
@@ -643,7 +654,8 @@ class Renderer(Outputter, MapCanvas):
             self.copy_back_to_fore()
 
         # draw prop for self.draw_ontop second so it draws on top
-        scp = self.cache.load_timestep(step_num).items()
+        scp = self.cache.load_timestep(step_num,
+                                       array_names=self.draw_arrays).items()
         if len(scp) == 1:
             self.draw_elements(scp[0])
         else:
@@ -686,7 +698,8 @@ class Renderer(Outputter, MapCanvas):
         """
 
         # draw prop for self.draw_ontop second so it draws on top
-        scp = self.cache.load_timestep(step_num).items()
+        scp = self.cache.load_timestep(step_num,
+                                       array_names=self.draw_arrays).items()
         if len(scp) == 1:
             self.draw_elements(scp[0])
         else:
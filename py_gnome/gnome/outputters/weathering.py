@@ -25,9 +25,9 @@ class BaseMassBalanceOutputter(Outputter):
     def gather_mass_balance_data(self, step_num):
         # return a json-compatible dict of the mass_balance data
         # only applies to forecast spill_container (Not uncertain)
-        sc = self.cache.load_timestep(step_num).items()[0]
-        output_info = {'model_time': sc.current_time_stamp}
-        output_info.update(sc.mass_balance)
+        mass_balance, model_time = self.cache.load_mass_balance(step_num)
+        output_info = {'model_time': model_time}
+        output_info.update(mass_balance)
 
         self.logger.debug(self._pid + 'step_num: {0}'.format(step_num))
 
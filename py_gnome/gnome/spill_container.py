@@ -23,7 +23,13 @@ from gnome.spills.substance import NonWeatheringSubstance
 
 class FateDataView(AddLogger):
     """
-    need a docstring -- what is this for?
+    Provides the weatherers with the data for the elements that have a given
+    fate, e.g. 'surface_weather'.
+
+    If the elements with the requested fate are stored contiguously -- see
+    SpillContainer.partition_by_fate() -- the data are slices of the
+    SpillContainer's arrays, so they are updated in place. Otherwise they
+    are copies that are written back by update_sc().
     """
 
     _dicts_ = ('surface_weather', 'subsurf_weather', 'skim', 'burn',
@@ -35,6 +41,10 @@ class FateDataView(AddLogger):
     def reset(self):
         for fate_type in self._dicts_:
             setattr(self, fate_type, {})
+
+        # slice into the SpillContainer arrays for each fate whose data are
+        # views rather than copies
+        self._slices = {}
         # all data - this is required by WeatheringData to update
         # properties of old LEs and properties of newly released LEs
         self.all = {}
@@ -65,11 +75,30 @@ class FateDataView(AddLogger):
         #     fate_mask = np.logical_and(sc['substance'] == self.substance_id,
         #                                fate_mask)
 
+        prev_slice = self._slices.pop(fate_status, None)
+        dict_to_update = getattr(self, fate_status)
+
         if np.all(fate_mask):
             # no need to make a copy of array
             setattr(self, fate_status, sc._data_arrays)
+            return
+
+        fate_slice = self._contiguous_slice(fate_mask)
+
+        if fate_slice is not None:
+            # no need to make a copy either, return views into the arrays
+            names = [sc._array_name(at) for at in array_types]
+            if dict_to_update is not sc._data_arrays:
+                names.extend(dict_to_update.keys())
+
+            self._slices[fate_status] = fate_slice
+            setattr(self, fate_status,
+                    {name: sc[name][fate_slice] for name in names})
         else:
-            dict_to_update = getattr(self, fate_status)
+            if prev_slice is not None or dict_to_update is sc._data_arrays:
+                # don't hold on to views from a previous call
+                dict_to_update = {}
+
             for at in array_types:
                 array = sc._array_name(at)
 
@@ -78,6 +107,22 @@ class FateDataView(AddLogger):
 
             setattr(self, fate_status, dict_to_update)
 
+    @staticmethod
+    def _contiguous_slice(fate_mask):
+        '''
+        return a slice equivalent to the boolean fate_mask if the elements it
+        selects are contiguous, otherwise None
+        '''
+        idx = np.flatnonzero(fate_mask)
+
+        if len(idx) == 0:
+            return slice(0, 0)
+
+        if idx[-1] - idx[0] + 1 == len(idx):
+            return slice(idx[0], idx[-1] + 1)
+
+        return None
+
     def get_data(self, sc, array_types, fate_status='surface_weather'):
         '''
         Get data that matches the given fate_status.
@@ -116,6 +161,17 @@ class FateDataView(AddLogger):
             #    self._set_data( sc, getattr(self, fs).keys(), self._get_fate_mask(sc, fs), fs)
             return
 
+        fate_slice = self._slices.pop(fate_status, None)
+        if fate_slice is not None:
+            # data are views into the SC arrays so they are already up to
+            # date. Only arrays the weatherer replaced need to be copied back
+            for key, val in d_to_sync.items():
+                if not np.may_share_memory(val, sc[key]):
+                    sc[key][fate_slice] = val
+
+            setattr(self, fate_status, {})
+            return
+
         w_mask = self._get_fate_mask(sc, fate_status)
 
         # if 'substance' in sc:
@@ -193,6 +249,10 @@ class SpillContainerData(object):
             data_arrays = {}
 
         self._data_arrays = data_arrays
+        # backing storage for the data arrays, keyed by array name. Each
+        # entry in _data_arrays is a view into the first len(self) rows of
+        # its buffer -- see SpillContainer._append_data_arrays()
+        self._array_buffers = {}
         self.current_time_stamp = None
         self.mass_balance = {}
         self.substance = None
@@ -275,7 +335,11 @@ class SpillContainerData(object):
         val_is_dict = []
         for key, val in self.__dict__.items():
             'compare dict not including _data_arrays'
-            if isinstance(val, dict):
+            if key == '_array_buffers':
+                # storage for the _data_arrays, which are compared below --
+                # spare capacity is not part of the state
+                pass
+            elif isinstance(val, dict):
                 val_is_dict.append(key)
             elif key == '_substances_spills' or key == '_fate_data_view':
                 '''
@@ -364,7 +428,16 @@ class SpillContainer(AddLogger, SpillContainerData):
 
     positions = spill_container['positions'] : returns a (num_LEs, 3) array of
     world_point_types
+
+    Each data array is a contiguous view onto a larger buffer that grows
+    geometrically, so releasing elements only initializes the new elements
+    rather than copying every array on every release.
     """
+    # minimum number of elements the buffers are allocated for, and the
+    # factor the capacity grows by when they fill up
+    _min_capacity = 256
+    _growth_factor = 2
+
     def __init__(self, uncertain=False):
         super(SpillContainer, self).__init__(uncertain=uncertain)
         self.spills = OrderedCollection(dtype=gnome.spills.spill.Spill)
@@ -380,7 +453,7 @@ class SpillContainer(AddLogger, SpillContainerData):
         # copy, cause we don't want to change the defaults!
         self._array_types = {}
         self._data_arrays = {}
-
+        self._array_buffers = {}
 
     def _reset__substances_spills(self):
         ## Most of this not needed
@@ -561,14 +634,48 @@ class SpillContainer(AddLogger, SpillContainerData):
         else:
             return at.name
 
+    def _grow_data_array(self, name, num_elements, new_len):
+        '''
+        Return a view of length new_len onto the buffer for array 'name',
+        with the first num_elements rows holding the current data.
+
+        The buffer is only reallocated when it is too small, or if the data
+        array is no longer a view into it (e.g. it was replaced by
+        __setitem__ or split_element) -- in which case the current data is
+        copied over.
+        '''
+        array = self._data_arrays[name]
+        buf = self._array_buffers.get(name)
+
+        if (buf is None or
+                array.base is not buf or
+                len(buf) < new_len or
+                buf.shape[1:] != array.shape[1:] or
+                buf.dtype != array.dtype):
+            capacity = max(new_len, self._min_capacity)
+            if buf is not None and len(buf) < new_len:
+                capacity = max(capacity, len(buf) * self._growth_factor)
+
+            buf = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            buf[:num_elements] = array[:num_elements]
+            self._array_buffers[name] = buf
+
+        return buf[:new_len]
+
     def _append_data_arrays(self, num_released):
         """
         initialize data arrays once spill has spawned particles
         Data arrays are set to their initial_values
 
+        The arrays are grown in place within their buffers -- existing
+        elements are only copied when a buffer needs to be reallocated.
+
         :param int num_released: number of particles released
 
         """
+        num_elements = len(self)
+        new_len = num_elements + num_released
+
         for name, atype in self._array_types.items():
             # initialize all arrays even if 0 length
             if atype.shape is None:
@@ -585,7 +692,10 @@ class SpillContainer(AddLogger, SpillContainerData):
                                             initial_value=tuple([0] * self._oil_comp_array_len))
             else:
                 a_append = atype.initialize(num_released)
-            self._data_arrays[name] = np.r_[self._data_arrays[name], a_append]
+
+            array = self._grow_data_array(name, num_elements, new_len)
+            array[num_elements:] = a_append
+            self._data_arrays[name] = array
 
     # def _set_substance_array(self, subs_idx, num_rel_by_substance):
     #     '''
@@ -872,6 +982,56 @@ class SpillContainer(AddLogger, SpillContainerData):
         w_mask = np.logical_and(w_mask, self['mass'] > 0.0)
         return w_mask
 
+    def _fate_partition_key(self):
+        '''
+        Rank of each element in the order used by partition_by_fate().
+
+        Elements without mass come first, then non-weathering and subsurface
+        elements, then the surface elements -- with the ones marked for
+        skimming, burning or dispersing grouped at the start of the surface
+        elements. Newly released surface elements are appended at the end, so
+        most of the time the elements are already in order.
+        '''
+        status = self['fate_status']
+        surface = (status & bt_fate.surface_weather) > 0
+
+        conditions = [self['mass'] <= 0.0,
+                      surface & ((status & bt_fate.skim) > 0),
+                      surface & ((status & bt_fate.burn) > 0),
+                      surface & ((status & bt_fate.disperse) > 0),
+                      surface,
+                      (status & bt_fate.subsurf_weather) > 0]
+
+        return np.select(conditions, [0, 3, 4, 5, 6, 2], default=1)
+
+    def partition_by_fate(self):
+        '''
+        Reorder the elements so the ones with the same fate_status are
+        stored contiguously. The FateDataView can then hand the weatherers
+        slices of the data arrays, rather than copies.
+
+        The sort is stable, so the elements keep their relative order within
+        each fate. Use the 'id' array to identify elements, not their index.
+
+        .. note:: Should only be called at the start of weathering, not in
+                  the middle of a release, as some objects expect the newly
+                  released elements to be at the end of the arrays.
+        '''
+        if 'fate_status' not in self or len(self) < 2:
+            return
+
+        key = self._fate_partition_key()
+        if np.all(key[:-1] <= key[1:]):
+            # already partitioned
+            return
+
+        order = np.argsort(key, kind='stable')
+        for name in self._array_types:
+            data = self._data_arrays[name]
+            data[:] = data[order]
+
+        self._fate_data_view.reset()
+
     def release_elements(self, start_time, end_time, environment=None):
         """
         :param start_time: -- beginning of the release
@@ -972,13 +1132,17 @@ class SpillContainer(AddLogger, SpillContainerData):
 
         # LEs are marked as to_be_removed
         # C++ might care about this so leave as is
-        to_be_removed = np.where(self['status_codes'] ==
-                                 oil_status.to_be_removed)[0]
+        keep = self['status_codes'] != oil_status.to_be_removed
 
-        if len(to_be_removed) > 0:
+        if not np.all(keep):
+            # compact the remaining elements to the front of each array,
+            # the arrays stay views into the same buffers
+            num_keep = np.count_nonzero(keep)
             for key in self._array_types:
-                self._data_arrays[key] = np.delete(self[key], to_be_removed,
-                                                   axis=0)
+                data = self._data_arrays[key]
+                data[:num_keep] = data[keep]
+                self._data_arrays[key] = data[:num_keep]
+
             self._fate_data_view.reset()
 
     def __str__(self):
@@ -125,10 +125,19 @@ class InitWindages(InitBaseClass):
         sl = slice(-num_new_particles, None, 1)
         data_arrays['windage_range'][sl] = self.windage_range
         data_arrays['windage_persist'][sl] = self.windage_persist
+
+        # from the random streams, keyed on the element ids -- if there are
+        # ids (the ids are unique in a spill container, so no counter is
+        # needed)
+        element_ids = (data_arrays['id'][sl] if 'id' in data_arrays
+                       else None)
         random_with_persistance(
             data_arrays['windage_range'][-num_new_particles:, 0],
             data_arrays['windage_range'][-num_new_particles:, 1],
-            data_arrays['windages'][-num_new_particles:]
+            data_arrays['windages'][-num_new_particles:],
+            element_ids=element_ids,
+            key=('InitWindages',
+                 int(getattr(data_arrays, 'uncertain', False)))
         )
 
 
@@ -223,8 +232,12 @@ class InitRiseVelFromDist(DistributionBase):
         if any([k not in data_arrays for k in self.array_types.keys()]):
             return
         'Update values of "rise_vel" data array for new particles'
+        sl = slice(-num_new_particles, None, 1)
         self.distribution.set_values(
-                            data_arrays['rise_vel'][-num_new_particles:])
+            data_arrays['rise_vel'][sl],
+            element_ids=data_arrays['id'][sl] if 'id' in data_arrays else None,
+            key=('InitRiseVelFromDist',
+                 int(getattr(data_arrays, 'uncertain', False))))
 
 
 class InitRiseVelFromDropletSizeFromDist(DistributionBase):
@@ -290,7 +303,12 @@ class InitRiseVelFromDropletSizeFromDist(DistributionBase):
         drop_size = np.zeros((num_new_particles, ), dtype=np.float64)
         le_density = np.zeros((num_new_particles, ), dtype=np.float64)
 
-        self.distribution.set_values(drop_size)
+        sl = slice(-num_new_particles, None, 1)
+        self.distribution.set_values(
+            drop_size,
+            element_ids=data_arrays['id'][sl] if 'id' in data_arrays else None,
+            key=('InitRiseVelFromDropletSizeFromDist',
+                 int(getattr(data_arrays, 'uncertain', False))))
 
         data_arrays['droplet_diameter'][-num_new_particles:] = drop_size
 
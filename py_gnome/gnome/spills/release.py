@@ -23,6 +23,7 @@ from pyproj import Proj, transform
 import pyproj
 
 from gnome.utilities.time_utils import asdatetime
+from gnome.utilities import rand
 import gnome.utilities.geometry.geo_routines as geo_routines
 
 
@@ -390,7 +391,16 @@ class Release(GnomeId):
         qt = to_rel // num_locs # number of times to tile self.start_positions
         rem = to_rel % num_locs # remaining LES to distribute randomly
         qt_pos = np.tile(c_p, (qt, 1))
-        rem_pos = c_p[np.random.randint(0, len(c_p), rem)]
+        if rem > 0 and 'id' in sc:
+            # from the random streams, keyed on the element ids
+            rnd = rand.streams.element_uniform(
+                sc['id'][-rem:], '{}.positions'.format(type(self).__name__),
+                self.name, int(getattr(sc, 'uncertain', False)))
+            rem_idx = np.minimum((rnd * num_locs).astype(np.int64),
+                                 num_locs - 1)
+        else:
+            rem_idx = np.random.randint(0, len(c_p), rem)
+        rem_pos = c_p[rem_idx]
         pos = np.vstack((qt_pos, rem_pos))
         assert len(pos) == to_rel
 
@@ -893,10 +903,27 @@ class PolygonRelease(Release):
         """
 
         sl = slice(-to_rel, None, 1)
-        pts = [geo_routines.random_pt_in_tri(s) for s in np.random.choice(self._tris, to_rel, p=self._weights)]
-        pts = [np.append(pt, 0) for pt in pts] #add Z coordinate
 
-        data['positions'][sl] = pts
+        # a triangle (weighted), and a point in it, for each element -- from
+        # the random streams, keyed on the element ids (which are unique in
+        # the spill container), if there are ids
+        if 'id' in data:
+            rnd = rand.streams.element_uniform(
+                data['id'][sl], '{}.positions'.format(type(self).__name__),
+                self.name, int(getattr(data, 'uncertain', False)), size=3)
+        else:
+            rnd = np.random.uniform(0, 1, size=(to_rel, 3))
+
+        cum_weights = np.cumsum(self._weights)
+        tri_idx = np.searchsorted(cum_weights, rnd[:, 0] * cum_weights[-1],
+                                  side='right')
+        tri_idx = np.minimum(tri_idx, len(self._tris) - 1)
+
+        pts = geo_routines.random_pts_in_tris([self._tris[i] for i in tri_idx],
+                                              rnd[:, 1], rnd[:, 2])
+
+        data['positions'][sl, :2] = pts
+        data['positions'][sl, 2] = 0  # add Z coordinate
 
         if self.retain_initial_positions:
             data['init_positions'][sl] = data['positions'][sl]
@@ -7,10 +7,12 @@ accessing again for output, etc.
 """
 
 import os
+import copy
 import warnings
 import tempfile
 import shutil
-import copy
+import queue
+import threading
 from multiprocessing import Lock
 import atexit
 
@@ -61,6 +63,150 @@ def clean_up_cache(dir_name=global_cache_dir):
 # atexit.register(clean_up_cache)
 
 
+def _snapshot(data_arrays):
+    """
+    Returns a read-only snapshot of the data arrays.
+
+    Each array is copied once with ndarray.copy() (rather than a deepcopy of
+    the whole dict) and flagged read-only, so the same snapshot can be
+    handed to the writer thread, kept in ElementCache.recent and returned
+    from load_timestep() without copying it again.
+    """
+    data = {}
+    for name, arr in data_arrays.items():
+        arr = np.array(arr, copy=True)
+        arr.flags.writeable = False
+        data[name] = arr
+
+    return data
+
+
+class ColumnStore():
+    """
+    Columnar on-disk store for the element data of a run.
+
+    Each data array gets its own append-only file of raw rows, and the index
+    records, for each step, the first row and number of rows of each array
+    in its file, along with the data for the step that are not element
+    arrays (mass balance, time stamp), which are kept in memory.
+
+    A step is loaded back as memory-mapped slices of the files, so only the
+    arrays asked for are read, and only when they are used.
+    """
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+        # name: [dtype, shape of a row, number of rows in the file]
+        self._columns = {}
+
+        # step_num: ({name: (first row, number of rows)}, extra data)
+        self._index = {}
+
+    def __contains__(self, step_num):
+        return step_num in self._index
+
+    def _filename(self, name):
+        return os.path.join(self.store_dir, name + '.dat')
+
+    def append(self, step_num, arrays, extra=None):
+        """
+        append a step to the store
+
+        :param step_num: the step number of the data
+        :param arrays: dict of element data arrays
+        :param extra: dict of other data for the step -- kept as is
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        offsets = {}
+        for name, arr in arrays.items():
+            if arr.dtype.hasobject:
+                raise CacheError('cannot store array: {0} of type: {1}'
+                                 .format(name, arr.dtype))
+
+            column = self._columns.get(name)
+            if column is None:
+                column = self._columns[name] = [arr.dtype, arr.shape[1:], 0]
+            elif column[0] != arr.dtype or column[1] != arr.shape[1:]:
+                raise CacheError('array: {0} does not match the type or '
+                                 'shape of the stored data'.format(name))
+
+            with open(self._filename(name), 'ab') as fp:
+                fp.write(np.ascontiguousarray(arr).tobytes())
+
+            offsets[name] = (column[2], len(arr))
+            column[2] += len(arr)
+
+        self._index[step_num] = (offsets, extra if extra is not None else {})
+
+    def load(self, step_num, array_names=None):
+        """
+        Returns a dict of the data for a step, the element arrays are
+        read-only memory-mapped slices of the store files.
+
+        :param step_num: the step number to load
+        :param array_names=None: the element arrays to load. All of them if
+                                 None
+        """
+        try:
+            offsets, extra = self._index[step_num]
+        except KeyError:
+            raise CacheError('step: {0} is not in the cache'
+                             .format(step_num))
+
+        if array_names is None:
+            array_names = offsets.keys()
+
+        data = dict(extra)
+        for name in array_names:
+            if name not in offsets:
+                continue
+
+            first, num = offsets[name]
+            dtype, shape = self._columns[name][:2]
+
+            if num == 0:
+                # can't mmap 0 bytes
+                arr = np.empty((0,) + shape, dtype=dtype)
+                arr.flags.writeable = False
+            else:
+                row_size = dtype.itemsize * int(np.prod(shape))
+                try:
+                    arr = np.memmap(self._filename(name),
+                                    dtype=dtype,
+                                    mode='r',
+                                    offset=first * row_size,
+                                    shape=(num,) + shape)
+                except (IOError, ValueError) as excp:
+                    raise CacheError('step: {0} could not be loaded from '
+                                     'the cache: {1!r}'.format(step_num, excp))
+
+            data[name] = arr
+
+        return data
+
+
+def _writer(write_queue, errors):
+    """
+    body of the background writer thread
+
+    This is a module level function and not a method, so the thread does
+    not keep the ElementCache alive.
+    """
+    while True:
+        item = write_queue.get()
+        try:
+            if item is None:
+                return
+
+            write, args = item
+            write(*args)
+        except Exception as excp:
+            errors.append(excp)
+        finally:
+            write_queue.task_done()
+
+
 class ElementCache():
     """
     Cache for element data -- i.e. the data associated with the particles.
@@ -72,7 +218,8 @@ class ElementCache():
           the _cache_dir at the whim of the GC.
           We may want to manage this differently.
     """
-    def __init__(self, cache_dir=None, enabled=True):
+    def __init__(self, cache_dir=None, enabled=True,
+                 async_write=True, max_queued=4, cache_elements=True):
         """
         initialize a new cache object
 
@@ -80,6 +227,23 @@ class ElementCache():
                                should be stored.
                                If not provided, a temp dir will be created by
                                the python tempfile module
+
+        :param async_write=True: if True, the disk cache is written by a
+                                 background thread, so the model does not
+                                 wait on disk I/O. Use flush() to wait for
+                                 pending writes.
+
+        :param max_queued=4: max number of steps waiting to be written before
+                             save_timestep() blocks.
+
+        :param cache_elements=True: if False, the element data are not
+                                    cached at all (in memory or on disk),
+                                    only the mass balance and time stamp of
+                                    each step -- for runs that only output
+                                    the mass balance.
+
+        The element data are stored on disk in a ColumnStore for the
+        certain and one for the uncertain spill container.
         """
         # if cache_dir is None:
         #     cache_dir = tempfile.mkdtemp(dir=global_cache_dir)
@@ -91,29 +255,78 @@ class ElementCache():
 
         # flag for whether to enable disk cache
         self.enabled = enabled
+        self.cache_elements = cache_elements
+
+        # the mass balance and time stamp of every step, kept separately
+        # from the element data -- they are small, so they are kept in
+        # memory
+        # step_num: [certain record, uncertain record]
+        self._mass_balance = {}
+
+        self.async_write = async_write
+        self.max_queued = max_queued
+
+        # the writer thread is started on first use
+        self._write_queue = None
+        self._writer_thread = None
+        self._write_errors = []
 
         self.lock = Lock()
 
     def __del__(self):
         'Clear out the cache when this object is deleted'
+        self._stop_writer()
+
         with self.lock:
             if os.path.isdir(self._cache_dir):
                 shutil.rmtree(self._cache_dir)
 
-    def _make_filename(self, step_num, uncertain=False):
-        """
-        Returns a filename of the temp file generated from step_num
+    def _start_writer(self):
+        self._write_queue = queue.Queue(maxsize=self.max_queued)
+        self._writer_thread = threading.Thread(target=_writer,
+                                               args=(self._write_queue,
+                                                     self._write_errors),
+                                               name='ElementCacheWriter',
+                                               daemon=True)
+        self._writer_thread.start()
+
+    def _stop_writer(self):
+        'write everything pending and stop the writer thread'
+        if getattr(self, '_writer_thread', None) is None:
+            return
+
+        self._write_queue.put(None)
+        self._writer_thread.join()
+
+        self._write_queue = None
+        self._writer_thread = None
 
-        :param step_num: the model step number that is saved/reloaded
+    def _write(self, write, *args):
+        if not self.async_write:
+            write(*args)
+            return
 
-        This here so that loading and saving use the same code
+        if self._writer_thread is None:
+            self._start_writer()
+
+        # blocks if the writer has fallen max_queued steps behind
+        self._write_queue.put((write, args))
+
+    def flush(self):
         """
-        if uncertain:
-            return os.path.join(self._cache_dir,
-                                'step_%06i_uncert.npz' % step_num)
-        else:
-            return os.path.join(self._cache_dir,
-                                'step_%06i.npz' % step_num)
+        Block until all the steps passed to save_timestep() are on disk.
+
+        Raises a CacheError if any of the writes failed.
+        """
+        if self._write_queue is not None:
+            self._write_queue.join()
+
+        if self._write_errors:
+            errors = list(self._write_errors)
+            del self._write_errors[:]
+
+            raise CacheError('failed to write to the cache: {}'
+                             .format(', '.join(repr(e) for e in errors)))
 
     def _create_new_dir(self, cache_dir=None):
         if cache_dir is None:
@@ -122,6 +335,11 @@ class ElementCache():
             # self._cache_dir = tempfile.mkdtemp(dir=global_cache_dir)
         else:
             self._cache_dir = cache_dir
+
+        # one store each for the certain and uncertain data
+        self._stores = (ColumnStore(os.path.join(self._cache_dir, 'certain')),
+                        ColumnStore(os.path.join(self._cache_dir,
+                                                 'uncertain')))
         return True
 
     def save_timestep(self, step_num, spill_container_pair):
@@ -132,9 +350,20 @@ class ElementCache():
         :param spill_container: the spill container at this step
         """
         for sc in spill_container_pair.items():
-            data = copy.deepcopy(sc.data_arrays)
+            # a copy -- some weatherers (e.g. ROC) keep nested dicts in the
+            # mass balance, and update them in place
+            mass_balance = copy.deepcopy(sc.mass_balance)
+            self._save_mass_balance(step_num, sc, mass_balance)
+
+            if not self.cache_elements:
+                arrays = {}
+            else:
+                arrays = _snapshot(sc.data_arrays)
 
-            self._set_weathering_data(sc, data)
+            # a new dict, the outputters add surface_concentration to
+            # the one in self.recent
+            data = dict(arrays)
+            self._set_weathering_data(mass_balance, data)
 
             if sc.current_time_stamp:
                 data['current_time_stamp'] = np.array(sc.current_time_stamp)
@@ -148,59 +377,99 @@ class ElementCache():
                 self.recent = {step_num: [data, None]}
 
             # write the data if enabled
-            # could be threaded -- data is a copy, so doesn't need to be
-            #                      re-used by anything
-            if self.enabled:
-                filename = self._make_filename(step_num, sc.uncertain)
-                np.savez(filename, **data)
+            # the arrays are read-only snapshots, so they can be handed to
+            # the writer thread as is
+            if self.enabled and self.cache_elements:
+                extra = {key: val for key, val in data.items()
+                         if key not in arrays}
+                self._write(self._stores[sc.uncertain].append,
+                            step_num, arrays, extra)
+
+    def _save_mass_balance(self, step_num, sc, mass_balance):
+        record = ({key: np.asarray(val).item()
+                   for key, val in mass_balance.items()},
+                  sc.current_time_stamp)
+
+        if sc.uncertain:
+            self._mass_balance[step_num][1] = record
+        else:
+            self._mass_balance[step_num] = [record, None]
 
-    def load_timestep(self, step_num):
+    def load_mass_balance(self, step_num, uncertain=False):
+        """
+        Returns the mass balance and time stamp of a step
+
+        These are kept apart from the element data, so this does not load
+        (or wait on the writing of) any element arrays -- and works when
+        the elements are not cached.
+
+        :param step_num: the step number you want to load.
+        :param uncertain=False: if True, the record of the uncertain spill
+                                container
+
+        :returns: (mass_balance, current_time_stamp) -- the mass balance is a
+                  new copy each time.
+        """
+        try:
+            record = self._mass_balance[step_num][1 if uncertain else 0]
+        except KeyError:
+            raise CacheError('step: {0} is not in the cache'
+                             .format(step_num))
+
+        if record is None:
+            raise CacheError('step: {0} has no uncertain data'
+                             .format(step_num))
+
+        mass_balance, current_time_stamp = record
+
+        return copy.deepcopy(mass_balance), current_time_stamp
+
+    def load_timestep(self, step_num, array_names=None):
         """
         Returns a SpillContainer with the data arrays cached on disk
 
         :param step_num: the step number you want to load.
+        :param array_names=None: names of the data arrays to load. If None,
+                                 all the data arrays are loaded. The mass
+                                 balance and time stamp are always loaded.
         """
         # look first in in-memory cache.
         try:
-            # make a copy because we pop out the current_time_stamp
-            # make these changes to the copy so the self.recent does not change
-
-            (data_arrays, u_data_arrays) = copy.deepcopy(self.recent[step_num])
-
-            # copy.deepcopy(self.recent[step_num]) converts
-            # 'current_time_stamp' to datetime object
-            # To be consistent with np.load() operation below,
-            # make this an array.
-            if 'current_time_stamp' in data_arrays:
-                data_arrays['current_time_stamp'] = \
-                    np.array(data_arrays['current_time_stamp'])
-                if u_data_arrays:
-                    u_data_arrays['current_time_stamp'] = \
-                        np.array(u_data_arrays['current_time_stamp'])
+            # the arrays are read-only snapshots, so they can be shared.
+            # Copy the dicts because we pop out the current_time_stamp
+            # and mass balance so self.recent does not change
+            (data_arrays, u_data_arrays) = self.recent[step_num]
+
+            data_arrays = dict(data_arrays)
+            if u_data_arrays is not None:
+                u_data_arrays = dict(u_data_arrays)
         except KeyError:
             # not in the recent dict: try to load from disk
-            try:
-                data_arrays = dict(np.load(self._make_filename(step_num),
-                                           allow_pickle=True))
-            except IOError:
-                raise CacheError('step: {0} is not in the cache'
-                                 .format(step_num))
-
-            try:
-                u_data_arrays = dict(np.load(self._make_filename(step_num,
-                                                                 True),
-                                             allow_pickle=True))
-            except IOError:
+            # make sure the step has been written first
+            self.flush()
+
+            certain, uncertain = self._stores
+            data_arrays = certain.load(step_num, array_names)
+
+            if step_num in uncertain:
+                u_data_arrays = uncertain.load(step_num, array_names)
+            else:
                 u_data_arrays = None
 
-        # HOWEVER, loading numpy arrays
-        #     data_arrays = dict(np.load(self._make_filename(step_num)))
-        # converts current_time_stamp to numpy.ndarray objects
+        return self._make_pair(data_arrays, u_data_arrays, array_names)
+
+    def _make_pair(self, data_arrays, u_data_arrays, array_names):
+        '''
+        SpillContainerPairData of the cached data of a step
+
+        The time stamp and mass balance are popped out of the dicts.
+        '''
         current_time_stamp = None
         if 'current_time_stamp' in data_arrays:
             current_time_stamp = data_arrays.pop('current_time_stamp').item()
 
         weathering_data = self._get_weathering_data(data_arrays)
+        data_arrays = self._select_arrays(data_arrays, array_names)
         sc = SpillContainerData(data_arrays)
         sc.mass_balance = weathering_data
         if current_time_stamp:
@@ -215,6 +484,7 @@ class ElementCache():
                     u_data_arrays.pop('current_time_stamp').item()
 
             u_weathering_data = self._get_weathering_data(u_data_arrays)
+            u_data_arrays = self._select_arrays(u_data_arrays, array_names)
             u_sc = SpillContainerData(u_data_arrays, uncertain=True)
             u_sc.mass_balance = u_weathering_data
 
@@ -225,15 +495,22 @@ class ElementCache():
 
         return scp
 
-    def _set_weathering_data(self, sc, data):
+    def _select_arrays(self, data_arrays, array_names):
+        if array_names is None:
+            return data_arrays
+
+        return {name: data_arrays[name] for name in array_names
+                if name in data_arrays}
+
+    def _set_weathering_data(self, mass_balance, data):
         'add mass balance data to arrays'
-        if sc.mass_balance:
+        if mass_balance:
             # convert weathering data to numpy_arrays. In order to save
             # it in the samefile, we'll also need to store the keys so we know
             # which arrays belong to mass_balance when reconstructing
-            data['mass_balance'] = np.array(list(sc.mass_balance.keys()))
+            data['mass_balance'] = np.array(list(mass_balance.keys()))
             for key in data['mass_balance']:
-                data[key] = np.asarray(sc.mass_balance[key])
+                data[key] = np.asarray(mass_balance[key])
 
     def _get_weathering_data(self, data_arrays):
         mb_data = {}
@@ -241,15 +518,71 @@ class ElementCache():
             mb_names = data_arrays.pop('mass_balance')
             mb_data = {}
             for name in mb_names:
-                mb_data[name] = data_arrays.pop(name).item()
+                # a copy of any nested dicts, so the cached step can't
+                # be changed
+                mb_data[name] = copy.deepcopy(data_arrays.pop(name).item())
         return mb_data
 
     def rewind(self):
         'Rewinds the cache -- clearing out everything'
         # clean out the in-memory cache
         self.recent = {}
+        self._mass_balance = {}
+
+        # let the writer finish before the files are removed
+        self._stop_writer()
+        del self._write_errors[:]
 
         # clean out the disk cache
         if os.path.isdir(self._cache_dir):
             shutil.rmtree(self._cache_dir)
         self._create_new_dir()
+
+
+class StepView():
+    """
+    One step of the data of an ElementCache, as it was when the step was
+    saved
+
+    The cache only keeps the most recent step in memory, so an outputter
+    that writes a step after the model has gone on to the next one (see
+    gnome.outputters.executor) is given one of these as its cache: it
+    has the same load_timestep() and recent as the ElementCache for the
+    step, and passes everything else on to the cache.
+
+    The data arrays are the read-only snapshots of the cache, so they are
+    shared, not copied. The dicts of them are copied, so the outputter can
+    add to them (e.g. the surface concentration).
+    """
+    def __init__(self, cache, step_num):
+        self.cache = cache
+        self.step_num = step_num
+
+        try:
+            data_arrays, u_data_arrays = cache.recent[step_num]
+        except KeyError:
+            # not in memory -- it will be loaded from disk
+            self.recent = {}
+        else:
+            self.recent = {step_num: [dict(data_arrays),
+                                      None if u_data_arrays is None
+                                      else dict(u_data_arrays)]}
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+    def load_timestep(self, step_num, array_names=None):
+        """
+        Returns a SpillContainer with the data arrays of the step
+
+        Other steps are loaded from the cache.
+        """
+        if step_num not in self.recent:
+            return self.cache.load_timestep(step_num, array_names)
+
+        data_arrays, u_data_arrays = self.recent[step_num]
+        if u_data_arrays is not None:
+            u_data_arrays = dict(u_data_arrays)
+
+        return self.cache._make_pair(dict(data_arrays), u_data_arrays,
+                                     array_names)
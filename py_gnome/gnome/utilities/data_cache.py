@@ -0,0 +1,150 @@
+"""
+A content-addressed on-disk cache for arrays built from data files
+
+Some objects build large arrays from a data file that take a long time to
+compute, but always come out the same for the same file and options -- the
+land raster built from a BNA file, for instance. This caches them on disk,
+keyed on a hash of the file contents and the options, so a changed file is
+never matched with a stale entry.
+
+Each entry is a directory of .npy files, one per array, and a JSON file of
+any other (small) data. The arrays are loaded memory-mapped copy-on-write,
+so only the pages that are used are read, and they are shared between all
+the processes using the same entry.
+
+The default cache is off unless the GNOME_DATA_CACHE_DIR environment variable
+is set. It can also be turned on with::
+
+    from gnome.utilities import data_cache
+    data_cache.default_cache.cache_dir = "/path/to/cache"
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import warnings
+
+import numpy as np
+
+
+def file_hash(filename, blocksize=2 ** 20):
+    """
+    The sha256 hash of the contents of a file, as a hex string
+    """
+    sha = hashlib.sha256()
+
+    with open(filename, 'rb') as infile:
+        for block in iter(lambda: infile.read(blocksize), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+
+def make_key(*parts):
+    """
+    Make a cache key from a sequence of JSON-compatible values
+
+    The first part should say what is being cached (and the version of the
+    code that builds it), so different kinds of data never collide.
+    """
+    data = json.dumps(parts, sort_keys=True)
+
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class DataCache(object):
+    """
+    An on-disk cache of sets of arrays, keyed by make_key()
+    """
+    meta_filename = 'meta.json'
+
+    def __init__(self, cache_dir=None):
+        """
+        :param cache_dir=None: directory to keep the cache in -- created if
+                               it does not exist. If None, the cache is off:
+                               nothing is saved and nothing is found.
+        """
+        self.cache_dir = cache_dir
+
+    @property
+    def enabled(self):
+        return self.cache_dir is not None
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key):
+        """
+        Load an entry from the cache
+
+        :param key: key of the entry, from make_key()
+
+        :returns: (arrays, meta) -- a dict of memory-mapped arrays and the
+                  dict of other data saved with them -- or None if the entry
+                  is not in the cache.
+        """
+        if not self.enabled:
+            return None
+
+        entry_dir = self._entry_dir(key)
+
+        try:
+            with open(os.path.join(entry_dir, self.meta_filename)) as infile:
+                meta = json.load(infile)
+
+            arrays = {name: np.load(os.path.join(entry_dir, name + '.npy'),
+                                    mmap_mode='c')
+                      for name in meta['arrays']}
+        except (OSError, ValueError, KeyError):
+            # not there, or not complete
+            return None
+
+        return arrays, meta['meta']
+
+    def save(self, key, arrays, meta=None):
+        """
+        Save an entry to the cache
+
+        The entry is written to a temporary directory and then moved into
+        place, so other processes never see a partial entry. If the save
+        fails, a warning is raised and the entry is not cached.
+
+        :param key: key of the entry, from make_key()
+
+        :param arrays: dict of numpy arrays to save -- the keys must be
+                       usable as file names.
+
+        :param meta=None: dict of other JSON-compatible data to save
+        """
+        if not self.enabled:
+            return
+
+        tmp_dir = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='tmp.')
+
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp_dir, name + '.npy'),
+                        np.ascontiguousarray(arr))
+
+            with open(os.path.join(tmp_dir, self.meta_filename), 'w') as outfile:
+                json.dump({'arrays': list(arrays),
+                           'meta': {} if meta is None else meta},
+                          outfile)
+
+            os.replace(tmp_dir, self._entry_dir(key))
+            tmp_dir = None
+        except OSError as err:
+            if not os.path.isdir(self._entry_dir(key)):
+                warnings.warn('Could not save to the data cache: {}'
+                              .format(err))
+        finally:
+            # if another process got there first, its entry is kept
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+default_cache = DataCache(os.environ.get('GNOME_DATA_CACHE_DIR'))
@@ -5,6 +5,7 @@ Classes that generate various types of probability distributions
 
 import numpy as np
 from gnome.gnomeobject import GnomeId
+from gnome.utilities import rand
 from colander import Float, SchemaNode, drop
 
 from gnome.persist.base_schema import ObjTypeSchema
@@ -41,7 +42,19 @@ class DistributionBase(GnomeId):
     which have different meanings depending on the distribution.
     """
 
-    def set_values(self, np_array):
+    def set_values(self, np_array, element_ids=None, key=()):
+        """
+        Fill np_array with values drawn from the distribution
+
+        :param np_array: the array to fill
+        :param element_ids=None: the ids of the elements the values are for.
+            If given, the random numbers come from the random streams, keyed
+            on the element ids and key, so they don't depend on how the
+            elements are split up. Default is None: they come from numpy's
+            global random state.
+        :param key=(): the rest of the stream key -- the component, and a
+            counter if the same elements are drawn for again.
+        """
         raise NotImplementedError
 
 
@@ -125,11 +138,16 @@ class UniformDistribution(DistributionBase):
             raise TypeError('Uniform probability distribution requires '
                             'low and high')
 
-    def _uniform(self, np_array):
-        np_array[:] = np.random.uniform(self.low, self.high, len(np_array))
+    def _uniform(self, np_array, element_ids=None, key=()):
+        if element_ids is None:
+            np_array[:] = np.random.uniform(self.low, self.high,
+                                            len(np_array))
+        else:
+            np_array[:] = (self.low + (self.high - self.low) *
+                           rand.streams.element_uniform(element_ids, *key))
 
-    def set_values(self, np_array):
-        self._uniform(np_array)
+    def set_values(self, np_array, element_ids=None, key=()):
+        self._uniform(np_array, element_ids, key)
 
 
 class NormalDistribution(DistributionBase):
@@ -151,11 +169,16 @@ class NormalDistribution(DistributionBase):
             raise TypeError('Normal probability distribution requires '
                             'mean and sigma')
 
-    def _normal(self, np_array):
-        np_array[:] = np.random.normal(self.mean, self.sigma, len(np_array))
+    def _normal(self, np_array, element_ids=None, key=()):
+        if element_ids is None:
+            np_array[:] = np.random.normal(self.mean, self.sigma,
+                                           len(np_array))
+        else:
+            np_array[:] = (self.mean + self.sigma *
+                           rand.streams.element_normal(element_ids, *key))
 
-    def set_values(self, np_array):
-        self._normal(np_array)
+    def set_values(self, np_array, element_ids=None, key=()):
+        self._normal(np_array, element_ids, key)
 
 
 class LogNormalDistribution(DistributionBase):
@@ -177,11 +200,17 @@ class LogNormalDistribution(DistributionBase):
             raise TypeError('Log Normal probability distribution requires '
                             'mean and sigma')
 
-    def _lognormal(self, np_array):
-        np_array[:] = np.random.lognormal(self.mean, self.sigma, len(np_array))
+    def _lognormal(self, np_array, element_ids=None, key=()):
+        if element_ids is None:
+            np_array[:] = np.random.lognormal(self.mean, self.sigma,
+                                              len(np_array))
+        else:
+            np_array[:] = np.exp(self.mean + self.sigma *
+                                 rand.streams.element_normal(element_ids,
+                                                             *key))
 
-    def set_values(self, np_array):
-        self._lognormal(np_array)
+    def set_values(self, np_array, element_ids=None, key=()):
+        self._lognormal(np_array, element_ids, key)
 
 
 class WeibullDistribution(DistributionBase):
@@ -237,7 +266,32 @@ class WeibullDistribution(DistributionBase):
                 raise ValueError('Weibull distribution requires '
                                  'maximum > .00005 (50 microns)')
 
-    def _weibull(self, np_array):
+    def _weibull_from_streams(self, np_array, element_ids, key):
+        """
+        Draw by inverting the CDF, from the random streams. The random
+        number is scaled to the part of the CDF between min_ and max_, which
+        gives the same distribution as redrawing the values that are out of
+        bounds.
+        """
+        low = (0. if self.min_ is None
+               else fraction_below_d(self.min_, self.alpha, self.lambda_))
+        high = (1. if self.max_ is None
+                else fraction_below_d(self.max_, self.alpha, self.lambda_))
+
+        frac = low + (high - low) * rand.streams.element_uniform(element_ids,
+                                                                 *key)
+
+        np_array[:] = self.lambda_ * (-np.log1p(-frac)) ** (1. / self.alpha)
+
+        # round off at the bounds
+        if self.min_ is not None or self.max_ is not None:
+            np.clip(np_array, self.min_, self.max_, out=np_array)
+
+    def _weibull(self, np_array, element_ids=None, key=()):
+        if element_ids is not None:
+            self._weibull_from_streams(np_array, element_ids, key)
+            return
+
         np_array[:] = self.lambda_ * np.random.weibull(self.alpha,
                                                        len(np_array))
 
@@ -254,8 +308,8 @@ class WeibullDistribution(DistributionBase):
                 while np_array[x] > self.max_:
                     np_array[x] = self.lambda_ * np.random.weibull(self.alpha)
 
-    def set_values(self, np_array):
-        self._weibull(np_array)
+    def set_values(self, np_array, element_ids=None, key=()):
+        self._weibull(np_array, element_ids, key)
 
 
 class RayleighDistribution():
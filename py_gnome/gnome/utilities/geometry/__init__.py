@@ -13,6 +13,7 @@ Some of these are in Cython for speed.
 """
 
 from .cy_point_in_polygon import point_in_poly, points_in_poly
+from .polygon_index import PolygonIndex
 
 from .poly_clockwise import is_clockwise_convex, is_clockwise
 
@@ -105,6 +105,33 @@ def random_pt_in_tri(tri):
     RPP = A + R*AB + S*AC
     return RPP
 
+def random_pts_in_tris(tris, r, s):
+    """
+    Points in triangles, from uniform random numbers -- the vectorized
+    random_pt_in_tri()
+
+    :param tris: sequence of N triangles: Shapely.Polygons or 3x2 arrays
+                 of coords
+    :param r, s: N uniform random numbers in [0, 1) each
+
+    :returns: (N, 2) array of points
+    """
+    coords = np.array([np.asarray(t.exterior.coords if isinstance(t, Polygon)
+                                  else t)[:3, :2] for t in tris],
+                      dtype=np.float64).reshape(-1, 3, 2)
+    r = np.array(r, dtype=np.float64)
+    s = np.array(s, dtype=np.float64)
+
+    flip = r + s >= 1
+    r[flip] = 1 - r[flip]
+    s[flip] = 1 - s[flip]
+
+    A = coords[:, 0]
+    AB = coords[:, 1] - A
+    AC = coords[:, 2] - A
+
+    return A + r[:, np.newaxis] * AB + s[:, np.newaxis] * AC
+
 def load_shapefile(filename, transform_crs=True):
     """
     Use GeoPandas to load up a shapefile into a FeatureCollection
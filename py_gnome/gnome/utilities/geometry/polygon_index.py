@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+"""
+Fast point in polygon tests of many points against the same polygon
+
+The polygon is classified once, when the index is built:
+
+- If it is an axis-aligned rectangle (the usual map bounds), the test is
+  just four comparisons per point.
+
+- Otherwise, a grid is laid over its bounding box, and each grid cell is
+  marked as inside, outside, or on the boundary (crossed by an edge). Only
+  the points that fall in boundary cells need the full point in polygon
+  test. Polygons with only a few vertices are fast to test anyway, so
+  for those, only the points in the bounding box are tested.
+
+The results are the same as points_in_poly(): for rectangles, that includes
+points exactly on the edges (in on the min sides, out on the max sides).
+For other polygons, points within round-off of the bounding box edges may
+differ.
+"""
+
+import numpy as np
+
+from .cy_point_in_polygon import points_in_poly
+
+
+class PolygonIndex(object):
+    """
+    An index of a polygon for testing many points against it
+
+    The polygon is copied when the index is built, so changing it after
+    that does not change the index.
+    """
+    outside = 0
+    inside = 1
+    boundary = 2
+
+    # polygons with fewer vertices than this don't get a grid
+    min_grid_vertices = 8
+
+    def __init__(self, polygon, grid_size=64):
+        """
+        :param polygon: the vertices of the polygon
+        :type polygon: Nx2 numpy array of floats, or something that can be
+                       turned into one
+
+        :param grid_size=64: number of grid cells along each side of the
+                             bounding box, if the polygon is not a rectangle
+        """
+        self.polygon = np.array(polygon, dtype=np.float64).reshape(-1, 2)
+        self.grid_size = grid_size
+
+        if len(self.polygon) == 0:
+            self.min = self.max = np.zeros((2,))
+        else:
+            self.min = self.polygon.min(axis=0)
+            self.max = self.polygon.max(axis=0)
+
+        self.cell_size = (self.max - self.min) / grid_size
+
+        self.has_area = bool(np.all(self.cell_size > 0))
+        self.is_rectangle = self._is_rectangle()
+        self.grid = None
+        if (self.has_area and not self.is_rectangle and
+                len(self.polygon) >= self.min_grid_vertices):
+            self.grid = self._build_grid()
+
+    def _is_rectangle(self):
+        """
+        True if the polygon is an axis-aligned rectangle
+        """
+        poly = self.polygon
+        if len(poly) == 5 and np.array_equal(poly[0], poly[-1]):
+            poly = poly[:-1]
+
+        if len(poly) != 4 or not self.has_area:
+            return False
+
+        # all the vertices are corners of the bounding box, and each edge
+        # changes just one coordinate
+        on_corners = np.all((poly == self.min) | (poly == self.max))
+        changed = (poly != np.roll(poly, -1, axis=0))
+
+        return bool(on_corners and np.all(changed.sum(axis=1) == 1))
+
+    def _cell_index(self, x, y):
+        n = self.grid_size
+        i = np.clip(np.floor((x - self.min[0]) / self.cell_size[0]), 0, n - 1)
+        j = np.clip(np.floor((y - self.min[1]) / self.cell_size[1]), 0, n - 1)
+
+        return i.astype(np.intp), j.astype(np.intp)
+
+    def _build_grid(self):
+        """
+        Mark each grid cell as inside, outside, or on the boundary
+        """
+        n = self.grid_size
+        poly = self.polygon
+        delta = np.roll(poly, -1, axis=0) - poly
+
+        # split the edges into pieces no more than half a cell long, so the
+        # bounding box of each piece covers at most 2x2 cells
+        num_pieces = np.max(np.ceil(np.abs(delta) / (self.cell_size / 2)),
+                            axis=1)
+        num_pieces = np.maximum(num_pieces, 1).astype(np.intp)
+
+        edge = np.repeat(np.arange(len(poly)), num_pieces)
+        piece = (np.arange(len(edge)) -
+                 np.repeat(np.cumsum(num_pieces) - num_pieces, num_pieces))
+        start = (poly[edge] +
+                 delta[edge] * (piece / num_pieces[edge])[:, np.newaxis])
+        end = (poly[edge] +
+               delta[edge] * ((piece + 1) / num_pieces[edge])[:, np.newaxis])
+
+        low_i, low_j = self._cell_index(np.minimum(start[:, 0], end[:, 0]),
+                                        np.minimum(start[:, 1], end[:, 1]))
+        high_i, high_j = self._cell_index(np.maximum(start[:, 0], end[:, 0]),
+                                          np.maximum(start[:, 1], end[:, 1]))
+
+        on_edge = np.zeros((n, n), dtype=bool)
+        for i in (low_i, high_i):
+            for j in (low_j, high_j):
+                on_edge[i, j] = True
+
+        # grow the boundary by a cell, so round-off in the cell index can't
+        # put a point near an edge in a cell that isn't marked
+        boundary = on_edge.copy()
+        boundary[1:, :] |= on_edge[:-1, :]
+        boundary[:-1, :] |= on_edge[1:, :]
+        boundary[:, 1:] |= on_edge[:, :-1]
+        boundary[:, :-1] |= on_edge[:, 1:]
+
+        # no edge crosses the other cells, so they are all in or all out
+        centers = np.zeros((n * n, 3))
+        i, j = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+        centers[:, 0] = self.min[0] + (i.ravel() + 0.5) * self.cell_size[0]
+        centers[:, 1] = self.min[1] + (j.ravel() + 0.5) * self.cell_size[1]
+
+        grid = np.where(points_in_poly(poly, centers).reshape(n, n),
+                        self.inside, self.outside).astype(np.uint8)
+        grid[boundary] = self.boundary
+
+        return grid
+
+    def contains(self, points):
+        """
+        Compute whether the points are in the polygon
+
+        :param points: the points to test
+        :type points: NX3 numpy array of (x, y, z) floats, or a single
+                      (x, y, z) point. z is ignored.
+
+        :returns: a boolean array the same length as points -- or a python
+                  bool if a single point was passed in.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        scalar = (points.ndim == 1)
+        points = points.reshape(-1, points.shape[-1])
+
+        x = points[:, 0]
+        y = points[:, 1]
+
+        # points in polygon are never on the max sides of the bounding box
+        result = ((x >= self.min[0]) & (x < self.max[0]) &
+                  (y >= self.min[1]) & (y < self.max[1]))
+
+        if not self.has_area:
+            result[:] = False
+        elif not self.is_rectangle:
+            check = np.nonzero(result)[0]
+
+            if self.grid is not None:
+                cells = self.grid[self._cell_index(x[check], y[check])]
+                result[check[cells == self.outside]] = False
+                check = check[cells == self.boundary]
+
+            if len(check) > 0:
+                check_points = np.zeros((len(check), 3))
+                check_points[:, :2] = points[check, :2]
+                result[check] = points_in_poly(self.polygon, check_points)
+
+        if scalar:
+            return bool(result[0])
+        else:
+            return result
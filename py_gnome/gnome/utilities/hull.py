@@ -1,7 +1,7 @@
 import geopandas as gpd
 import numpy as np
-from shapely.geometry import Polygon, MultiPolygon, Point, MultiPoint, LineString
-from shapely import concave_hull, union_all
+from shapely.geometry import Polygon, MultiPolygon, Point, LineString
+from shapely import concave_hull, union_all, multipoints
 
 import logging
 logger = logging.getLogger(__name__)
@@ -17,22 +17,95 @@ def buffer_hull(this_hull, buffer_distance=1):
     return geodataframe_3857_buffered_back_to_4326[0]
 
 
+def decimate_points(positions, max_points):
+    """
+    Thin out a set of points to about max_points, for computing the hull of
+    a very large spill
+
+    The points are binned on a regular grid over their extent, and one
+    point is kept from each occupied cell -- so the outline of the set is
+    kept, but dense clusters are thinned.
+
+    :param positions: (N, 2) or (N, 3) array of positions
+    :param max_points: about how many points to keep. At most this many
+                       are kept. If None, or there are fewer points than
+                       this, they are all returned.
+    """
+    if max_points is None or len(positions) <= max_points:
+        return positions
+
+    xy = positions[:, :2]
+    lower = xy.min(axis=0)
+    extent = xy.max(axis=0) - lower
+
+    # cells along each axis, so there are at most max_points of them
+    cells = max(int(np.sqrt(max_points)), 1)
+    size = np.where(extent > 0, extent / cells, 1.0)
+    index = np.minimum(((xy - lower) / size).astype(np.int64), cells - 1)
+
+    _cells, keep = np.unique(index[:, 0] * cells + index[:, 1],
+                             return_index=True)
+
+    return positions[np.sort(keep)]
+
+
+def _hull_of_points(positions, ratio, allow_holes, max_points=None):
+    """
+    The concave hull of a set of points, as a Polygon or MultiPolygon --
+    or None if there isn't one
+
+    Hulls that come out as a Point or LineString are buffered into a
+    Polygon.
+    """
+    positions = decimate_points(positions, max_points)
+
+    this_hull = concave_hull(multipoints(positions), ratio=ratio,
+                             allow_holes=allow_holes)
+
+    if isinstance(this_hull, (Point, LineString)):
+        this_hull = buffer_hull(this_hull)
+
+    if isinstance(this_hull, (Polygon, MultiPolygon)):
+        return this_hull
+
+    return None
+
+
+def _unique_in_order(values):
+    """
+    the unique values of an array, in the order they first appear
+    """
+    _values, first = np.unique(values, return_index=True)
+
+    return values[np.sort(first)]
+
+
 def calculate_hull(spill_container, ratio=0.5, union_results=True,
-                   allow_holes=False, separate_by_spill=False):
+                   allow_holes=False, separate_by_spill=False,
+                   max_points=None):
+    """
+    Concave hulls around the elements
+
+    :param spill_container: a spill container, or a sequence of them
+    :param ratio=0.5: ratio for shapely's concave_hull()
+    :param union_results=True: return one hull: the union of all of them
+    :param allow_holes=False: allow holes in the hulls
+    :param separate_by_spill=False: a separate hull for each spill
+    :param max_points=None: compute the hulls on at most about this many
+                            points (see decimate_points()) -- for very
+                            large spills.
+
+    :returns: dict of the 'hulls', and the 'spill_num' of each
+    """
     hulls_found = {'hulls': [],
                    'spill_num': []}
-    sc_positions = None
-    sc_spill_num = None
     if isinstance(spill_container, (tuple, list)):
         # If we have multiple spill containers, we need to combine the
         # position and spill num arrays
-        positions = []
-        spill_num = []
-        for sc in spill_container:
-            positions.append(sc['positions'])
-            spill_num.append(sc['spill_num'])
-        sc_positions = np.concatenate(positions)
-        sc_spill_num = np.concatenate(spill_num)
+        sc_positions = np.concatenate([sc['positions']
+                                       for sc in spill_container])
+        sc_spill_num = np.concatenate([sc['spill_num']
+                                       for sc in spill_container])
     else:
         sc_positions = spill_container['positions']
         sc_spill_num = spill_container['spill_num']
@@ -40,39 +113,18 @@ def calculate_hull(spill_container, ratio=0.5, union_results=True,
     if len(sc_positions) == 0:
         return hulls_found
     if separate_by_spill:
-        # Make a dataframe
-        schema = {'positions': [Point(point)
-                                for point in sc_positions],
-                  'spill_num': sc_spill_num}
-        data_frame = gpd.GeoDataFrame(schema, crs='epsg:4326',
-                                      geometry='positions')
-        spill_nums = data_frame['spill_num'].unique()
-        for spill_num in spill_nums:
-            this_spill = data_frame[data_frame['spill_num'] == spill_num]
-            this_mpt = MultiPoint([Point(point)
-                                   for point in this_spill['positions']])
-            this_hull = concave_hull(this_mpt, ratio=ratio,
-                                     allow_holes=allow_holes)
-            if (isinstance(this_hull, Point) or
-                    isinstance(this_hull, LineString)):
-                this_hull = buffer_hull(this_hull)
-            if (isinstance(this_hull, Polygon) or
-                    isinstance(this_hull, MultiPolygon)):
+        for spill_num in _unique_in_order(sc_spill_num):
+            this_hull = _hull_of_points(
+                sc_positions[sc_spill_num == spill_num], ratio, allow_holes,
+                max_points)
+            if this_hull is not None:
                 hulls_found['hulls'].append(this_hull)
                 hulls_found['spill_num'].append(spill_num)
     else:
         # We want a hull around everything
-        schema = {'positions': [Point(point)
-                                for point in sc_positions]}
-        data_frame = gpd.GeoDataFrame(schema, crs='epsg:4326')
-        this_mpt = MultiPoint([Point(point)
-                               for point in sc_positions])
-        this_hull = concave_hull(this_mpt, ratio=ratio,
-                                 allow_holes=allow_holes)
-        if (isinstance(this_hull, Point) or isinstance(this_hull, LineString)):
-            this_hull = buffer_hull(this_hull)
-        if (isinstance(this_hull, Polygon) or
-                isinstance(this_hull, MultiPolygon)):
+        this_hull = _hull_of_points(sc_positions, ratio, allow_holes,
+                                    max_points)
+        if this_hull is not None:
             hulls_found['hulls'].append(this_hull)
             hulls_found['spill_num'].append(None)
     if union_results:
@@ -102,62 +154,64 @@ def calculate_hull(spill_container, ratio=0.5, union_results=True,
 # Middle bins are cutoffs[previous] < [data] < cutoffs[current]
 # Last "high" bin is always cutoffs[previous] < [data]
 
+# the spill container arrays of the contour parameters, where the names
+# are different
+_param_arrays = {'surf_conc': 'surface_concentration'}
+
+
 def calculate_contours(spill_container, cutoff_struct=None,
-                       ratio=0.5, allow_holes=False):
+                       ratio=0.5, allow_holes=False, max_points=None):
+    """
+    Concave hulls around the elements of each spill in each bin of a
+    parameter, as given by the cutoff_struct (see above)
+
+    A value exactly on a cutoff goes in the lower of the two bins. With
+    just one cutoff, there is one bin: the values up to it.
+
+    :param max_points=None: compute the hulls on at most about this many
+                            points (see decimate_points()) -- for very
+                            large spills.
+
+    :returns: list of dicts of the 'contour' and its cutoff's data
+    """
     contours_found = []
     # If we are not calculating any contours, dont bother parsing the data
     if not cutoff_struct or len(spill_container['positions']) == 0:
-        return [];
+        return []
+    positions = spill_container['positions']
+    sc_spill_num = spill_container['spill_num']
     # The spills requested are the keys
-    spills = cutoff_struct.keys()
-    # Make a dataframe
-    schema = {'positions': [Point(point)
-                            for point in spill_container['positions']],
-              'spill_num': spill_container['spill_num'],
-              'mass': spill_container['mass'],
-              'age': spill_container['age'],
-              'status_codes': spill_container['status_codes']}
-    # Some elements are optional... check those here:
-    if 'surface_concentration' in spill_container:
-        schema['surf_conc'] = spill_container['surface_concentration']
-    if 'viscosity' in spill_container:
-        schema['viscosity'] = spill_container['viscosity']
-    if 'frac_water' in spill_container:
-        schema['frac_water'] = spill_container['frac_water']
-    if 'density' in spill_container:
-        schema['density'] = spill_container['density']
-    data_frame = gpd.GeoDataFrame(schema, crs='epsg:4326',
-                                  geometry='positions')
-    for spill_num in spills:
-        this_spill = data_frame[data_frame['spill_num'] == spill_num]
-        this_struct = cutoff_struct[spill_num]
+    for spill_num, this_struct in cutoff_struct.items():
+        in_spill = sc_spill_num == spill_num
+        if not in_spill.any():
+            continue
+
         param = this_struct['param']
-        for idx, cutoff in enumerate(this_struct['cutoffs']):
-            if idx == 0:
-                # First one... we just do anything less than the current cutoff
-                this_contour_set = this_spill[this_spill[param] <= cutoff['cutoff']]
-            elif idx == len(this_struct['cutoffs'])-1:
-                # Last one... we just do anything greater than the
-                # previous cutoff
-                this_contour_set = this_spill[this_spill[param] >= this_struct['cutoffs'][idx-1]['cutoff']]
-            else:
-                # Else we bracket it...
-                this_contour_set = this_spill[this_spill[param] <= cutoff['cutoff']]
-                this_contour_set = this_contour_set[this_contour_set[param] >= this_struct['cutoffs'][idx-1]['cutoff']]
-            if len(this_contour_set['positions']) > 0:
-                this_contour_mpt = MultiPoint([Point(point) for point in
-                                               this_contour_set['positions']])
-                this_hull = concave_hull(this_contour_mpt, ratio=ratio,
-                                         allow_holes=allow_holes)
-                if (isinstance(this_hull, Point)
-                        or isinstance(this_hull, LineString)):
-                    this_hull = buffer_hull(this_hull)
-                if (isinstance(this_hull, Polygon) or
-                        isinstance(this_hull, MultiPolygon)):
-                    contours_found.append({'spill_num': spill_num,
-                                           'cutoff': cutoff['cutoff'],
-                                           'cutoff_id': cutoff['cutoff_id'],
-                                           'color': cutoff['color'],
-                                           'label': cutoff['label'],
-                                           'contour': this_hull})
+        values = spill_container[_param_arrays.get(param, param)][in_spill]
+        this_positions = positions[in_spill]
+
+        # the last cutoff is the top of the scale: everything over the one
+        # before it goes in the last bin -- unless it is the only one, then
+        # it's just what is under it
+        cutoffs = this_struct['cutoffs']
+        edges = np.array([c['cutoff'] for c in
+                          (cutoffs[:-1] if len(cutoffs) > 1 else cutoffs)],
+                         dtype=np.float64)
+        bins = np.digitize(values, edges, right=True)
+        bins[np.isnan(values)] = -1
+
+        for idx, cutoff in enumerate(cutoffs):
+            in_bin = bins == idx
+            if not in_bin.any():
+                continue
+
+            this_hull = _hull_of_points(this_positions[in_bin], ratio,
+                                        allow_holes, max_points)
+            if this_hull is not None:
+                contours_found.append({'spill_num': spill_num,
+                                       'cutoff': cutoff['cutoff'],
+                                       'cutoff_id': cutoff['cutoff_id'],
+                                       'color': cutoff['color'],
+                                       'label': cutoff['label'],
+                                       'contour': this_hull})
     return contours_found
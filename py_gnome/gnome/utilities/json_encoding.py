@@ -0,0 +1,284 @@
+"""
+Fast JSON encoding of element data arrays
+
+The trajectory outputters write the data of every element every output
+step. Going through Python objects for that -- a geojson Feature per element,
+or a list of floats per array, pretty printed by the json module -- takes
+seconds per step for a few hundred thousand elements.
+
+The functions here write the JSON text of numpy arrays straight from the
+arrays: the numbers are formatted with vectorized numpy operations into byte
+strings, and joined without creating a Python object per element.
+
+format_values() makes the JSON text of each value of an array, and
+format_records() combines several of those (with literal text between them)
+into a JSON object per element. join_values() joins them into a list, and
+encode() writes a (nested) document with arrays in it.
+"""
+
+import json
+
+import numpy as np
+
+
+def _format_fixed(values, decimals):
+    """
+    text of floats rounded to decimals, as a (N, width) array of characters,
+    and the start and length of the text in each row
+
+    The numbers are written with as few fraction digits as they need (but
+    at least one), like the repr of the rounded float.
+    """
+    scaled = np.rint(np.abs(values) * 10.0 ** decimals).astype(np.int64)
+    negative = (values < 0) & (scaled != 0)
+
+    num = len(values)
+    whole = scaled // 10 ** decimals
+
+    int_width = len(str(int(whole.max()))) if num > 0 else 1
+    width = int_width + max(decimals, 1)
+
+    # number of digits of the integer part
+    num_int = np.ones(num, dtype=np.int64)
+    for k in range(1, int_width):
+        num_int += whole >= 10 ** k
+
+    # number of fraction digits, without the trailing zeros
+    num_frac = np.full(num, max(decimals, 1), dtype=np.int64)
+    for k in range(1, decimals):
+        num_frac -= (scaled % 10 ** k == 0)
+
+    if decimals == 0:
+        scaled = scaled * 10
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = ((scaled[:, np.newaxis] // powers) % 10 +
+              ord('0')).astype(np.uint8)
+
+    # sign, integer digits, ., fraction digits -- the sign goes just before
+    # the first digit, so the text is all in one piece
+    chars = np.empty((num, width + 2), dtype=np.uint8)
+    chars[:, 1:int_width + 1] = digits[:, :int_width]
+    chars[:, int_width + 1] = ord('.')
+    chars[:, int_width + 2:] = digits[:, int_width:]
+
+    start = int_width - num_int
+    chars[np.flatnonzero(negative), start[negative]] = ord('-')
+    start += ~negative
+
+    length = (width + 2) - start - (max(decimals, 1) - num_frac)
+
+    return chars, start, length
+
+
+def _to_strings(chars, start, length):
+    """
+    the text of each row as a fixed width bytes array
+    """
+    columns = np.arange(chars.shape[1])
+    index = np.minimum(columns + start[:, np.newaxis], chars.shape[1] - 1)
+
+    packed = np.take_along_axis(chars, index, axis=1)
+    packed[columns >= length[:, np.newaxis]] = 0
+
+    return (np.ascontiguousarray(packed)
+            .view('S{}'.format(chars.shape[1]))[:, 0])
+
+
+def _join_fixed(chars, start, length, separator):
+    """
+    the text of all the rows, joined with separator
+    """
+    sep = np.frombuffer(separator, dtype=np.uint8)
+    num, width = chars.shape
+
+    full = np.empty((num, width + len(sep)), dtype=np.uint8)
+    full[:, :width] = chars
+    full[:, width:] = sep
+
+    columns = np.arange(full.shape[1])
+    used = ((columns >= start[:, np.newaxis]) &
+            (columns < (start + length)[:, np.newaxis]))
+    used[:, width:] = True
+
+    return full[used].tobytes()[:-len(sep)]
+
+
+def format_values(values, decimals=None):
+    """
+    The JSON text of each value of a numeric array
+
+    :param values: 1-d array of floats, integers, or booleans
+    :param decimals=None: round floats to this many decimal places. If
+                          None, floats are written in full.
+
+    :returns: a numpy bytes (dtype 'S') array of the same length
+    """
+    values = np.asarray(values)
+
+    if values.ndim != 1:
+        raise ValueError('Only 1-d arrays can be formatted, not shape {}'
+                         .format(values.shape))
+
+    kind = values.dtype.kind
+
+    if kind == 'b':
+        return np.where(values, b'true', b'false')
+
+    if kind in 'iu':
+        return values.astype(bytes)
+
+    if kind != 'f':
+        raise TypeError('Can only format float, integer or boolean arrays, '
+                        'not {}'.format(values.dtype))
+
+    values = values.astype(np.float64)
+
+    if decimals is not None:
+        values = values.round(decimals)
+
+    if not _fixed_ok(values, decimals):
+        # the general (slower) way: the repr of each float
+        text = values.astype('S32')
+        text[np.isnan(values)] = b'NaN'
+        text[values == np.inf] = b'Infinity'
+        text[values == -np.inf] = b'-Infinity'
+
+        return text
+
+    return _to_strings(*_format_fixed(values, decimals))
+
+
+def _fixed_ok(values, decimals):
+    """
+    whether floats can be written with _format_fixed()
+    """
+    return (decimals is not None and
+            values.dtype.kind == 'f' and
+            bool(np.isfinite(values).all()) and
+            (len(values) == 0 or
+             np.abs(values).max() * 10.0 ** (decimals + 1) < 2 ** 53))
+
+
+def format_records(*parts):
+    """
+    The text of a record for each element, made by concatenating the parts
+
+    :param parts: bytes (the same for every element) and bytes arrays from
+                  format_values() (one value per element)
+
+    :returns: a numpy bytes array, one record per element
+    """
+    arrays = [p for p in parts if isinstance(p, np.ndarray)]
+
+    if not arrays:
+        raise ValueError('At least one of the parts must be an array')
+
+    records = np.full(len(arrays[0]), b'', dtype='S1')
+    for part in parts:
+        records = np.char.add(records, part)
+
+    return records
+
+
+def join_values(strings, separator=b', '):
+    """
+    Join a bytes array into one bytes string -- without making a Python
+    object for each item
+
+    :param strings: bytes array, e.g. from format_values() or
+                    format_records()
+    """
+    if len(strings) == 0:
+        return b''
+
+    # nul characters pad the items out to the width of the array
+    joined = np.char.add(np.asarray(strings, dtype=bytes), separator)
+    chars = np.frombuffer(joined.tobytes(), dtype=np.uint8)
+
+    return chars[chars != 0].tobytes()[:-len(separator)]
+
+
+def encode_array(values, decimals=None):
+    """
+    JSON text of an array: a list of its values -- or of lists, for a 2-d
+    array
+
+    :param decimals=None: round floats to this many decimal places
+    """
+    values = np.asarray(values)
+
+    if values.ndim == 2:
+        columns = [format_values(values[:, i], decimals)
+                   for i in range(values.shape[1])]
+        parts = [b'[']
+        for column in columns:
+            parts.extend((column, b', '))
+        parts[-1] = b']'
+
+        items = format_records(*parts) if len(values) > 0 else []
+    elif _fixed_ok(values, decimals):
+        # straight to the joined text
+        text = _join_fixed(*_format_fixed(values.round(decimals), decimals),
+                           separator=b', ')
+        return '[' + text.decode('ascii') + ']'
+    else:
+        items = format_values(values, decimals)
+
+    return '[' + join_values(items).decode('ascii') + ']'
+
+
+def encode(document, decimals=None):
+    """
+    JSON text of a document: any JSON-compatible structure of dicts, lists
+    and values, which can include numpy arrays
+
+    The arrays are written with encode_array(); everything else with the
+    json module.
+
+    :param decimals=None: round float arrays to this many decimal places --
+                          an int, or a dict of the number for each key of
+                          the arrays in the document.
+    """
+    return ''.join(_encode_parts(document, decimals, None))
+
+
+def _encode_parts(obj, decimals, key):
+    if isinstance(obj, np.ndarray) and obj.ndim > 0:
+        places = decimals.get(key) if isinstance(decimals, dict) else decimals
+        yield encode_array(obj, places)
+
+    elif isinstance(obj, dict):
+        yield '{'
+        for i, (k, val) in enumerate(obj.items()):
+            if i > 0:
+                yield ', '
+            yield json.dumps(str(k))
+            yield ': '
+            yield from _encode_parts(val, decimals, k)
+        yield '}'
+
+    elif isinstance(obj, (list, tuple)):
+        yield '['
+        for i, val in enumerate(obj):
+            if i > 0:
+                yield ', '
+            yield from _encode_parts(val, decimals, key)
+        yield ']'
+
+    elif isinstance(obj, (np.generic, np.ndarray)):
+        yield json.dumps(obj.item())
+
+    else:
+        yield json.dumps(obj)
+
+
+def write_sidecar(filename, arrays):
+    """
+    Write arrays to a compact binary file (numpy .npz) -- to go along with
+    a JSON file of the same data, for readers that can use it
+
+    :param arrays: dict of the arrays, by name
+    """
+    with open(filename, 'wb') as outfile:
+        np.savez(outfile, **{name: np.asarray(arr)
+                             for name, arr in arrays.items()})
@@ -3,18 +3,34 @@ rand.py
 
 Contains functions for adding randomness - not to
 confuse with standard python random functions
+
+It also has the random streams used by the python components, which
+are reproducible no matter how the run is split up:
+
+Each component gets its own stream, keyed on the seed and a name for the
+component, so adding or removing one component doesn't change the random
+numbers the others get.
+
+Random numbers for the elements are counter based -- a hash of the seed,
+the component, a counter (like the model time) and the element id -- so an
+element gets the same numbers whether it is in the same process as all the
+others or not, and whatever order they are in.
 """
 
+import hashlib
+import random
+
 import numpy as np
 
 from gnome.cy_gnome import cy_helpers
-import random
 
 
 def random_with_persistance(low, high,
                             array=None,  # update this array, if provided
                             persistence=None,
-                            time_step=1.):
+                            time_step=1.,
+                            element_ids=None,
+                            key=()):
     """
     Used by gnome to generate a randomness between low and high, which is
     persistent for duration time_step
@@ -30,6 +46,12 @@ def random_with_persistance(low, high,
         size of time_step. Default is None. If persistence is None, it gets set
         equal to 'time_step'. If persistence < 0 for any elements, their values
         are not updated in the 'array'
+    :param element_ids: the ids of the elements. If given, the random numbers
+        come from streams.element_uniform(), keyed on the element ids and
+        key, so they don't depend on how the elements are split up.
+        Default is None: they come from numpy's global random state.
+    :param key: the rest of the stream key -- the component, and a counter
+        (like the model time) if the same elements are drawn for again.
 
     :returns: returns 'array' with newly computed values
 
@@ -78,7 +100,7 @@ def random_with_persistance(low, high,
         if persistence == time_step, then no need to scale the [low, high]
         interval
         """
-        array[:] = np.random.uniform(low, high)
+        array[:] = _uniform(low, high, element_ids, key)
     else:
         """
         if persistence == time_step, then no need to scale the [low, high]
@@ -110,14 +132,156 @@ def random_with_persistance(low, high,
                 low[u_mask] = mean - l__range / 2.
                 high[u_mask] = mean + l__range / 2.
 
-            array[u_mask] = np.random.uniform(low[u_mask], high[u_mask])
+            array[u_mask] = _uniform(low[u_mask], high[u_mask],
+                                     None if element_ids is None
+                                     else np.asarray(element_ids)[u_mask],
+                                     key)
 
     return array
 
 
+def _key_int(part):
+    """
+    Turn a part of a stream key into a non-negative int
+
+    Non-negative ints are used as is, anything else is hashed from its str()
+    -- not hash(), which is different in every process.
+    """
+    if isinstance(part, (int, np.integer)) and part >= 0:
+        return int(part)
+
+    digest = hashlib.sha256(str(part).encode('utf-8')).digest()
+
+    return int.from_bytes(digest[:8], 'little')
+
+
+def _mix64(x):
+    """
+    The splitmix64 finalizer: scrambles an array of uint64 in place
+    """
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xbf58476d1ce4e5b9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94d049bb133111eb)
+    x ^= x >> np.uint64(31)
+
+    return x
+
+
+class RandomStreams(object):
+    """
+    Reproducible, independent random streams for the stochastic components
+
+    ``generator(*key)`` gives a numpy Generator for a component, and
+    ``element_uniform(ids, *key)`` / ``element_normal(ids, *key)`` give
+    random numbers for each element. The key is any number of ints or
+    strings, e.g. ('RasterMap.refloat', uncertain, time step number).
+    The same seed and key always give the same numbers.
+    """
+
+    def __init__(self, seed=None):
+        """
+        :param seed=None: seed for all the streams. If None, a random seed
+                          is used (so runs are not reproducible)
+        """
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """
+        Re-seed all the streams
+        """
+        self.seed_sequence = np.random.SeedSequence(seed)
+
+    def _state(self, key, n_words):
+        spawn_key = tuple(_key_int(part) for part in key)
+        seq = np.random.SeedSequence(self.seed_sequence.entropy,
+                                     spawn_key=spawn_key)
+
+        return seq.generate_state(n_words, np.uint64)
+
+    def generator(self, *key):
+        """
+        A counter-based (Philox) numpy Generator for the stream named by key
+
+        Each call returns a new Generator, starting from the beginning of
+        the stream.
+        """
+        return np.random.Generator(np.random.Philox(key=self._state(key, 2)))
+
+    def c_seed(self, *key):
+        """
+        A seed for the C random number generator, for the stream named by key
+
+        The C++ movers draw from the C rand(), one number after another, so
+        seeding it with this before each of their calls makes their numbers
+        independent of the other components. They still depend on the order
+        of the elements in the call.
+        """
+        return int(self._state(key, 1)[0] % np.uint64(2 ** 31))
+
+    def element_uniform(self, element_ids, *key, size=None):
+        """
+        Uniform random numbers in [0, 1) for each element
+
+        :param element_ids: the ids of the elements (the 'id' data array)
+
+        :param key: the rest of the key -- should include a counter (like
+                    the time step) so the numbers change from step to step
+
+        :param size=None: number of random numbers per element. If None,
+                          one per element.
+
+        :returns: array of shape (N,) -- or (N, size), if size is given.
+        """
+        ids = np.asarray(element_ids, dtype=np.uint64).reshape(-1, 1)
+        num = 1 if size is None else size
+        k0, k1 = self._state(key, 2)
+
+        x = _mix64(ids * np.uint64(0x9e3779b97f4a7c15) + k0)
+        x = np.repeat(x, num, axis=1)
+        x += (np.arange(num, dtype=np.uint64) + np.uint64(1)) * k1
+        x = _mix64(_mix64(x))
+
+        # the top 53 bits make a double in [0, 1)
+        result = (x >> np.uint64(11)) * (1.0 / 2 ** 53)
+
+        return result[:, 0] if size is None else result
+
+    def element_normal(self, element_ids, *key, size=None):
+        """
+        Standard normal random numbers for each element
+
+        Same as element_uniform(), but normally distributed
+        """
+        num = 1 if size is None else size
+        u = self.element_uniform(element_ids, *key, size=2 * num)
+
+        # Box-Muller -- 1 - u is in (0, 1], so the log is finite
+        result = (np.sqrt(-2.0 * np.log(1.0 - u[:, :num])) *
+                  np.cos(2.0 * np.pi * u[:, num:]))
+
+        return result[:, 0] if size is None else result
+
+
+# the streams used by the python components -- seed() re-seeds them
+streams = RandomStreams()
+
+
+def _uniform(low, high, element_ids, key):
+    """
+    uniform random numbers in [low, high) -- from the streams for the
+    elements if element_ids is not None, or numpy's global random state
+    """
+    if element_ids is None:
+        return np.random.uniform(low, high)
+
+    return low + (high - low) * streams.element_uniform(element_ids, *key)
+
+
 def seed(seed=1):
     """
-    Set the C++, the python and the numpy random seed to desired value
+    Set the C++, the python and the numpy random seed to desired value,
+    and re-seed the random streams
 
     :param seed: Random number generator should be seeded by this value.
         Default is 1
@@ -125,3 +289,4 @@ def seed(seed=1):
     cy_helpers.srand(seed)
     random.seed(seed)
     np.random.seed(seed)
+    streams.seed(seed)
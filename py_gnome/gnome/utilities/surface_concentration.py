@@ -4,10 +4,30 @@ Code to compute surface surface_concentration from particles
 
 Ultimatley, there may be multiple versions of this
 -- with Cython optimizationas and all that.
+
+Two algorithms are available:
+
+"kde": scipy's Kernel Density Estimator. The density is the sum of a
+       Gaussian around every particle, evaluated at every particle, so it
+       is O(N**2) -- slow for more than a few thousand particles.
+
+"grid": the same Gaussian kernel (the same bandwidth as the KDE), but
+        applied to the particle masses binned on a grid, by convolution
+        with an FFT. The density is then interpolated back to the particles.
+        This is O(N + M log M), for a grid of M cells, and differs from the
+        KDE by the error of the binning -- a small fraction of the kernel
+        width.
 """
 import warnings
 import numpy as np
 from scipy.stats import gaussian_kde
+from scipy.signal import fftconvolve
+
+# age bins for the kernels: the concentration of the particles in each bin
+# is computed from all the particles younger than the end of the bin
+AGE_BIN_LENGTH = 1 * 3600
+
+ALGORITHMS = ('kde', 'grid')
 
 
 def compute_surface_concentration(sc, algorithm):
@@ -17,15 +37,61 @@ def compute_surface_concentration(sc, algorithm):
     :param sc: spill container -- data in it wil be usd, and the results will
                be put in a "surface_concentration" array
 
-    :param algorithm: algorithm to use -- currently only "kde" is supported
+    :param algorithm: algorithm to use -- "kde" or "grid"
     """
     if sc['positions'].shape[0] == 0 or not algorithm:  # nothing to be done
         return
     if algorithm == 'kde':
         surface_conc_kde(sc)
+    elif algorithm == 'grid':
+        surface_conc_grid(sc)
     else:
-        raise ValueError('the only surface concentration algorithm '
-                         'currently supported is "kde"')
+        raise ValueError('surface concentration algorithm must be one of {}, '
+                         'not "{}"'.format(ALGORITHMS, algorithm))
+
+
+def _kernel_sets(age, bin_length=AGE_BIN_LENGTH):
+    """
+    The particles used for each kernel, and the ones it is evaluated on
+
+    yields (id, id_bin): the indexes of the particles younger than the end
+    of each age bin, and the indexes into those of the ones in the bin
+    """
+    t = age.min()
+    max_age = age.max()
+
+    while t <= max_age:
+        # we use all particles < t + bin_length for kernel
+        id = np.where((age < t + bin_length))[0]
+
+        # we only calculate pdf for particles in bin
+        id_bin = np.where(age[id] >= t)[0]
+
+        yield id, id_bin
+
+        t = t + bin_length
+
+
+def _local_meters(lon, lat):
+    """
+    positions in meters from the south-west corner of the particles
+    """
+    lon0, lat0 = min(lon), min(lat)
+    # FIXME: should use projection code to get this right.
+    x = (lon - lon0) * 111325 * np.cos(lat0 * np.pi / 180)
+    y = (lat - lat0) * 111325
+
+    return np.vstack([x, y])
+
+
+def _enough_points(lon, lat):
+    # can't compute a kde for less than 3 unique points!
+    return len(np.unique(lat)) > 2 and len(np.unique(lon)) > 2
+
+
+def _linalg_warning():
+    warnings.warn('LinAlg error occurred in surface concentration calculations. '
+                  'This is usually do to all (or many) elements being at the same location')
 
 
 def surface_conc_kde(sc):
@@ -52,32 +118,14 @@ def surface_conc_kde(sc):
         lat = positions[:, 1]
 
         # kde will be calculated on particles 0-6hrs, 6-12hrs,...
-        bin_length = 1 * 3600
-
-        t = age.min()
-        max_age = age.max()
-
-        while t <= max_age:
-            # we use all particles < t + bin_length for kernel
-            id = np.where((age < t + bin_length))[0]
-
+        for id, id_bin in _kernel_sets(age):
             lon_for_kernel = lon[id]
             lat_for_kernel = lat[id]
-            age_for_kernel = age[id]
             mass_for_kernel = mass[id]
 
-            # we only calculate pdf for particles in bin
-            id_bin = np.where(age_for_kernel >= t)[0]
-
-            # can't compute a kde for less than 3 unique points!
-            if (len(np.unique(lat_for_kernel)) > 2 and
-                    len(np.unique(lon_for_kernel)) > 2):
+            if _enough_points(lon_for_kernel, lat_for_kernel):
                 try:
-                    lon0, lat0 = min(lon_for_kernel), min(lat_for_kernel)
-                    # FIXME: should use projection code to get this right.
-                    x = (lon_for_kernel - lon0) * 111325 * np.cos(lat0 * np.pi / 180)
-                    y = (lat_for_kernel - lat0) * 111325
-                    xy = np.vstack([x, y])
+                    xy = _local_meters(lon_for_kernel, lat_for_kernel)
                     if len(np.unique(mass_for_kernel)) > 1:
                         kernel = gaussian_kde(
                             xy,
@@ -90,8 +138,150 @@ def surface_conc_kde(sc):
                     else:
                         c[id[id_bin]] = kernel(xy[:, id_bin]) * len(mass_for_kernel)
                 except np.linalg.LinAlgError:
-                    warnings.warn('LinAlg error occurred in surface concentration calculations. '
-                                  'This is usually do to all (or many) elements being at the same location')
-            t = t + bin_length
+                    _linalg_warning()
+
+        sc['surface_concentration'][sid] = c
+
+
+def surface_conc_grid(sc, cells_per_bandwidth=4, max_cells=1024):
+    """
+    Computes the surface concentration by binning the particle mass on a
+    grid and smoothing it with a Gaussian kernel
+
+    The kernel is the one scipy's gaussian_kde would use (Scott's rule
+    bandwidth of the mass weighted particle positions), and the particles
+    are grouped by age the same way, so the results are close to those of
+    surface_conc_kde().
+
+    a "surface_concentration" array will be added to the spill container
+
+    :param sc: spill container that you want the concentrations computed on
+
+    :param cells_per_bandwidth=4: size of the grid cells -- the number of
+                                  cells across the width (one standard
+                                  deviation) of the kernel. More is more
+                                  accurate, and slower.
+
+    :param max_cells=1024: the most cells the grid can have in each
+                           direction. If the particles are spread out more
+                           than that, the cells are made bigger.
+    """
+    spill_num = sc['spill_num']
+    sc['surface_concentration'] = np.zeros(spill_num.shape[0],)
+    for s in np.unique(spill_num):
+        sid = np.where(spill_num == s)
+        positions = sc['positions'][sid]
+        mass = sc['mass'][sid]
+        age = sc['age'][sid]
+        c = np.zeros(positions.shape[0],)
+        lon = positions[:, 0]
+        lat = positions[:, 1]
+
+        for id, id_bin in _kernel_sets(age):
+            lon_for_kernel = lon[id]
+            lat_for_kernel = lat[id]
+            mass_for_kernel = mass[id]
+
+            if not _enough_points(lon_for_kernel, lat_for_kernel):
+                continue
+
+            xy = _local_meters(lon_for_kernel, lat_for_kernel)
+            if mass_for_kernel.sum() > 0:
+                weights = mass_for_kernel
+            else:
+                weights = np.ones_like(mass_for_kernel)
+
+            try:
+                c[id[id_bin]] = _grid_density(xy, weights, xy[:, id_bin],
+                                              cells_per_bandwidth, max_cells)
+            except np.linalg.LinAlgError:
+                _linalg_warning()
 
         sc['surface_concentration'][sid] = c
+
+
+def _kernel_covariance(xy, weights):
+    """
+    covariance of the Gaussian kernel gaussian_kde uses for these points
+    (Scott's rule)
+    """
+    w = weights / weights.sum()
+    neff = 1.0 / (w ** 2).sum()
+
+    covariance = np.cov(xy, aweights=w, bias=False) * neff ** (-1.0 / 3)
+
+    if (not np.all(np.isfinite(covariance)) or
+            np.linalg.det(covariance) <= 0.0):
+        raise np.linalg.LinAlgError('singular kernel covariance')
+
+    return covariance
+
+
+def _grid_density(xy, weights, points, cells_per_bandwidth, max_cells):
+    """
+    density (weight per square meter) of the weighted positions xy, at the
+    points
+
+    :param xy: (2, N) positions in meters
+    :param weights: (N,) weight of each position
+    :param points: (2, M) positions to compute the density at
+    """
+    covariance = _kernel_covariance(xy, weights)
+    sigma = np.sqrt(np.diag(covariance))
+
+    # standard deviation along each axis for a fixed value of the other one
+    # -- the smallest width of the kernel a grid line goes through
+    rho = covariance[0, 1] / (sigma[0] * sigma[1])
+    width = sigma * np.sqrt(1.0 - rho ** 2)
+
+    lower = xy.min(axis=1)
+    extent = xy.max(axis=1) - lower
+
+    cell = width / cells_per_bandwidth
+    cell = np.maximum(cell, extent / (max_cells - 1))
+    shape = (np.floor(extent / cell) + 1).astype(np.int64)
+
+    # bin the weights on the grid
+    index = np.minimum((xy - lower[:, np.newaxis]) //
+                       cell[:, np.newaxis], (shape - 1)[:, np.newaxis])
+    index = index.astype(np.int64)
+    grid = np.bincount(index[0] * shape[1] + index[1], weights=weights,
+                       minlength=shape[0] * shape[1]).reshape(shape)
+
+    # the kernel, out to 4 sigma -- or to the edge of the grid, as it
+    # can't reach anything past that
+    half = np.minimum(np.ceil(4 * sigma / cell), shape).astype(np.int64)
+    dx = np.arange(-half[0], half[0] + 1) * cell[0]
+    dy = np.arange(-half[1], half[1] + 1) * cell[1]
+    offsets = np.stack(np.meshgrid(dx, dy, indexing='ij'), axis=-1)
+
+    inverse = np.linalg.inv(covariance)
+    kernel = np.exp(-0.5 * np.einsum('...i,ij,...j', offsets, inverse,
+                                     offsets))
+    kernel /= kernel.sum()
+
+    density = (fftconvolve(grid, kernel, mode='same') /
+               (cell[0] * cell[1]))
+
+    return _bilinear(density, (points - lower[:, np.newaxis]) /
+                     cell[:, np.newaxis] - 0.5)
+
+
+def _bilinear(values, index):
+    """
+    values of a 2-d array interpolated at the fractional indexes
+
+    :param index: (2, N) array of fractional indexes. They are clipped to
+                  the array.
+    """
+    shape = np.array(values.shape)[:, np.newaxis]
+    index = np.clip(index, 0, shape - 1)
+
+    i0 = np.minimum(np.floor(index).astype(np.int64), np.maximum(shape - 2, 0))
+    f = index - i0
+    i1 = np.minimum(i0 + 1, shape - 1)
+
+    return (values[i0[0], i0[1]] * (1 - f[0]) * (1 - f[1]) +
+            values[i1[0], i0[1]] * f[0] * (1 - f[1]) +
+            values[i0[0], i1[1]] * (1 - f[0]) * f[1] +
+            values[i1[0], i1[1]] * f[0] * f[1])
@@ -22,6 +22,42 @@ class WeathererSchema(ProcessSchema):
     pass
 
 
+class EnvironmentSample(object):
+    '''
+    Memo of environment values sampled at the element positions during one
+    weathering substep.
+
+    Used by the fused weathering pass (see gnome.weatherers.fused) so the
+    wind and waves are only evaluated once per substep, rather than once per
+    weatherer.
+    '''
+    def __init__(self):
+        self._values = {}
+
+    def get(self, func, points, model_time, *args, **kwargs):
+        '''
+        return func(points, model_time, *args, **kwargs), evaluating it only
+        if it has not been called for these points yet. A copy is returned
+        since callers may modify the result in place.
+        '''
+        key = (id(getattr(func, '__self__', None)), func.__name__,
+               model_time, args, tuple(sorted(kwargs.items())))
+
+        sampled_points, value = self._values.get(key, (None, None))
+
+        if sampled_points is not points:
+            value = func(points, model_time, *args, **kwargs)
+            self._values[key] = (points, value)
+
+        return self._copy(value)
+
+    def _copy(self, value):
+        if isinstance(value, tuple):
+            return tuple(self._copy(v) for v in value)
+
+        return value.copy() if hasattr(value, 'copy') else value
+
+
 class Weatherer(Process):
     '''
     Base Weathering agent.  This is almost exactly like the base Mover
@@ -31,6 +67,9 @@ class Weatherer(Process):
     '''
     _schema = WeathererSchema  # nothing new added so use this schema
 
+    # set to an EnvironmentSample by the fused weathering pass
+    _env_sample = None
+
     def __init__(self, **kwargs):
         '''
         Base weatherer class; defines the API for all weatherers
@@ -104,15 +143,35 @@ class Weatherer(Process):
         mass_remain = M_0 * np.exp(lambda_ * time)
         return mass_remain
 
+    def weather_data(self, sc, substance, data, time_step, model_time):
+        '''
+        Weather the elements in data -- the dict of data arrays for the
+        elements returned by sc.itersubstancedata() -- over time_step.
+
+        Weatherers that implement this can be run by the fused weathering
+        pass, which fetches the data once for all the weatherers.
+        '''
+        raise NotImplementedError
+
+    def _sample_env(self, func, points, model_time, *args, **kwargs):
+        '''
+        call func(points, model_time, ...) -- through the shared
+        EnvironmentSample if this weatherer is in a fused weathering pass
+        '''
+        if self._env_sample is None:
+            return func(points, model_time, *args, **kwargs)
+
+        return self._env_sample.get(func, points, model_time, *args, **kwargs)
+
     def get_wind_speed(self, points, model_time, min_val = 0,
                        coord_sys='r', fill_value=1.0):
         '''
             Wrapper for the weatherers so they can get wind speeds
         '''
         if hasattr(self.wind,'ice_concentration'):
-            retval = self.wind.at(points, model_time, min_val, coord_sys=coord_sys).reshape(-1)
+            retval = self._sample_env(self.wind.at, points, model_time, min_val, coord_sys=coord_sys).reshape(-1)
         else:
-            retval = self.wind.at(points, model_time, coord_sys=coord_sys).reshape(-1)
+            retval = self._sample_env(self.wind.at, points, model_time, coord_sys=coord_sys).reshape(-1)
             retval[retval < min_val] = min_val
 
         if isinstance(retval, np.ma.MaskedArray):
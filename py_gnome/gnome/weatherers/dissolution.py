@@ -313,7 +313,7 @@ class Dissolution(Weatherer):
                                    points,
                                    model_time,
                                    water_phase_xfer_velocity):
-        wave_height = self.waves.get_value(points, model_time)[0]
+        wave_height = self._sample_env(self.waves.get_value, points, model_time)[0]
         wind_speed = np.clip(self.get_wind_speed(points, model_time), 0.01, None)
         wave_period = PiersonMoskowitz.peak_wave_period(wind_speed)
 
@@ -498,27 +498,35 @@ class Dissolution(Weatherer):
                 # data does not contain any surface_weathering LEs
                 return
 
-            # print ('dissolution: mass_components = {}'
-            #        .format(data['mass_components'].sum(1)))
-            diss = self.dissolve_oil(model_time=model_time,
-                                     time_step=time_step,
-                                     data=data,
-                                     substance=substance)
+            self.weather_data(sc, substance, data, time_step, model_time)
 
-            # print 'diss = ', diss
+        sc.update_from_fatedataview()
+
+    def weather_data(self, sc, substance, data, time_step, model_time):
+        '''
+        dissolve the elements in data over time_step -- data is the dict of
+        arrays for the surface weathering elements
+        '''
+        # print ('dissolution: mass_components = {}'
+        #        .format(data['mass_components'].sum(1)))
+        diss = self.dissolve_oil(model_time=model_time,
+                                 time_step=time_step,
+                                 data=data,
+                                 substance=substance)
 
-            # TODO: We should probably only modify the floating LEs
-            data['mass_components'] -= diss
+        # print 'diss = ', diss
 
-            sc.mass_balance['dissolution'] += diss.sum()
+        # TODO: We should probably only modify the floating LEs
+        data['mass_components'] -= diss
 
-            data['mass'] = data['mass_components'].sum(1)
+        sc.mass_balance['dissolution'] += diss.sum()
 
-            self.logger.debug('{0} Amount dissolved for {1}: {2}'
-                              .format(self._pid,
-                                      substance.name,
-                                      sc.mass_balance['dissolution']))
-            # print ('dissolution: mass_components = {}'
-            #        .format(data['mass_components'].sum(1)))
-        sc.update_from_fatedataview()
+        data['mass'] = data['mass_components'].sum(1)
+
+        self.logger.debug('{0} Amount dissolved for {1}: {2}'
+                          .format(self._pid,
+                                  substance.name,
+                                  sc.mass_balance['dissolution']))
+        # print ('dissolution: mass_components = {}'
+        #        .format(data['mass_components'].sum(1)))
 
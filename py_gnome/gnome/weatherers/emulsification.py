@@ -261,47 +261,56 @@ class Emulsification(Weatherer):
             if len(data['age']) == 0:
                 return
 
-            points = data['positions']
-            k_emul = self._water_uptake_coeff(points, model_time, substance)
+            self.weather_data(sc, substance, data, time_step, model_time)
 
-            emul_time = substance.bullwinkle_time
-
-            emul_constant = substance.bullwinkle_fraction
+        sc.update_from_fatedataview()
 
-            # max water content fraction - get from database
-            Y_max = substance.get('emulsion_water_fraction_max')
+    def weather_data(self, sc, substance, data, time_step, model_time):
+        '''
+        emulsify the elements in data over time_step using the adios2
+        algorithm -- data is the dict of arrays for the surface weathering
+        elements
+        '''
+        points = data['positions']
+        k_emul = self._water_uptake_coeff(points, model_time, substance)
 
-            # doesn't emulsify, avoid the nans
-            if Y_max <= 0:
-                return
-            S_max = (6. / constants.drop_min) * (Y_max / (1.0 - Y_max))
+        emul_time = substance.bullwinkle_time
 
-            emulsify_oil(time_step,
-                         data['frac_water'],
-                         data['interfacial_area'],
-                         data['frac_evap'],
-                         data['age'],
-                         data['bulltime'],
-                         k_emul,
-                         emul_time,
-                         emul_constant,
-                         S_max,
-                         Y_max,
-                         constants.drop_max)
+        emul_constant = substance.bullwinkle_fraction
 
-            #sc.mass_balance['water_content'] += \
-                #np.sum(data['frac_water'][:]) / sc.num_released
-            # just average the water fraction each time - it is not per time
-            # step value but at a certain time value
-            # todo: probably should be weighted avg
-            if data['mass'].sum() > 0:
-                sc.mass_balance['water_content'] = \
-                    np.sum(data['mass']/data['mass'].sum() * data['frac_water'])
+        # max water content fraction - get from database
+        Y_max = substance.get('emulsion_water_fraction_max')
 
-            self.logger.debug(self._pid + 'water_content for {0}: {1}'.
-                              format(substance.name,
-                                     sc.mass_balance['water_content']))
-        sc.update_from_fatedataview()
+        # doesn't emulsify, avoid the nans
+        if Y_max <= 0:
+            return
+        S_max = (6. / constants.drop_min) * (Y_max / (1.0 - Y_max))
+
+        emulsify_oil(time_step,
+                     data['frac_water'],
+                     data['interfacial_area'],
+                     data['frac_evap'],
+                     data['age'],
+                     data['bulltime'],
+                     k_emul,
+                     emul_time,
+                     emul_constant,
+                     S_max,
+                     Y_max,
+                     constants.drop_max)
+
+        #sc.mass_balance['water_content'] += \
+            #np.sum(data['frac_water'][:]) / sc.num_released
+        # just average the water fraction each time - it is not per time
+        # step value but at a certain time value
+        # todo: probably should be weighted avg
+        if data['mass'].sum() > 0:
+            sc.mass_balance['water_content'] = \
+                np.sum(data['mass']/data['mass'].sum() * data['frac_water'])
+
+        self.logger.debug(self._pid + 'water_content for {0}: {1}'.
+                          format(substance.name,
+                                 sc.mass_balance['water_content']))
 
     def weather_elements(self, sc, time_step, model_time):
         '''
@@ -403,7 +412,8 @@ class Emulsification(Weatherer):
         '''
 
         ## higher of real or psuedo wind
-        wind_speed = self.waves.get_emulsification_wind(points, model_time).reshape(-1)
+        wind_speed = self._sample_env(self.waves.get_emulsification_wind,
+                                      points, model_time).reshape(-1)
 
         # water uptake rate constant - get this from database
         #K0Y = substance.get('k0y')
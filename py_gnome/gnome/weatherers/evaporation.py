@@ -218,29 +218,36 @@ class Evaporation(Weatherer):
             if len(data['mass']) == 0:
                 continue
 
-            points = data['positions']
-            # set evap_decay_constant array
-            self._set_evap_decay_constant(points, model_time, data,
-                                          substance, time_step)
-            mass_remain = self._exp_decay(data['mass_components'], data['evap_decay_constant'], time_step)
-
-            sc.mass_balance['evaporated'] += \
-                np.sum(data['mass_components'][:, :] - mass_remain[:, :])
-
-            # log amount evaporated at each step
-            self.logger.debug(self._pid + 'amount evaporated for {0}: {1}'.
-                              format(substance.name,
-                                     np.sum(data['mass_components'][:, :] -
-                                            mass_remain[:, :])))
-
-            data['frac_evap'][:] += ((data['mass_components'][:, :] - mass_remain[:, :]).sum(1)/data['init_mass'])
-            data['mass_components'][:] = mass_remain
-            data['mass'][:] = data['mass_components'].sum(1)
-
-            # add frac_lost
-            data['frac_lost'][:] = 1 - data['mass']/data['init_mass']
+            self.weather_data(sc, substance, data, time_step, model_time)
         sc.update_from_fatedataview()
 
+    def weather_data(self, sc, substance, data, time_step, model_time):
+        '''
+        evaporate the elements in data over time_step -- data is the dict of
+        arrays for the surface weathering elements, which is updated in place
+        '''
+        points = data['positions']
+        # set evap_decay_constant array
+        self._set_evap_decay_constant(points, model_time, data,
+                                      substance, time_step)
+        mass_remain = self._exp_decay(data['mass_components'], data['evap_decay_constant'], time_step)
+
+        sc.mass_balance['evaporated'] += \
+            np.sum(data['mass_components'][:, :] - mass_remain[:, :])
+
+        # log amount evaporated at each step
+        self.logger.debug(self._pid + 'amount evaporated for {0}: {1}'.
+                          format(substance.name,
+                                 np.sum(data['mass_components'][:, :] -
+                                        mass_remain[:, :])))
+
+        data['frac_evap'][:] += ((data['mass_components'][:, :] - mass_remain[:, :]).sum(1)/data['init_mass'])
+        data['mass_components'][:] = mass_remain
+        data['mass'][:] = data['mass_components'].sum(1)
+
+        # add frac_lost
+        data['frac_lost'][:] = 1 - data['mass']/data['init_mass']
+
 
 class BlobEvaporation(Evaporation):
     '''
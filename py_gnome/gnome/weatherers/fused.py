@@ -0,0 +1,101 @@
+'''
+Fused weathering pass for the standard set of weatherers.
+
+The Model normally runs each weatherer over every substep, and each
+weatherer fetches its data from the SpillContainer, samples the wind and
+waves at the element positions and writes the data back. When all the
+weatherers that are on are in ``fusable_weatherers``, the Model can instead
+(``Model.fused_weathering = True``) run them with ``weather_elements_fused``,
+which per substep:
+
+- fetches the surface weathering data once, for all the weatherers
+- samples each environment object once, shared by all the weatherers
+- runs each weatherer's weather_data() in the usual order on the same arrays
+- writes the data back to the SpillContainer once
+
+The weatherers are run substep by substep rather than weatherer by
+weatherer, so with weathering_substeps > 1 the results differ slightly from
+the unfused path.
+'''
+
+import numpy as np
+
+from .core import EnvironmentSample
+from .evaporation import Evaporation
+from .natural_dispersion import NaturalDispersion
+from .dissolution import Dissolution
+from .emulsification import Emulsification
+from .spreading import FayGravityViscous, Langmuir
+
+
+fusable_weatherers = (Evaporation,
+                      NaturalDispersion,
+                      Dissolution,
+                      Emulsification,
+                      FayGravityViscous,
+                      Langmuir)
+
+
+def can_fuse(weatherers):
+    '''
+    True if all the weatherers that are on can be run in a fused pass
+    '''
+    return all(isinstance(w, fusable_weatherers)
+               for w in weatherers if w.on)
+
+
+def _get_data(sc, array_types):
+    for substance, data in sc.itersubstancedata(array_types):
+        return substance, data
+
+    return None, None
+
+
+def weather_elements_fused(sc, weatherers, substeps):
+    '''
+    Weather the elements in sc with all the weatherers, one substep at a
+    time.
+
+    :param sc: the (certain) SpillContainer
+    :param weatherers: weatherers, in the order they should be run. All must
+        be instances of fusable_weatherers
+    :param substeps: sequence of (model_time, time_step) as returned by
+        Model._split_into_substeps()
+    '''
+    if sc.num_released == 0 or not sc.substance.is_weatherable:
+        return
+
+    weatherers = [w for w in weatherers if w.on]
+    array_types = set()
+    for w in weatherers:
+        array_types.update(w.array_types)
+
+    for model_time, time_step in substeps:
+        env_sample = EnvironmentSample()
+        substance, data = _get_data(sc, array_types)
+
+        if data is None:
+            return
+
+        try:
+            for w in weatherers:
+                if not w.active:
+                    continue
+
+                if len(data['mass']) == 0:
+                    break
+
+                w._env_sample = env_sample
+                w.weather_data(sc, substance, data, time_step, model_time)
+
+                if np.any(data['mass'] <= 0.0):
+                    # the unfused weatherers skip elements without any mass
+                    # left, so resync and get the data again
+                    sc.update_from_fatedataview()
+                    substance, data = _get_data(sc, array_types)
+                    env_sample = EnvironmentSample()
+        finally:
+            for w in weatherers:
+                w._env_sample = None
+
+        sc.update_from_fatedataview()
@@ -650,41 +650,48 @@ class FayGravityViscous(Weatherer):
             if len(data['fay_area']) == 0:
                 continue
 
-            for s_num in np.unique(data['spill_num']):
-                s_mask = data['spill_num'] == s_num
+            self.weather_data(sc, substance, data, time_step, model_time)
+
+        sc.update_from_fatedataview()
+
+    def weather_data(self, sc, substance, data, time_step, model_time):
+        '''
+        update 'area', 'fay_area' of the elements in data for their age
+        at model_time + time_step
+        '''
+        for s_num in np.unique(data['spill_num']):
+            s_mask = data['spill_num'] == s_num
 # change maximum area here
-                data['max_area_le'][s_mask] = (data['init_mass'][s_mask] / data['density'][s_mask]) / self.thickness_limit
+            data['max_area_le'][s_mask] = (data['init_mass'][s_mask] / data['density'][s_mask]) / self.thickness_limit
 # change maximum area here
 #                if count != 0:
 #                   tmp = int(r_time_scale * sc.total_num_release[s_num] / sc.release_duration[s_num])
 #                   s_mask[-1*count*tmp:] = False
 # import release duration here to control init_oil_volume for continue release 12-14-2021
-                data['fay_area'][s_mask] = \
-                    self.update_area(water_kvis,
-                                     self._init_relative_buoyancy,
-                                     data['bulk_init_volume'][s_mask],
-                                     data['fay_area'][s_mask],
-                                     data['max_area_le'][s_mask],
-                                     time_step,
-                                     data['vol_frac_le_st'][s_mask],
-                                     data['age'][s_mask] + time_step)
+            data['fay_area'][s_mask] = \
+                self.update_area(water_kvis,
+                                 self._init_relative_buoyancy,
+                                 data['bulk_init_volume'][s_mask],
+                                 data['fay_area'][s_mask],
+                                 data['max_area_le'][s_mask],
+                                 time_step,
+                                 data['vol_frac_le_st'][s_mask],
+                                 data['age'][s_mask] + time_step)
 # import release duration here to control init_oil_volume for continue release 12-14-2021
-    #                     self.update_area2(water_kvis,
-    #                                      self._init_relative_buoyancy,
-    #                                      data['bulk_init_volume'][s_mask],
-    #                                      data['fay_area'][s_mask],
-    #                                      time_step,
-    #                                      data['age'][s_mask] + time_step)
-
-    #                     self.update_area(water_kvis,
-    #                                      self._init_relative_buoyancy,
-    #                                      data['bulk_init_volume'][s_mask],
-    #                                      data['fay_area'][s_mask],
-    #                                      data['age'][s_mask] + time_step)
+#                     self.update_area2(water_kvis,
+#                                      self._init_relative_buoyancy,
+#                                      data['bulk_init_volume'][s_mask],
+#                                      data['fay_area'][s_mask],
+#                                      time_step,
+#                                      data['age'][s_mask] + time_step)
 
-                data['area'][s_mask] = data['fay_area'][s_mask]
+#                     self.update_area(water_kvis,
+#                                      self._init_relative_buoyancy,
+#                                      data['bulk_init_volume'][s_mask],
+#                                      data['fay_area'][s_mask],
+#                                      data['age'][s_mask] + time_step)
 
-        sc.update_from_fatedataview()
+            data['area'][s_mask] = data['fay_area'][s_mask]
 
 
 class ConstantArea(Weatherer):
@@ -849,35 +856,41 @@ class Langmuir(Weatherer):
             return
 
         #return
-        rho_h2o = self.water.get('density', 'kg/m^3')
-        for _, data in sc.itersubstancedata(self.array_types):
+        for substance, data in sc.itersubstancedata(self.array_types):
             #if len(data['area']) == 0:
             if len(data['fay_area']) == 0:
                 continue
 
-            points = data['positions']
-
-            for s_num in np.unique(data['spill_num']):
-                s_mask = data['spill_num'] == s_num
-                # thickness for blob of oil released together - need per spill
-                # Use the 'bulk_init_volume' and the 'fay_area' of the
-                # blob of oil. Each LE used to model the blob will have the
-                # same thickness. In order to get the 'fay_area' for the blob
-                # of oil released at same time, from same spill, sum
-                # the 'fay_area' array for elements that belong to same oil
-                # blob.
-                with np.errstate(divide='ignore'): # OK to get inf -- it will do the right thing later.
-                    thickness = (data['bulk_init_volume'][s_mask][0]
-                                 / data['fay_area'][s_mask].sum())
-
-                # assume only one type of oil is modeled so thickness_limit is
-                # already set and constant for all
-                rel_buoy = (rho_h2o - data['density'][s_mask]) / rho_h2o
-                data['frac_coverage'][s_mask] = \
-                    self._get_frac_coverage(points, model_time, rel_buoy, thickness)
-
-            # update 'area'
-            data['area'][:] = data['fay_area'] * data['frac_coverage']
+            self.weather_data(sc, substance, data, time_step, model_time)
 
         sc.update_from_fatedataview()
 
+    def weather_data(self, sc, substance, data, time_step, model_time):
+        '''
+        set the 'frac_coverage' and 'area' of the elements in data
+        '''
+        rho_h2o = self.water.get('density', 'kg/m^3')
+        points = data['positions']
+
+        for s_num in np.unique(data['spill_num']):
+            s_mask = data['spill_num'] == s_num
+            # thickness for blob of oil released together - need per spill
+            # Use the 'bulk_init_volume' and the 'fay_area' of the
+            # blob of oil. Each LE used to model the blob will have the
+            # same thickness. In order to get the 'fay_area' for the blob
+            # of oil released at same time, from same spill, sum
+            # the 'fay_area' array for elements that belong to same oil
+            # blob.
+            with np.errstate(divide='ignore'): # OK to get inf -- it will do the right thing later.
+                thickness = (data['bulk_init_volume'][s_mask][0]
+                             / data['fay_area'][s_mask].sum())
+
+            # assume only one type of oil is modeled so thickness_limit is
+            # already set and constant for all
+            rel_buoy = (rho_h2o - data['density'][s_mask]) / rho_h2o
+            data['frac_coverage'][s_mask] = \
+                self._get_frac_coverage(points, model_time, rel_buoy, thickness)
+
+        # update 'area'
+        data['area'][:] = data['fay_area'] * data['frac_coverage']
+
@@ -4,6 +4,7 @@
 
 import os
 
+import numpy as np
 import pytest
 import netCDF4 as nc
 
@@ -99,6 +100,52 @@ class TestPyGrid_S(object):
         pp.pprint(d_sg.serialize())
         assert sg == d_sg
 
+    @staticmethod
+    def _centers_and_points(grid, step):
+        lon, lat = grid.node_lon[:], grid.node_lat[:]
+        centers = np.column_stack([
+            ((c[:-1, :-1] + c[1:, 1:] + c[:-1, 1:] + c[1:, :-1]) / 4)
+            .reshape(-1)[::step] for c in (lon, lat)])
+
+        rng = np.random.default_rng(1)
+        spacing = np.abs(lon[0, 1] - lon[0, 0]) + np.abs(lat[0, 1] - lat[0, 0])
+        points = centers + rng.normal(0, 0.3 * spacing, centers.shape)
+
+        return centers, points
+
+    def test_locate_faces_near(self, sg):
+        """
+        starting from a guess gives the same cells as the cell tree
+        """
+        centers, points = self._centers_and_points(sg, 7)
+
+        expected = sg.locate_faces(points)
+
+        # guesses are the cells the points were in before they moved
+        guesses = sg.locate_faces(centers)
+        assert np.all(sg.locate_faces_near(points, guesses) == expected)
+
+        # and no guess at all
+        no_guess = np.full((len(points), 2), -1)
+        assert np.all(sg.locate_faces_near(points, no_guess) == expected)
+
+    def test_locate_faces_near_curvilinear(self):
+        """
+        a rotated and bent grid
+        """
+        cols, rows = np.meshgrid(np.arange(12.0), np.arange(9.0))
+        node_lon = (cols * np.cos(0.4) - rows * np.sin(0.4) +
+                    0.1 * np.sin(rows))
+        node_lat = cols * np.sin(0.4) + rows * np.cos(0.4)
+        grid = Grid_S(node_lon=node_lon, node_lat=node_lat)
+
+        centers, points = self._centers_and_points(grid, 1)
+
+        expected = grid.locate_faces(points)
+        guesses = grid.locate_faces(centers)
+
+        assert np.all(grid.locate_faces_near(points, guesses) == expected)
+
 
 class TestPyGrid_U(object):
     def test_construction(self, ug_data, ug_topology):
@@ -141,3 +188,23 @@ class TestPyGrid_U(object):
         pp.pprint(d_ug.serialize())
 
         assert ug == d_ug
+
+    def test_locate_faces_near(self, ug):
+        """
+        starting from a guess gives the same faces as the cell tree
+        """
+        faces = np.ma.filled(ug.faces[:], 0)
+        centers = ug.nodes[faces].mean(axis=1)[::10]
+
+        rng = np.random.default_rng(1)
+        points = centers + rng.normal(0, 0.005, centers.shape)
+
+        expected = ug.locate_faces(points)
+
+        # guesses are the faces the points were in before they moved
+        guesses = ug.locate_faces(centers)
+        assert np.all(ug.locate_faces_near(points, guesses) == expected)
+
+        # and no guess at all
+        no_guess = np.full(len(points), -1)
+        assert np.all(ug.locate_faces_near(points, no_guess) == expected)
@@ -0,0 +1,82 @@
+"""
+tests for caching the grid search structures on disk
+"""
+
+import numpy as np
+
+from gnome.utilities import data_cache
+from gnome.environment import grid_cache
+from gnome.environment.gridded_objects_base import Grid_S, Grid_U
+
+import pytest
+
+
+@pytest.fixture
+def cache(tmpdir, monkeypatch):
+    cache = data_cache.DataCache(str(tmpdir))
+    monkeypatch.setattr(data_cache, 'default_cache', cache)
+
+    return cache
+
+
+def get_grid_s():
+    node_lon, node_lat = np.meshgrid(np.linspace(0, 1, 6),
+                                     np.linspace(0, 1, 5))
+    return Grid_S(node_lon=node_lon, node_lat=node_lat)
+
+
+def get_grid_u():
+    nodes = np.array([(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1)],
+                     dtype=np.float64)
+    faces = np.array([(0, 1, 4), (0, 4, 3), (1, 2, 5), (1, 5, 4)])
+
+    return Grid_U(nodes=nodes, faces=faces)
+
+
+def test_celltree(cache):
+    grid1 = get_grid_s()
+    grid1.build_celltree()
+
+    # an identical grid gets the cached arrays
+    grid2 = get_grid_s()
+    key = grid_cache.grid_cache_key(grid2, 'celltree', (), [])
+    assert cache.load(key) is not None
+
+    grid2.build_celltree()
+    assert isinstance(grid2._cell_tree[1], np.memmap)
+    assert np.all(grid2._cell_tree[1] == grid1._cell_tree[1])
+    assert np.all(grid2._cell_tree[2] == grid1._cell_tree[2])
+
+    points = np.array([(0.1, 0.1), (0.5, 0.6), (0.9, 0.3)])
+    assert np.all(grid2.locate_faces(points, _memo=False) ==
+                  grid1.locate_faces(points, _memo=False))
+
+
+def test_celltree_changed_grid(cache):
+    get_grid_s().build_celltree()
+
+    grid = get_grid_s()
+    grid.node_lon = grid.node_lon * 2
+    grid.build_celltree()
+
+    assert not isinstance(grid._cell_tree[1], np.memmap)
+
+
+def test_face_face_connectivity(cache):
+    grid1 = get_grid_u()
+    grid1.build_face_face_connectivity()
+
+    grid2 = get_grid_u()
+    grid2.build_face_face_connectivity()
+
+    assert np.all(np.ma.filled(grid2.face_face_connectivity, -1) ==
+                  np.ma.filled(grid1.face_face_connectivity, -1))
+
+
+def test_cache_off(monkeypatch):
+    monkeypatch.setattr(data_cache, 'default_cache', data_cache.DataCache())
+
+    grid = get_grid_s()
+    grid.build_celltree()
+
+    assert not isinstance(grid._cell_tree[1], np.memmap)
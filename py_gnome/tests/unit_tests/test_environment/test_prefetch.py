@@ -0,0 +1,289 @@
+"""
+tests for the time slab prefetching
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import netCDF4 as nc4
+
+import gnome.scripting as gs
+from gnome.environment.prefetch import (PrefetchedData,
+                                        SlabReader,
+                                        TimeSlabPrefetcher)
+from gnome.environment.subset import SubsetData
+
+import pytest
+
+
+class FakeTime(object):
+    def __init__(self, times):
+        self.data = times
+
+    def index_of(self, time, extrapolate=False):
+        # index of the first time after time, like gridded
+        return int(np.searchsorted(self.data, time, side='right'))
+
+
+class CountingData(object):
+    """
+    array data that counts the reads
+    """
+    def __init__(self, arr):
+        self.arr = arr
+        self.reads = []
+        self.shape = arr.shape
+        self.dimensions = ('time', 'y', 'x')
+
+    def __getitem__(self, key):
+        self.reads.append(key)
+        return self.arr[key]
+
+
+class FakeVariable(object):
+    dimension_ordering = ['time', 'lat', 'lon']
+
+    def __init__(self, num_times=10, data=None):
+        start = datetime(2020, 1, 1)
+        self.time = FakeTime([start + timedelta(hours=i)
+                              for i in range(num_times)])
+        if data is None:
+            data = CountingData(np.arange(num_times * 12, dtype=np.float64)
+                                .reshape(num_times, 3, 4))
+        self.data = data
+
+
+def write_current(filename, num_times=5):
+    """
+    a small netCDF file of a current on a regular grid, that varies in
+    time and space
+    """
+    with nc4.Dataset(filename, 'w') as ds:
+        ds.createDimension('time', num_times)
+        ds.createDimension('lat', 11)
+        ds.createDimension('lon', 11)
+
+        time = ds.createVariable('time', 'f8', ('time',))
+        time.units = 'hours since 2020-01-01 00:00:00'
+        time[:] = np.arange(num_times)
+
+        lat = ds.createVariable('lat', 'f8', ('lat',))
+        lat.units = 'degrees_north'
+        lat[:] = np.linspace(27.5, 28.5, 11)
+
+        lon = ds.createVariable('lon', 'f8', ('lon',))
+        lon.units = 'degrees_east'
+        lon[:] = np.linspace(-88.5, -87.5, 11)
+
+        for name, standard_name, value in (
+                ('u', 'eastward_sea_water_velocity', 0.5),
+                ('v', 'northward_sea_water_velocity', 0.2)):
+            var = ds.createVariable(name, 'f8', ('time', 'lat', 'lon'))
+            var.units = 'm/s'
+            var.standard_name = standard_name
+            var[:] = (value * (1 + np.arange(num_times))[:, None, None] *
+                      np.linspace(0.5, 1.5, 11)[None, :, None] *
+                      np.linspace(1.5, 0.5, 11)[None, None, :])
+
+
+@pytest.fixture
+def var():
+    return FakeVariable()
+
+
+def test_wrap_and_read(var):
+    data = var.data
+    prefetcher = TimeSlabPrefetcher([var])
+
+    assert isinstance(var.data, PrefetchedData)
+    assert var.data.shape == (10, 3, 4)
+    assert var.data.dimensions == ('time', 'y', 'x')
+
+    assert np.all(var.data[2] == data.arr[2])
+    assert np.all(var.data[2, 1] == data.arr[2, 1])
+    assert np.all(var.data[2, :, 1:3] == data.arr[2, :, 1:3])
+    assert data.reads == [2]
+
+    # not a single time -- read from the data
+    assert np.all(var.data[:] == data.arr)
+    assert len(data.reads) == 2
+
+    prefetcher.close()
+    assert var.data is data
+
+
+def test_not_time_varying():
+    var = FakeVariable(num_times=1)
+    data = var.data
+
+    prefetcher = TimeSlabPrefetcher([var, None])
+
+    assert prefetcher.variables == []
+    assert var.data is data
+
+
+@pytest.mark.parametrize('background', [False, True])
+def test_prefetch_steps(var, background):
+    data = var.data
+    prefetcher = TimeSlabPrefetcher([var], lookahead=1,
+                                    background=background)
+
+    start = var.time.data[0]
+    prefetcher.prepare_for_model_step(start + timedelta(minutes=30))
+    prefetcher.prepare_for_model_step(start + timedelta(minutes=90))
+    assert prefetcher.time_step == timedelta(hours=1)
+
+    # not in a file -- read when the steps were prepared
+    assert prefetcher._reader is None or prefetcher._reader._process is None
+
+    # the first step, then this step to the end of the next one
+    assert sorted(data.reads) == [0, 1, 2, 3, 4]
+
+    var.data[2]
+    var.data[4]
+    assert len(data.reads) == 5
+
+
+def test_backwards(var):
+    data = var.data
+    prefetcher = TimeSlabPrefetcher([var], lookahead=1, background=True)
+
+    start = var.time.data[6]
+    prefetcher.prepare_for_model_step(start + timedelta(minutes=30))
+    prefetcher.prepare_for_model_step(start - timedelta(minutes=30))
+
+    assert sorted(set(data.reads)) == [3, 4, 5, 6, 7]
+
+
+def test_memory_budget(var):
+    slab_bytes = var.data.arr[0].nbytes
+    prefetcher = TimeSlabPrefetcher([var], memory_budget=3 * slab_bytes)
+
+    for i in range(6):
+        var.data[i]
+
+    assert len(prefetcher) == 3
+    assert prefetcher.nbytes == 3 * slab_bytes
+
+    # the most recently used are kept
+    var.data[4]
+    var.data[0]
+    assert len(var.data.wrapped.reads) == 7
+    var.data[4]
+    assert len(var.data.wrapped.reads) == 7
+
+
+def test_slab_source(tmpdir):
+    filename = str(tmpdir.join('current.nc'))
+    write_current(filename)
+
+    with nc4.Dataset(filename) as ds:
+        prefetcher = TimeSlabPrefetcher([], background=False)
+
+        data = PrefetchedData(ds['u'], prefetcher)
+        assert data.slab_source == (filename, 'u', None, True, True)
+
+        windows = (range(2, 5), range(3, 7))
+        data = PrefetchedData(SubsetData(ds['v'], windows), prefetcher)
+        assert data.slab_source == (filename, 'v', windows, True, True)
+
+        # not in a file
+        data = PrefetchedData(CountingData(np.zeros((2, 3))), prefetcher)
+        assert data.slab_source is None
+
+
+def test_slab_reader(tmpdir):
+    filename = str(tmpdir.join('current.nc'))
+    write_current(filename)
+    windows = (range(2, 5), range(3, 7))
+
+    reader = SlabReader()
+    try:
+        with nc4.Dataset(filename) as ds:
+            slab = reader.read((filename, 'u', None, True, True), 3)
+            assert np.all(slab == ds['u'][3])
+
+            slab = reader.read((filename, 'v', windows, True, True), 2)
+            assert np.all(slab == ds['v'][2, 2:5, 3:7])
+
+        with pytest.raises(IOError):
+            reader.read((filename, 'w', None, True, True), 0)
+
+        # an error reading is not a failure of the process
+        assert not reader.broken
+    finally:
+        reader.close()
+
+
+def test_prefetch_netcdf(tmpdir):
+    filename = str(tmpdir.join('current.nc'))
+    write_current(filename, num_times=10)
+
+    with nc4.Dataset(filename) as ds:
+        var = FakeVariable(data=ds['u'])
+        prefetcher = TimeSlabPrefetcher([var], lookahead=1)
+
+        start = var.time.data[0]
+        prefetcher.prepare_for_model_step(start + timedelta(minutes=30))
+        prefetcher.prepare_for_model_step(start + timedelta(minutes=90))
+
+        for i in range(5):
+            assert np.all(var.data[i] == ds['u'][i])
+
+        # loaded by the reading process
+        assert prefetcher._reader._process is not None
+        assert not prefetcher._reader.broken
+        assert len(prefetcher) == 5
+
+        prefetcher.close()
+        assert prefetcher._reader._process is None
+        assert var.data is ds['u']
+
+
+def test_model_with_netcdf_output(tmpdir):
+    """
+    prefetching in the background while a NetCDFOutput writes -- the slabs
+    are read by another process, so the netCDF library is only used on the
+    model thread
+    """
+    current_file = str(tmpdir.join('current.nc'))
+    write_current(current_file)
+
+    runs = []
+    for prefetch in (False, True):
+        output_file = str(tmpdir.join('out_{}.nc'.format(prefetch)))
+
+        model = gs.Model(start_time=datetime(2020, 1, 1),
+                         time_step=timedelta(minutes=15),
+                         duration=timedelta(hours=3))
+        model.spills += gs.point_line_spill(num_elements=100,
+                                            start_position=(-88.2, 27.8, 0.0),
+                                            end_position=(-87.8, 28.2, 0.0),
+                                            release_time=model.start_time)
+        current = gs.GridCurrent.from_netCDF(current_file,
+                                             varnames=['u', 'v'])
+        model.movers += gs.CurrentMover(current)
+        model.outputters += gs.NetCDFOutput(output_file,
+                                            which_data='standard')
+
+        if prefetch:
+            current.start_prefetching()
+
+        model.full_run()
+
+        if prefetch:
+            reader = current._prefetcher._reader
+            assert reader._process is not None
+            assert not reader.broken
+            current.stop_prefetching()
+
+        with nc4.Dataset(output_file) as ds:
+            runs.append((ds['time'][:], ds['longitude'][:],
+                         ds['latitude'][:]))
+
+    (time, lon, lat), (p_time, p_lon, p_lat) = runs
+
+    assert len(p_time) == 13
+    assert np.all(p_time == time)
+    assert np.all(p_lon == lon)
+    assert np.all(p_lat == lat)
@@ -0,0 +1,181 @@
+"""
+tests for the grid location sampling cache
+"""
+
+import numpy as np
+
+from gnome.environment.sampling_cache import SamplingCache
+from gnome.environment.gridded_objects_base import Grid_S
+
+import pytest
+
+
+class FakeGrid(object):
+    """
+    just enough of a grid to test the cache
+    """
+    def __init__(self, offset=0.0):
+        self.node_lon, self.node_lat = np.meshgrid(np.arange(5.0) + offset,
+                                                   np.arange(4.0))
+        self.calls = 0
+
+    def locate_faces(self, points, _memo=False, _copy=False, _hash=None,
+                     method='celltree'):
+        self.calls += 1
+        points = np.asarray(points)
+
+        return np.floor(points[:, 0] - self.node_lon[0, 0]).astype(np.int64)
+
+
+@pytest.fixture
+def points():
+    return np.array([(0.5, 0.5, 0.0),
+                     (1.5, 2.5, 0.0),
+                     (3.5, 1.5, 0.0)])
+
+
+def test_locate(points):
+    cache = SamplingCache()
+    grid = FakeGrid()
+
+    cells = cache.locate_faces(grid, grid.locate_faces, points)
+    assert np.all(cells == [0, 1, 3])
+
+    # a different array with the same points
+    again = cache.locate_faces(grid, grid.locate_faces, points.copy())
+    assert again is cells
+    assert grid.calls == 1
+
+    # cached results can't be changed by the caller
+    with pytest.raises(ValueError):
+        cells[0] = 5
+
+    # unless they ask for a copy
+    copy = cache.locate_faces(grid, grid.locate_faces, points, _copy=True)
+    copy[0] = 5
+    assert cells[0] == 0
+
+
+def test_changed_points(points):
+    cache = SamplingCache()
+    grid = FakeGrid()
+
+    cache.locate_faces(grid, grid.locate_faces, points)
+    points[0, 0] = 2.5
+
+    assert np.all(cache.locate_faces(grid, grid.locate_faces, points) ==
+                  [2, 1, 3])
+    assert grid.calls == 2
+
+
+def test_shared_between_identical_grids(points):
+    cache = SamplingCache()
+    grid1 = FakeGrid()
+    grid2 = FakeGrid()
+    grid3 = FakeGrid(offset=-1.0)
+
+    cache.locate_faces(grid1, grid1.locate_faces, points)
+    cache.locate_faces(grid2, grid2.locate_faces, points)
+    assert grid2.calls == 0
+
+    # a different grid
+    assert np.all(cache.locate_faces(grid3, grid3.locate_faces, points) ==
+                  [1, 2, 4])
+    assert grid3.calls == 1
+
+
+def test_clear(points):
+    cache = SamplingCache()
+    grid = FakeGrid()
+
+    cache.locate_faces(grid, grid.locate_faces, points)
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+    cache.locate_faces(grid, grid.locate_faces, points)
+    assert grid.calls == 2
+
+
+def test_max_entries():
+    cache = SamplingCache(max_entries=3)
+    grid = FakeGrid()
+
+    for i in range(5):
+        cache.locate_faces(grid, grid.locate_faces, np.array([(i + .5, .5)]))
+
+    assert len(cache) == 3
+
+
+def test_grid_s():
+    """
+    the gnome grids go through the cache
+    """
+    node_lon, node_lat = np.meshgrid(np.linspace(0, 1, 5),
+                                     np.linspace(0, 1, 5))
+    grid1 = Grid_S(node_lon=node_lon, node_lat=node_lat)
+    grid2 = Grid_S(node_lon=node_lon.copy(), node_lat=node_lat.copy())
+
+    points = np.array([(0.1, 0.1), (0.6, 0.3), (0.9, 0.9)])
+
+    cells1 = grid1.locate_faces(points)
+    cells2 = grid2.locate_faces(points)
+
+    assert cells2 is cells1
+    assert SamplingCache.grid_key(grid1) == SamplingCache.grid_key(grid2)
+
+
+def test_seed_faces(points):
+    cache = SamplingCache()
+    grid = FakeGrid()
+
+    cache.seed_faces(grid, points, [3, 2, 1])
+
+    # the horizontal positions are the key
+    assert np.all(cache.locate_faces(grid, grid.locate_faces,
+                                     points[:, :2]) == [3, 2, 1])
+    assert grid.calls == 0
+
+    # but not for other search methods
+    cache.locate_faces(grid, grid.locate_faces, points, method='simple')
+    assert grid.calls == 1
+
+    cache.clear()
+    assert np.all(cache.locate_faces(grid, grid.locate_faces, points) ==
+                  [0, 1, 3])
+
+
+def test_copy_by_position(points):
+    """
+    _copy is found however it's passed
+    """
+    cache = SamplingCache()
+    grid = FakeGrid()
+
+    cells = cache.locate_faces(grid, grid.locate_faces, points)
+
+    # points, _memo, _copy
+    copy = cache.locate_faces(grid, grid.locate_faces, points, True, True)
+    assert copy is not cells
+    copy[0] = 5
+
+    assert cells[0] == 0
+    assert grid.calls == 1
+
+
+def test_method_by_position(points):
+    cache = SamplingCache()
+    grid = FakeGrid()
+
+    cache.seed_faces(grid, points, [3, 2, 1])
+
+    # the same as method='simple'
+    cells = cache.locate_faces(grid, grid.locate_faces, points,
+                               False, False, None, 'simple')
+    assert np.all(cells == [0, 1, 3])
+    assert grid.calls == 1
+
+    assert np.all(cache.locate_faces(grid, grid.locate_faces, points,
+                                     method='simple') == [0, 1, 3])
+    assert grid.calls == 1
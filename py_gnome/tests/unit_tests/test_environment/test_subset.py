@@ -0,0 +1,214 @@
+"""
+tests for subsetting gridded objects to a bounding box
+"""
+
+from datetime import datetime
+
+import numpy as np
+import netCDF4 as nc4
+
+from gnome.environment.subset import (SubsetData,
+                                      GridSubset,
+                                      bounding_box_from_map,
+                                      subset_environment)
+from gnome.environment.gridded_objects_base import (Grid_S,
+                                                    Grid_R,
+                                                    Grid_U,
+                                                    Time,
+                                                    Variable,
+                                                    VectorVariable)
+from gnome.environment import GridCurrent
+from gnome.maps import GnomeMap
+
+import pytest
+
+
+def test_subset_data_structured():
+    arr = np.arange(2 * 6 * 8).reshape(2, 6, 8)
+    data = SubsetData(arr, (range(1, 4), range(2, 7)))
+    sub = arr[:, 1:4, 2:7]
+
+    assert data.shape == (2, 3, 5)
+    assert len(data) == 2
+    assert np.all(data[:] == sub)
+    assert np.all(data[1] == sub[1])
+    assert np.all(data[..., 2] == sub[..., 2])
+    assert np.all(data[0, -1, 1:4] == sub[0, -1, 1:4])
+    assert np.all(data[:, ::-1, ::2] == sub[:, ::-1, ::2])
+    assert np.all(np.asarray(data) == sub)
+
+    with pytest.raises(IndexError):
+        data[0, 3]
+
+
+def test_subset_data_unstructured():
+    arr = np.arange(3 * 10).reshape(3, 10)
+    index = np.array([2, 3, 7])
+    data = SubsetData(arr, (index,))
+    sub = arr[:, index]
+
+    assert data.shape == (3, 3)
+    assert np.all(data[:] == sub)
+    assert np.all(data[1] == sub[1])
+    assert np.all(data[1, 1:] == sub[1, 1:])
+    assert data[2, -1] == sub[2, -1]
+
+
+def get_grid_s():
+    node_lon, node_lat = np.meshgrid(np.linspace(0, 9, 10),
+                                     np.linspace(0, 7, 8))
+    return Grid_S(node_lon=node_lon, node_lat=node_lat)
+
+
+def test_grid_s_subset():
+    grid = get_grid_s()
+    subset = GridSubset(grid, ((2.5, 1.5), (4.5, 2.8)))
+
+    # the cells that overlap the box, and their nodes
+    assert subset.node_windows == (range(1, 4), range(2, 6))
+    assert subset.grid.node_lon.shape == (3, 4)
+    assert np.all(subset.grid.node_lon == grid.node_lon[1:4, 2:6])
+
+    # nodes, centers, and centers with padding
+    assert subset.windows_for((5, 8, 10)) == (range(1, 4), range(2, 6))
+    assert subset.windows_for((7, 9)) == (range(1, 3), range(2, 5))
+    assert subset.windows_for((9, 11)) == (range(1, 5), range(2, 7))
+
+    with pytest.raises(ValueError):
+        subset.windows_for((5, 5))
+
+
+def test_box_in_one_cell():
+    subset = GridSubset(get_grid_s(), ((2.2, 1.2), (2.4, 1.4)))
+
+    assert subset.node_windows == (range(1, 3), range(2, 4))
+
+
+def test_off_the_grid():
+    with pytest.raises(ValueError):
+        GridSubset(get_grid_s(), ((20, 20), (30, 30)))
+
+
+def test_whole_grid():
+    grid = get_grid_s()
+    subset = GridSubset(grid, ((-1, -1), (20, 20)))
+
+    assert not subset.is_subset
+    assert subset.grid is grid
+
+
+def test_grid_r_subset():
+    grid = Grid_R(node_lon=np.linspace(0, 9, 10),
+                  node_lat=np.linspace(0, 7, 8))
+    subset = GridSubset(grid, ((2.5, 1.5), (4.5, 2.8)))
+
+    assert subset.node_windows == (range(1, 4), range(2, 6))
+    assert np.all(subset.grid.node_lon == [2, 3, 4, 5])
+    assert np.all(subset.grid.node_lat == [1, 2, 3])
+
+
+def test_grid_u_subset():
+    # two squares, each split into two triangles
+    nodes = np.array([(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1)],
+                     dtype=np.float64)
+    faces = np.array([(0, 1, 4), (0, 4, 3), (1, 2, 5), (1, 5, 4)])
+    grid = Grid_U(nodes=nodes, faces=faces)
+
+    subset = GridSubset(grid, ((1.5, 0.2), (1.8, 0.4)))
+
+    assert np.all(subset.faces == [2, 3])
+    assert np.all(subset.nodes == [1, 2, 4, 5])
+    assert np.all(subset.grid.nodes == nodes[[1, 2, 4, 5]])
+    assert np.all(subset.grid.faces == [(0, 1, 3), (0, 3, 2)])
+
+    assert np.all(subset.windows_for((4, 6))[0] == [1, 2, 4, 5])
+    assert np.all(subset.windows_for((4, 4))[0] == [2, 3])
+
+
+def test_subset_environment():
+    grid = get_grid_s()
+    time = Time(data=[datetime(2020, 1, 1), datetime(2020, 1, 2)])
+    u = Variable(name='u', units='m/s', time=time, grid=grid,
+                 data=np.ones((2,) + grid.node_lon.shape))
+    v = Variable(name='v', units='m/s', time=time, grid=grid,
+                 data=np.zeros((2,) + grid.node_lon.shape))
+    vel = VectorVariable(name='velocity', units='m/s', time=time, grid=grid,
+                         variables=[u, v])
+
+    points = np.array([(3.2, 2.1, 0.0), (4.1, 2.5, 0.0)])
+    before = vel.at(points, time.data[0])
+
+    subset_environment(vel, ((2.5, 1.5), (4.5, 2.8)))
+
+    assert vel.grid is u.grid is v.grid
+    assert vel.grid.node_lon.shape == (3, 4)
+    assert u.data.shape == (2, 3, 4)
+    assert np.allclose(vel.at(points, time.data[0]), before)
+
+
+def test_bounding_box_from_map():
+    gmap = GnomeMap(map_bounds=((10, 20), (12, 20), (12, 21), (10, 21)))
+
+    assert np.allclose(bounding_box_from_map(gmap, margin=1.0),
+                       ((9, 19), (13, 22)))
+
+
+def write_current(filename):
+    """
+    a netCDF file of a current on a regular grid
+    """
+    with nc4.Dataset(filename, 'w') as ds:
+        ds.createDimension('time', 2)
+        ds.createDimension('lat', 11)
+        ds.createDimension('lon', 11)
+
+        time = ds.createVariable('time', 'f8', ('time',))
+        time.units = 'hours since 2020-01-01 00:00:00'
+        time[:] = [0, 1]
+
+        lat = ds.createVariable('lat', 'f8', ('lat',))
+        lat.units = 'degrees_north'
+        lat[:] = np.linspace(27.5, 28.5, 11)
+
+        lon = ds.createVariable('lon', 'f8', ('lon',))
+        lon.units = 'degrees_east'
+        lon[:] = np.linspace(-88.5, -87.5, 11)
+
+        lon_g, lat_g = np.meshgrid(lon[:], lat[:])
+        for name, standard_name, value in (
+                ('u', 'eastward_sea_water_velocity', lon_g),
+                ('v', 'northward_sea_water_velocity', lat_g)):
+            var = ds.createVariable(name, 'f8', ('time', 'lat', 'lon'))
+            var.units = 'm/s'
+            var.standard_name = standard_name
+            var[:] = np.array([value, 2 * value]) / 100
+
+
+def test_save_load(tmpdir):
+    """
+    the subset is saved as the whole grid and the bounding box, and cut
+    down again on load
+    """
+    filename = str(tmpdir.join('current.nc'))
+    write_current(filename)
+
+    current = GridCurrent.from_netCDF(filename, varnames=['u', 'v'],
+                                      bounding_box=((-88.12, 27.88),
+                                                    (-87.88, 28.12)))
+
+    assert current.grid.node_lon.shape == (5,)
+    assert current.bounding_box == ((-88.12, 27.88), (-87.88, 28.12))
+
+    points = np.array([(-88.05, 27.95, 0.0), (-87.95, 28.05, 0.0)])
+    time = datetime(2020, 1, 1, 0, 30)
+    before = current.at(points, time)
+
+    _save_json, zipfile_, _refs = current.save(str(tmpdir))
+    loaded = GridCurrent.load(zipfile_)
+
+    assert loaded.bounding_box == current.bounding_box
+    assert loaded.grid.node_lon.shape == (5,)
+    assert loaded.grid.node_lat.shape == (5,)
+    assert all(var.grid is loaded.grid for var in loaded.variables)
+    assert loaded.variables[0].data.shape == (2, 5, 5)
+    assert np.allclose(loaded.at(points, time), before)
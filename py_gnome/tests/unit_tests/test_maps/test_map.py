@@ -23,6 +23,7 @@ from gnome.maps import GnomeMap, MapFromBNA, RasterMap, ParamMap
 # MapFromUGrid
 
 from gnome.gnomeobject import class_from_objtype
+from gnome.utilities import data_cache
 
 from ..conftest import sample_sc_release
 
@@ -143,6 +144,19 @@ class Test_GnomeMap:
         # some points on the map:
         assert np.array_equal(result, (True, False))
 
+    def test_on_map_bounds_changed(self):
+        gmap = GnomeMap(map_bounds=((-40.0, 50.0), (-40.0, 58.0),
+                                    (-30.0, 58.0), (-30.0, 50.0)))
+        assert gmap.map_bounds_index.is_rectangle
+        assert gmap.on_map((-35, 55, 0.))
+
+        gmap.map_bounds = ((0, 0), (0, 10), (10, 10), (10, 0))
+        assert not gmap.on_map((-35, 55, 0.))
+
+        # changed in place
+        gmap.map_bounds[:] += (-40, 50)
+        assert gmap.on_map((-35, 55, 0.))
+
     def test_allowable_spill_position(self):
         gmap = GnomeMap()
 
@@ -358,6 +372,36 @@ class Test_RasterMap:
         assert not gmap.allowable_spill_position((3.0, 3.0, 0.))
 
 
+    @pytest.mark.parametrize("ratios", [(1,), (4, 1), (8, 2, 1), (16, 4, 2, 1)])
+    def test_layers(self, ratios):
+        rmap = RasterMap(raster=self.raster,
+                         map_bounds=((-50, -30), (-50, 30),
+                                     (50, 30), (50, -30)),
+                         projection=NoProjection())
+        rmap.ratios = ratios
+
+        assert len(rmap.layers) == len(ratios)
+        assert rmap.layers[-1] is rmap.raster
+
+        for ratio, layer in zip(ratios, rmap.layers):
+            assert layer.dtype == np.uint8
+            assert layer.flags['C_CONTIGUOUS']
+            assert layer.shape == (-(-self.w // ratio), -(-self.h // ratio))
+
+            # a coarse cell is land if any of the cells it covers are
+            for (i, j), val in np.ndenumerate(layer):
+                assert val == np.any(self.raster[i * ratio:(i + 1) * ratio,
+                                                 j * ratio:(j + 1) * ratio])
+
+    @pytest.mark.parametrize("ratios", [(), (4, 2), (2, 4, 1), (4, 4, 1)])
+    def test_bad_ratios(self, ratios):
+        rmap = RasterMap(raster=self.raster,
+                         projection=NoProjection())
+
+        with pytest.raises(ValueError):
+            rmap.ratios = ratios
+
+
 class TestRefloat:
 
     """
@@ -634,6 +678,34 @@ class Test_MapfromBNA:
         assert gmap.map_bounds is not dict_['map_bounds']
         assert np.all(gmap.map_bounds == dict_['map_bounds'])
 
+    def test_raster_cache(self, tmpdir, monkeypatch):
+        """
+        the second map from the same file comes from the data cache
+        """
+        monkeypatch.setattr(data_cache, 'default_cache',
+                            data_cache.DataCache(str(tmpdir)))
+
+        gmap = MapFromBNA(testbnamap, refloat_halflife=6, raster_size=10000)
+
+        def no_rasterizing(*args, **kwargs):
+            raise AssertionError('raster should come from the cache')
+
+        monkeypatch.setattr(MapFromBNA, 'build_raster', no_rasterizing)
+        map2 = MapFromBNA(testbnamap, refloat_halflife=6, raster_size=10000)
+
+        assert isinstance(map2.raster, np.memmap)
+        assert np.array_equal(gmap.raster, map2.raster)
+        assert gmap.projection == map2.projection
+        assert np.array_equal(gmap.ratios, map2.ratios)
+        for layer, layer2 in zip(gmap.layers, map2.layers):
+            assert np.array_equal(layer, layer2)
+        assert map2.layers[-1] is map2.raster
+        assert np.array_equal(gmap.distance_to_land, map2.distance_to_land)
+
+        # different options are a different entry
+        with pytest.raises(AssertionError):
+            MapFromBNA(testbnamap, refloat_halflife=6, raster_size=20000)
+
 
 class Test_full_move:
     """
@@ -721,14 +793,18 @@ class Test_full_move:
         assert np.array_equal(spill['last_water_positions'][0], (9.0, 5.0, 0.))
         assert spill['status_codes'][0] == oil_status.on_land
 
-    def test_land_cross_array(self):
+    @pytest.mark.parametrize("ratios", [(1,), (16, 1), (8, 4, 2, 1)])
+    def test_land_cross_array(self, ratios):
         """
         test a few LEs
+
+        with any set of layers
         """
         gmap = RasterMap(refloat_halflife=6, raster=self.raster,
                          map_bounds=((-50, -30), (-50, 30),
                                      (50, 30), (50, -30)),
                          projection=NoProjection())
+        gmap.ratios = ratios
 
         # one left to right
         # one right to left
@@ -793,6 +869,73 @@ class Test_full_move:
         assert np.array_equal((spill['status_codes'])[3:],
                               (oil_status.on_land, ))
 
+    def test_distance_to_land(self):
+        gmap = RasterMap(refloat_halflife=6, raster=self.raster,
+                         map_bounds=((-50, -30), (-50, 30),
+                                     (50, 30), (50, -30)),
+                         projection=NoProjection())
+
+        dist = gmap.distance_to_land
+
+        assert dist.shape == self.raster.shape
+        assert np.all(dist[10, :] == 0)
+        assert np.all(dist[:, 3] == np.abs(np.arange(20) - 10))
+
+        gmap.raster = np.zeros((20, 10), dtype=np.uint8)
+
+        assert np.all(gmap.distance_to_land == gmap.max_land_distance)
+
+    def test_may_reach_land(self):
+        gmap = RasterMap(refloat_halflife=6, raster=self.raster,
+                         map_bounds=((-50, -30), (-50, 30),
+                                     (50, 30), (50, -30)),
+                         projection=NoProjection())
+
+        # 5 cells from land: 4 cell step, 5 cell step, diagonal,
+        # away from land, off the raster
+        start = np.array(((5, 5), (5, 5), (5, 0), (15, 5), (-5, 5)),
+                         dtype=np.int32)
+        end = np.array(((9, 5), (10, 5), (9, 4), (19, 9), (-1, 5)),
+                       dtype=np.int32)
+
+        assert np.array_equal(gmap._may_reach_land(start, end),
+                              (False, True, False, False, True))
+
+    @pytest.mark.parametrize("num_threads", [0, 2])
+    def test_num_threads(self, num_threads):
+        """
+        checking the LEs in parallel gives the same answer as in serial
+        """
+        rng = np.random.default_rng(10)
+        start = np.zeros((1000, 3))
+        start[:, 0] = rng.uniform(0, 19, 1000)
+        start[:, 1] = rng.uniform(0, 9, 1000)
+        end = np.zeros((1000, 3))
+        end[:, 0] = rng.uniform(0, 19, 1000)
+        end[:, 1] = rng.uniform(0, 9, 1000)
+
+        results = []
+        for n in (1, num_threads):
+            gmap = RasterMap(refloat_halflife=6, raster=self.raster,
+                             map_bounds=((-50, -30), (-50, 30),
+                                         (50, 30), (50, -30)),
+                             projection=NoProjection(),
+                             num_threads=n)
+            spill = sample_sc_release(1000)
+            spill['positions'] = start.copy()
+            spill['next_positions'] = end.copy()
+
+            gmap.beach_elements(spill)
+
+            results.append([spill[name].copy()
+                            for name in ('next_positions',
+                                         'last_water_positions',
+                                         'status_codes')])
+
+        assert np.any(results[0][2] == oil_status.on_land)
+        for serial, parallel in zip(*results):
+            assert np.array_equal(serial, parallel)
+
     def test_outside_raster(self):
         """
         test LEs starting form outside the raster bounds
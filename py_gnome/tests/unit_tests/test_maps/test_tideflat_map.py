@@ -17,7 +17,10 @@ from gnome.basic_types import oil_status
 from gnome.maps.tideflat_map import (TideflatMap,
                                      TideflatBase,
                                      SimpleTideflat,
+                                     GriddedTideflat,
                                      )
+from gnome.environment.gridded_objects_base import Variable, Grid_S, Time
+from gnome.environment.environment_objects import Bathymetry, WaterLevel
 import gnome.scripting as gs
 
 import pytest
@@ -164,6 +167,83 @@ def test_SimpleTideFlat():
 
 
 
+def get_gridded_tideflat():
+    """
+    a 1 degree square grid: shallow (0.5 m) for x < 0.5, deep (10 m) for
+    the rest. The water level drops from 0 to -1 m over an hour.
+    """
+    node_lon, node_lat = np.meshgrid(np.linspace(0, 1, 11),
+                                     np.linspace(0, 1, 11))
+    grid = Grid_S(node_lon=node_lon, node_lat=node_lat)
+
+    time = Time(data=[datetime(2018, 1, 1, 12), datetime(2018, 1, 1, 13)])
+
+    zeta = np.zeros((2,) + node_lon.shape)
+    zeta[1] = -1.0
+    water_level = WaterLevel(name='water_level', units='m', time=time,
+                             data=zeta, grid=grid)
+
+    depth = np.where(node_lon < 0.5, 0.5, 10.0)
+    bathymetry = Bathymetry(name='bathymetry', units='m', data=depth,
+                            grid=grid)
+
+    return GriddedTideflat(water_level=water_level, bathymetry=bathymetry)
+
+
+def test_GriddedTideflat():
+    tf = get_gridded_tideflat()
+
+    points = ((0.2, 0.5, 0),  # shallow
+              (0.8, 0.5, 0),  # deep
+              (5.0, 5.0, 0))  # off the grid
+
+    # high water: all wet
+    assert not np.any(tf.is_dry(points, datetime(2018, 1, 1, 12)))
+
+    # low water: the shallow part is dry
+    dt = datetime(2018, 1, 1, 13)
+    assert np.all(tf.is_dry(points, dt) == [True, False, False])
+    assert np.all(tf.is_wet(points, dt) == [False, True, True])
+
+    # halfway: depth is exactly 0 in the shallow part -- still under
+    # min_depth
+    assert np.all(tf.is_dry(points, datetime(2018, 1, 1, 12, 30)) ==
+                  [True, False, False])
+
+    assert tf.is_dry(np.zeros((0, 3)), dt).shape == (0,)
+
+
+def test_GriddedTideflat_cached_field():
+    tf = get_gridded_tideflat()
+    dt = datetime(2018, 1, 1, 13)
+
+    field = tf.wet_field(dt)
+    assert tf.wet_field(dt) is field
+    assert tf.wet_field(datetime(2018, 1, 1, 12)) is not field
+
+
+def test_GriddedTideflat_wet_dry_mask():
+    tf = get_gridded_tideflat()
+    grid = tf.grid
+
+    mask = np.ones((2,) + grid.node_lon.shape)
+    mask[1][grid.node_lon < 0.5] = 0
+    wet_dry = Variable(name='wet_nodes', units='1', time=tf.water_level.time,
+                       data=mask, grid=grid)
+
+    tf = GriddedTideflat(wet_dry_mask=wet_dry)
+    points = ((0.2, 0.5, 0), (0.8, 0.5, 0))
+
+    assert not np.any(tf.is_dry(points, datetime(2018, 1, 1, 12)))
+    assert np.all(tf.is_dry(points, datetime(2018, 1, 1, 13)) ==
+                  [True, False])
+
+
+def test_GriddedTideflat_needs_data():
+    with pytest.raises(ValueError):
+        GriddedTideflat(water_level=get_gridded_tideflat().water_level)
+
+
 def test_tideflat_map_with_both():
     tfm = TideflatMap(get_gnomemap(), get_simple_tideflat())
 
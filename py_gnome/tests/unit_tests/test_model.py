@@ -33,7 +33,9 @@ from gnome.weatherers import (HalfLifeWeatherer,
                               ChemicalDispersion,
                               Burn,
                               Skimmer,
-                              Emulsification)
+                              Emulsification,
+                              Dissolution)
+from gnome.weatherers.fused import can_fuse
 from gnome.outputters import Renderer, TrajectoryGeoJsonOutput
 
 from .conftest import sample_model_weathering, testdata, test_oil
@@ -1389,6 +1391,53 @@ def test_weathering_substeps():
          assert date_to_sec(model_time) == date_to_sec(model.model_time) + index * time_step
 
 
+def test_fused_weathering(sample_model_fcn):
+    '''
+    the fused weathering pass should give the same mass balance as running
+    the weatherers one at a time
+    '''
+    model = sample_model_weathering(sample_model_fcn, test_oil)
+    model.add_weathering()
+    model.weatherers += Dissolution()
+
+    model.full_run()
+    expected = dict(model.spills.items()[0].mass_balance)
+
+    model.fused_weathering = True
+    model.full_run()
+    mass_balance = model.spills.items()[0].mass_balance
+
+    for key in ('evaporated', 'natural_dispersion', 'dissolution',
+                'floating'):
+        assert np.isclose(mass_balance[key], expected[key], rtol=1e-6)
+
+
+def test_fused_weathering_falls_back(sample_model_fcn):
+    '''
+    with a weatherer that can't be fused, the weatherers are run one at a
+    time
+    '''
+    model = sample_model_weathering(sample_model_fcn, test_oil)
+    model.add_weathering()
+    model.weatherers += HalfLifeWeatherer()
+
+    assert not can_fuse(model.weatherers)
+
+    model.full_run()
+    expected = dict(model.spills.items()[0].mass_balance)
+    expected_mass = model.spills.items()[0]['mass'].copy()
+
+    model.fused_weathering = True
+    model.full_run()
+    sc = model.spills.items()[0]
+
+    # exactly as without the fused pass -- the same code ran
+    for key in ('evaporated', 'natural_dispersion', 'floating'):
+        assert sc.mass_balance[key] == expected[key]
+
+    assert np.all(sc['mass'] == expected_mass)
+
+
 def test_weathering_data_attr():
     '''
     mass_balance is initialized/written if we have weatherers
@@ -1761,3 +1810,51 @@ def test_model_tz_offset():
 
 
 
+
+
+def split_elements_model(num_per_spill):
+    """
+    a model with random movers, with the elements released by spills of
+    num_per_spill elements, all at the same place and time
+    """
+    model = Model(start_time=datetime(2020, 1, 1),
+                  time_step=timedelta(minutes=15),
+                  duration=timedelta(hours=3),
+                  uncertain=True)
+
+    for num in num_per_spill:
+        model.spills += point_line_spill(num_elements=num,
+                                         start_position=(-88.0, 28.0, 0.0),
+                                         release_time=model.start_time)
+
+    model.movers += RandomMover(name='random')
+    model.movers += gs.RandomMover3D(name='random_3d')
+    model.movers += SimpleMover(velocity=(0.5, -0.2, 0.0), name='simple')
+
+    return model
+
+
+def test_split_elements():
+    """
+    the elements move the same however they are split up between the spills
+    """
+    runs = []
+    for num_per_spill in ((100,), (30, 70), (55, 5, 40)):
+        model = split_elements_model(num_per_spill)
+        model.full_run()
+
+        run = []
+        for sc in model.spills.items():
+            order = np.argsort(sc['id'])
+            run.append((sc['id'][order], sc['positions'][order]))
+        runs.append(run)
+
+    for run in runs[1:]:
+        for (ids, positions), (r_ids, r_positions) in zip(runs[0], run):
+            assert np.all(r_ids == ids)
+            assert np.all(r_positions == positions)
+
+    # and they don't all move the same
+    positions = runs[0][0][1]
+    assert len(np.unique(positions[:, 0])) == len(positions)
+    assert np.any(runs[0][1][1] != positions)
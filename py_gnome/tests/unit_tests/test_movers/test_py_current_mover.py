@@ -11,6 +11,7 @@ import zipfile
 
 from gnome.movers import CurrentMover
 from gnome.environment.environment_objects import GridCurrent, SteadyUniformCurrent
+from gnome.environment.gridded_objects_base import Grid_S, Time, Variable
 from gnome.utilities import time_utils
 import gnome.scripting as gs
 
@@ -127,6 +128,81 @@ def test_certain_uncertain():
     assert np.all(delta[:, 2] == u_delta[:, 2])
 
 
+def test_reuse_cell_locations():
+    """
+    starting from the last cell each element was in gives the same moves
+    """
+    currents = [GridCurrent.from_netCDF(curr_file2) for _i in range(2)]
+    currents[1].reuse_cell_locations = True
+
+    grid = currents[0].grid
+    faces = np.ma.filled(grid.faces[:], 0)
+    centers = grid.nodes[faces].mean(axis=1)[:num_le]
+    model_time = currents[0].data_start
+
+    sc = sample_sc_release(num_le, start_pos, model_time)
+    sc['positions'][:, :2] = centers
+
+    for _step in range(2):
+        deltas = [CurrentMover(current=c).get_move(sc, time_step, model_time)
+                  for c in currents]
+
+        assert np.all(deltas[0] == deltas[1])
+        assert np.all(currents[1]._face_hints[False][sc['id']] >= 0)
+
+        # only tracked while the mover uses them
+        assert currents[1]._element_ids is None
+
+        sc['positions'][:, :2] += 0.001
+
+    # the uncertain elements have the same ids -- their cells are kept apart
+    hints = currents[1]._face_hints[False].copy()
+
+    u_sc = sample_sc_release(num_le, start_pos, model_time, uncertain=True)
+    u_sc['positions'][:, :2] = centers[::-1]
+
+    CurrentMover(current=currents[1]).get_move(u_sc, time_step, model_time)
+
+    assert np.all(currents[1]._face_hints[True][u_sc['id']] >= 0)
+    assert np.all(currents[1]._face_hints[False] == hints)
+
+
+def test_reuse_cell_locations_structured():
+    """
+    the same on a structured (curvilinear) grid
+    """
+    cols, rows = np.meshgrid(np.linspace(-1, 1, 21), np.linspace(-1, 1, 21))
+    grid = Grid_S(node_lon=cols + 0.2 * rows, node_lat=rows + 0.1 * cols)
+    time = Time(data=[model_time, model_time + datetime.timedelta(days=1)])
+
+    currents = []
+    for reuse in (False, True):
+        u = Variable(name='u', units='m/s', time=time, grid=grid,
+                     data=np.array([cols, 2 * cols]))
+        v = Variable(name='v', units='m/s', time=time, grid=grid,
+                     data=np.array([rows, -rows]))
+        currents.append(GridCurrent(name='current', units='m/s', time=time,
+                                    grid=grid, variables=[u, v],
+                                    reuse_cell_locations=reuse))
+
+    sc = sample_sc_release(num_le, start_pos, model_time)
+    rng = np.random.default_rng(0)
+    sc['positions'][:, :2] = rng.uniform(-0.8, 0.8, (num_le, 2))
+
+    for _step in range(2):
+        deltas = [CurrentMover(current=c).get_move(sc, time_step, model_time)
+                  for c in currents]
+
+        assert np.all(deltas[0] == deltas[1])
+
+        # the (row, column) of each element's cell
+        hints = currents[1]._face_hints[False][sc['id']]
+        assert hints.shape == (num_le, 2)
+        assert np.all(hints >= 0)
+
+        sc['positions'][:, :2] += 0.01
+
+
 def test_default_props():
     """
     test default properties
@@ -200,6 +276,44 @@ def test_update_uncertainty():
     # what else to check?
 
 
+def test_update_uncertainty_element_ids():
+    """
+    with element ids, an element gets the same terms however the elements
+    are split up, or released
+    """
+    curr = SteadyUniformCurrent(speed=1, direction=45, units='m/s')
+    mov = CurrentMover(current=curr,
+                       uncertain_duration=24 * 3600,
+                       uncertain_time_delay=0,
+                       uncertain_along=.5,
+                       uncertain_cross=.25,
+                       )
+    ids = np.arange(75)
+
+    mov._update_uncertainty(num_les=75, elapsed_time=3600, element_ids=ids)
+    terms = mov._uncertainty_list.copy()
+
+    assert np.all(np.abs(terms[:, 0]) <= 0.5)
+    assert np.all(np.abs(terms[:, 1]) <= 0.25)
+
+    # released in two steps
+    mov.prepare_for_model_run()
+    mov._update_uncertainty(num_les=50, elapsed_time=3600,
+                            element_ids=ids[:50])
+    mov._update_uncertainty(num_les=75, elapsed_time=3600, element_ids=ids)
+    assert np.all(mov._uncertainty_list == terms)
+
+    # some of them
+    for i in range(3):
+        assert np.all(mov._random_uncertainty_terms(
+            25, element_ids=ids[i::3], counter=3600) == terms[i::3])
+
+    # new terms after the uncertain duration
+    mov._update_uncertainty(num_les=75, elapsed_time=3600 + 24 * 3600,
+                            element_ids=ids)
+    assert not np.any(mov._uncertainty_list == terms)
+
+
 def test_add_uncertainty():
     curr = SteadyUniformCurrent(speed=1, direction=45, units='m/s')
     # note: current isn't used for this test, but we need one to create the mover
@@ -391,6 +505,7 @@ def test_save_load():
 
     with tempfile.TemporaryDirectory() as saveloc:
         current = GridCurrent.from_netCDF(curr_file2)
+        current.reuse_cell_locations = True
         py_current = CurrentMover(current=current)
         save_json, zipfile_, _refs = py_current.save(saveloc)
 
@@ -399,3 +514,4 @@ def test_save_load():
         loaded = CurrentMover.load(zipfile_)
 
     assert loaded == py_current
+    assert loaded.current.reuse_cell_locations
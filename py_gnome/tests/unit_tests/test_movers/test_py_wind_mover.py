@@ -205,6 +205,77 @@ def _assert_move(delta):
     assert np.all(delta[:, 2] == 0)
 
 
+def test_random_uncertainty_terms():
+    """
+    the angle terms that are too big get redrawn
+    """
+    py_wind = WindMover(wind=GridWind.from_netCDF(wind_file))
+    py_wind.sigma_theta = 30.
+
+    terms = py_wind._random_uncertainty_terms(10000)
+
+    assert terms.shape == (10000, 2)
+    assert np.all(np.abs(py_wind.sigma_theta * terms[:, 1]) <= 60.)
+
+
+def test_random_uncertainty_terms_split():
+    """
+    with element ids, the terms of an element don't depend on the other
+    elements drawn with it -- so a run can be split up
+    """
+    py_wind = WindMover(wind=GridWind.from_netCDF(wind_file))
+    py_wind.sigma_theta = 30.
+
+    ids = np.arange(1000)
+    terms = py_wind._random_uncertainty_terms(1000, element_ids=ids,
+                                              counter=3600)
+
+    assert np.all(np.abs(py_wind.sigma_theta * terms[:, 1]) <= 60.)
+
+    for i in range(3):
+        part = py_wind._random_uncertainty_terms(len(ids[i::3]),
+                                                 element_ids=ids[i::3],
+                                                 counter=3600)
+        assert np.all(part == terms[i::3])
+
+    # different later
+    later = py_wind._random_uncertainty_terms(1000, element_ids=ids,
+                                              counter=7200)
+    assert not np.any(later == terms)
+
+
+def test_add_uncertainty_low_speed():
+    """
+    elements with wind speed less than 1 m/s just get diffusion
+    """
+    py_wind = WindMover(wind=GridWind.from_netCDF(wind_file))
+    py_wind.sigma2 = 0.1
+    py_wind.sigma_theta = 10.
+    py_wind.uncertain_diffusion = 0.1
+    py_wind.allocate_uncertainty(6)
+    py_wind.update_uncertainty_values(3600)
+
+    deltas = np.zeros((6, 3))
+    deltas[:, 0] = np.array((0.2, 5., 0.5, 10., 0.9, 0.)) * time_step
+    deltas[:, 1] = np.array((0.1, 1., 0.3, 0., 0., 0.)) * time_step
+
+    slow = np.array([0, 2, 4, 5])
+    fast = np.array([1, 3])
+
+    np.random.seed(1)
+    result = py_wind.add_uncertainty(deltas.copy(), time_step)
+    np.random.seed(1)
+    assert np.all(py_wind.add_uncertainty(deltas.copy(), time_step) == result)
+
+    # no diffusion: the slow ones don't move, the fast ones are the same
+    py_wind.uncertain_diffusion = 0.
+    no_diffusion = py_wind.add_uncertainty(deltas.copy(), time_step)
+
+    assert np.all(no_diffusion[slow, :2] == 0.)
+    assert np.all(no_diffusion[fast] == result[fast])
+    assert np.all(result[slow[:-1], 0] != 0.)
+
+
 def _certain_loop(pSpill, py_wind):
     py_wind.prepare_for_model_run()
     py_wind.prepare_for_model_step(pSpill, time_step, model_time)
@@ -241,6 +312,16 @@ def test_serialize_deserialize():
     assert deser == py_wind
 
 
+def test_reuse_cell_locations_serialize():
+    wind = GridWind.from_netCDF(wind_file)
+    wind.reuse_cell_locations = True
+
+    serial = wind.serialize()
+    assert serial['reuse_cell_locations'] is True
+
+    assert GridWind.deserialize(serial).reuse_cell_locations
+
+
 @pytest.mark.skip("these are not working")
 def test_save_load():
     """
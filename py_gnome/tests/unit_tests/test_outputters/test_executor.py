@@ -0,0 +1,200 @@
+"""
+tests for running the outputters on worker threads
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import netCDF4 as nc4
+
+import gnome.scripting as gs
+from gnome.outputters import Outputter
+from gnome.outputters.executor import OutputError
+from gnome.utilities.cache import ElementCache, StepView
+
+import pytest
+
+
+class RecordingOutputter(Outputter):
+    """
+    keeps the positions and time of each step it writes -- slowly
+    """
+    def __init__(self, delay=0.0, fail_at=None, **kwargs):
+        super(RecordingOutputter, self).__init__(**kwargs)
+
+        self.delay = delay
+        self.fail_at = fail_at
+
+    def prepare_for_model_run(self, *args, **kwargs):
+        super(RecordingOutputter, self).prepare_for_model_run(*args, **kwargs)
+
+        self.steps = []
+        self.finished = False
+
+    def write_output(self, step_num, islast_step=False):
+        super(RecordingOutputter, self).write_output(step_num, islast_step)
+
+        if self.on is False or not self._write_step:
+            return None
+
+        if step_num == self.fail_at:
+            raise ValueError('failed at step {}'.format(step_num))
+
+        time.sleep(self.delay)
+
+        sc = self.cache.load_timestep(step_num).items()[0]
+        self.steps.append((step_num, sc.current_time_stamp,
+                           np.array(sc['positions'])))
+
+        return {'step_num': step_num}
+
+    def post_model_run(self):
+        self.finished = True
+
+
+def make_model(parallel_output, outputters):
+    model = gs.Model(start_time=datetime(2020, 1, 1),
+                     time_step=timedelta(minutes=15),
+                     duration=timedelta(hours=3),
+                     parallel_output=parallel_output)
+    model.movers += gs.RandomMover()
+    model.spills += gs.point_line_spill(num_elements=100,
+                                        start_position=(-88.0, 28.0, 0.0),
+                                        release_time=model.start_time,
+                                        end_release_time=(model.start_time +
+                                                          timedelta(hours=1)))
+    model.outputters += outputters
+
+    return model
+
+
+def test_same_as_serial():
+    serial = RecordingOutputter()
+    make_model(False, [serial]).full_run()
+
+    fast = RecordingOutputter(output_timestep=timedelta(minutes=30))
+    slow = RecordingOutputter(delay=0.01)
+    make_model(True, [fast, slow]).full_run()
+
+    assert slow.finished and fast.finished
+    assert len(slow.steps) == len(serial.steps) == 13
+    assert len(fast.steps) == 7
+
+    for (step, ts, pos), (s_step, s_ts, s_pos) in zip(slow.steps,
+                                                       serial.steps):
+        assert step == s_step
+        assert ts == s_ts
+        assert np.all(pos == s_pos)
+
+
+def test_not_in_output_info():
+    outputter = RecordingOutputter()
+    output = make_model(True, [outputter]).full_run()
+
+    assert 'RecordingOutputter' not in output[0]
+
+
+def test_model_thread_outputter():
+    outputter = RecordingOutputter()
+    outputter._parallel_output = False
+    output = make_model(True, [outputter]).full_run()
+
+    assert output[0]['RecordingOutputter'] == {'step_num': 0}
+
+
+def test_failure():
+    outputter = RecordingOutputter(fail_at=3)
+    model = make_model(True, [outputter])
+
+    with pytest.raises(OutputError):
+        model.full_run()
+
+    assert not outputter.finished
+
+    # the next run starts clean
+    outputter.fail_at = None
+    model.full_run()
+    assert outputter.finished
+
+
+def write_current(filename):
+    """
+    a small netCDF file of a current on a regular grid
+    """
+    with nc4.Dataset(filename, 'w') as ds:
+        ds.createDimension('time', 5)
+        ds.createDimension('lat', 11)
+        ds.createDimension('lon', 11)
+
+        time = ds.createVariable('time', 'f8', ('time',))
+        time.units = 'hours since 2020-01-01 00:00:00'
+        time[:] = np.arange(5)
+
+        lat = ds.createVariable('lat', 'f8', ('lat',))
+        lat.units = 'degrees_north'
+        lat[:] = np.linspace(27.5, 28.5, 11)
+
+        lon = ds.createVariable('lon', 'f8', ('lon',))
+        lon.units = 'degrees_east'
+        lon[:] = np.linspace(-88.5, -87.5, 11)
+
+        for name, standard_name, value in (
+                ('u', 'eastward_sea_water_velocity', 0.5),
+                ('v', 'northward_sea_water_velocity', 0.2)):
+            var = ds.createVariable(name, 'f8', ('time', 'lat', 'lon'))
+            var.units = 'm/s'
+            var.standard_name = standard_name
+            var[:] = value * (1 + np.arange(5))[:, None, None]
+
+
+def test_netcdf_current_and_output(tmpdir):
+    """
+    the NetCDFOutput runs on the model thread -- the netCDF library is not
+    thread safe, and the model reads the current from a netCDF file
+    """
+    current_file = str(tmpdir.join('current.nc'))
+    write_current(current_file)
+
+    runs = []
+    for parallel_output in (False, True):
+        output_file = str(tmpdir.join('out_{}.nc'.format(parallel_output)))
+        netcdf_output = gs.NetCDFOutput(output_file, which_data='standard')
+        recording = RecordingOutputter()
+
+        model = make_model(parallel_output, [netcdf_output, recording])
+        model.movers += gs.CurrentMover(
+            gs.GridCurrent.from_netCDF(current_file, varnames=['u', 'v']))
+        model.full_run()
+
+        assert not netcdf_output._parallel_output
+        assert recording.finished
+
+        with nc4.Dataset(output_file) as ds:
+            runs.append((ds['time'][:], ds['longitude'][:],
+                         ds['latitude'][:]))
+
+    (time, lon, lat), (p_time, p_lon, p_lat) = runs
+
+    assert len(p_time) == 13
+    assert np.all(p_time == time)
+    assert np.all(p_lon == lon)
+    assert np.all(p_lat == lat)
+
+
+def test_step_view():
+    cache = ElementCache(enabled=False)
+    cache.recent = {4: [{'positions': np.zeros((3, 3))}, None]}
+
+    view = StepView(cache, 4)
+
+    # the outputters can add to it, without changing the cache
+    view.recent[4][0]['surface_concentration'] = np.ones(3)
+    assert 'surface_concentration' not in cache.recent[4][0]
+
+    # the model goes on to the next step
+    cache.recent = {5: [{'positions': np.ones((3, 3))}, None]}
+
+    sc = view.load_timestep(4).items()[0]
+    assert np.all(sc['positions'] == 0)
+    assert np.all(sc['surface_concentration'] == 1)
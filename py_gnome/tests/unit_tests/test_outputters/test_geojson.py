@@ -8,6 +8,7 @@ tests for geojson outputter
 # from builtins import *
 
 import os
+import json
 from glob import glob
 from datetime import timedelta
 
@@ -122,6 +123,9 @@ def test_geojson_multipoint_output(model):
     model.rewind()
     round_to = model.outputters[0].round_to
     for step in model:
+        # it is sent to the web client as JSON
+        json.dumps(step['TrajectoryGeoJsonOutput'])
+
         uncertain_fc = step['TrajectoryGeoJsonOutput']['uncertain']['features']
         certain_fc = step['TrajectoryGeoJsonOutput']['certain']['features']
         fc = uncertain_fc + certain_fc
@@ -147,3 +151,55 @@ def test_geojson_multipoint_output(model):
                         atol=10 ** -round_to)
 
     model.outputters[-1].output_dir = odir
+
+
+def test_geojson_multipoint_feature(model):
+    'one MultiPoint feature per spill container'
+    outputter = model.outputters[-1]
+    odir = outputter.output_dir
+    outputter.output_dir = None
+    outputter.multipoint = True
+    model.rewind()
+
+    for step in model:
+        output = step['TrajectoryGeoJsonOutput']
+        assert json.loads(json.dumps(output)) == output
+
+        for sc_type, uncertain in (('certain', False), ('uncertain', True)):
+            features = output[sc_type]['features']
+            assert len(features) == 1
+
+            positions = model.spills.LE('positions', uncertain)
+            coords = features[0]['geometry']['coordinates']
+            props = features[0]['properties']
+
+            assert features[0]['geometry']['type'] == 'MultiPoint'
+            assert len(coords) == len(positions)
+            assert np.allclose(coords, positions[:, :2],
+                               atol=10 ** -outputter.round_to)
+            assert props['status_code'] == model.spills.LE('status_codes',
+                                                           uncertain).tolist()
+
+    outputter.output_dir = odir
+    outputter.multipoint = False
+
+
+def test_geojson_to_file(model):
+    'written to file, the JSON is not returned as well'
+    outputter = model.outputters[-1]
+    outputter.binary_sidecar = True
+    model.rewind()
+
+    for step in model:
+        output = step['TrajectoryGeoJsonOutput']
+        assert 'certain' not in output
+
+        with open(output['output_filename']) as infile:
+            assert json.load(infile)['type'] == 'FeatureCollection'
+
+        sidecar = np.load(os.path.splitext(output['output_filename'])[0] +
+                          '.npz')
+        assert np.all(sidecar['forecast_longitude'] ==
+                      model.spills.LE('positions')[:, 0])
+
+    outputter.binary_sidecar = False
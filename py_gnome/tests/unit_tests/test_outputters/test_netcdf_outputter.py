@@ -303,6 +303,91 @@ def test_write_output_standard(model):
         uncertain = True
 
 
+@pytest.mark.parametrize("output_buffer_steps", (1, 2, 100))
+def test_output_buffer_steps(model, output_buffer_steps):
+    """
+    the output should be the same however many steps are buffered
+    """
+    o_put = [outputter for outputter in model.outputters
+             if isinstance(outputter, NetCDFOutput)][0]
+    o_put.output_buffer_steps = output_buffer_steps
+
+    model.rewind()
+    _run_model(model)
+
+    assert not o_put._datasets
+
+    with nc.Dataset(o_put.filename) as data:
+        dv = data.variables
+
+        assert len(dv['time']) == model.num_time_steps
+        idx = np.insert(np.cumsum(dv['particle_count'][:]), 0, 0)
+
+        for step in range(model.num_time_steps):
+            scp = model._cache.load_timestep(step)
+
+            assert np.all(scp.LE('id')[:] ==
+                          dv['id'][idx[step]:idx[step + 1]])
+            assert np.all(scp.LE('mass')[:] ==
+                          dv['mass'][idx[step]:idx[step + 1]])
+
+        mass_balance = data.groups['mass_balance'].variables
+        assert len(mass_balance['evaporated']) == model.num_time_steps
+
+
+def test_start_idx(model):
+    """
+    where the next step starts in the file -- including the buffered steps
+    """
+    o_put = [outputter for outputter in model.outputters
+             if isinstance(outputter, NetCDFOutput)][0]
+    o_put.output_buffer_steps = 2
+    o_put.output_timestep = None
+
+    model.rewind()
+    assert o_put._start_idx == 0
+
+    num_elements = 0
+    for _step in range(model.num_time_steps - 1):
+        model.step()
+        num_elements += len(model.spills.items()[0])
+
+        assert o_put._start_idx == num_elements
+
+    model.step()
+
+    # the files are closed
+    assert o_put._start_idx == 0
+
+
+def test_chunksize(model):
+    """
+    the chunk size is set from the number of elements, unless it is set
+    """
+    o_put = [outputter for outputter in model.outputters
+             if isinstance(outputter, NetCDFOutput)][0]
+    o_put.output_buffer_steps = 1000
+
+    model.rewind()
+    model.step()
+
+    num_elements = sum(spill.num_elements for spill in model.spills)
+    chunksize = max(min(num_elements * 1000, NetCDFOutput.max_chunksize),
+                    NetCDFOutput.default_chunksize)
+
+    with nc.Dataset(o_put.filename) as data:
+        assert data.variables['id'].chunking() == [chunksize]
+
+    model.rewind()
+    o_put.chunksize = 2048
+    model.step()
+
+    with nc.Dataset(o_put.filename) as data:
+        assert data.variables['id'].chunking() == [2048]
+
+    model.rewind()
+
+
 @pytest.mark.slow
 def test_write_output_all_data(model):
     """
@@ -513,6 +598,67 @@ def test_read_standard_arrays(model, output_ts_factor, use_time):
         uncertain = True
 
 
+def test_read_data_steps(model):
+    """
+    reading many steps at once should give the same data as reading them
+    one at a time
+    """
+    model.rewind()
+    o_put = [outputter for outputter in model.outputters
+             if isinstance(outputter, NetCDFOutput)][0]
+    _run_model(model)
+
+    file_ = o_put.filename
+    num_steps = model.num_time_steps
+
+    # out of order, with a gap and a negative index
+    indices = [3, 0, 1, -1]
+    steps = NetCDFOutput.read_data_steps(file_, indices=indices)
+
+    assert len(steps) == len(indices)
+    for idx, (nc_data, weathering_data) in zip(indices, steps):
+        (expected, expected_wd) = NetCDFOutput.read_data(file_, index=idx)
+
+        assert set(nc_data) == set(expected)
+        for key in expected:
+            assert np.all(nc_data[key] == expected[key])
+        assert weathering_data == expected_wd
+
+    # time window
+    start_time = model.start_time + timedelta(seconds=model.time_step)
+    end_time = model.start_time + timedelta(seconds=3 * model.time_step)
+    steps = NetCDFOutput.read_data_steps(file_,
+                                         start_time=start_time,
+                                         end_time=end_time)
+
+    # conversion from floats to datetime can be off by microseconds
+    assert ([d['current_time_stamp'].item().replace(microsecond=0)
+             for d, _wd in steps] ==
+            [start_time + timedelta(seconds=model.time_step * i)
+             for i in range(3)])
+
+    assert len(NetCDFOutput.read_data_steps(file_)) == num_steps
+
+
+def test_step_offsets(model):
+    """
+    the particle_start_index in the file matches the particle counts
+    """
+    model.rewind()
+    o_put = [outputter for outputter in model.outputters
+             if isinstance(outputter, NetCDFOutput)][0]
+    o_put.output_buffer_steps = 2
+    _run_model(model)
+
+    with nc.Dataset(o_put.filename) as data:
+        counts = data.variables['particle_count'][:]
+        offsets = NetCDFOutput._step_offsets(data)
+
+        assert np.all(offsets == np.insert(np.cumsum(counts), 0, 0))
+        assert np.all(data.variables['particle_start_index'][:] ==
+                      offsets[:-1])
+
+
 @pytest.mark.slow
 def test_read_all_arrays(model):
     """
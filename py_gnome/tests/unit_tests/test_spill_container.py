@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+"""
+tests for the SpillContainer data array management
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from gnome.basic_types import oil_status, fate
+from gnome.ops import non_weathering_array_types
+from gnome.spills.spill import point_line_spill
+from gnome.spill_container import SpillContainer
+
+
+rel_time = datetime(2014, 1, 1, 0, 0)
+time_step = 900
+
+
+def continuous_sc(num_elements=1000, hours=10, arr_types=None):
+    sp = point_line_spill(num_elements,
+                          (0.0, 0.0, 0.0),
+                          rel_time,
+                          end_release_time=rel_time + timedelta(hours=hours),
+                          amount=100,
+                          units='kg')
+    if arr_types is None:
+        arr_types = {}
+    arr_types.update(sp.all_array_types)
+
+    sc = SpillContainer()
+    sc.spills += sp
+    sc.prepare_for_model_run(arr_types, time_step)
+
+    return sc
+
+
+class TestDataArrayBuffers:
+
+    def test_append_is_view_into_buffer(self):
+        sc = continuous_sc()
+        sc.release_elements(rel_time, rel_time + timedelta(seconds=time_step))
+
+        assert len(sc) > 0
+        for name in sc.array_types:
+            assert sc[name].base is sc._array_buffers[name]
+            assert sc[name].flags['C_CONTIGUOUS']
+
+    def test_buffer_not_reallocated_every_release(self):
+        sc = continuous_sc(num_elements=1000)
+        buffers = set()
+
+        model_time = rel_time
+        for _ix in range(40):
+            sc.release_elements(model_time,
+                                model_time + timedelta(seconds=time_step))
+            buffers.add(id(sc._array_buffers['positions']))
+            model_time += timedelta(seconds=time_step)
+
+        assert len(sc) == 1000
+        # capacity grows geometrically from _min_capacity
+        assert len(buffers) <= 4
+        assert len(sc._array_buffers['positions']) >= len(sc)
+
+    def test_append_preserves_data(self):
+        sc = continuous_sc()
+        sc.release_elements(rel_time, rel_time + timedelta(hours=3))
+
+        num = len(sc)
+        sc['positions'][:] = np.arange(num * 3).reshape(-1, 3)
+        expected = sc['positions'].copy()
+
+        sc.release_elements(rel_time + timedelta(hours=3),
+                            rel_time + timedelta(hours=10))
+
+        assert len(sc) > num
+        assert np.all(sc['positions'][:num] == expected)
+        assert np.all(sc['id'] == np.arange(len(sc)))
+
+    def test_replaced_array_is_copied_into_buffer(self):
+        sc = continuous_sc()
+        sc.release_elements(rel_time, rel_time + timedelta(hours=3))
+
+        num = len(sc)
+        new_mass = np.linspace(1, 2, num)
+        sc['mass'] = new_mass
+        sc.release_elements(rel_time + timedelta(hours=3),
+                            rel_time + timedelta(hours=10))
+
+        assert np.all(sc['mass'][:num] == new_mass)
+        assert sc['mass'].base is sc._array_buffers['mass']
+
+    def test_remove_compacts_in_place(self):
+        sc = continuous_sc()
+        sc.release_elements(rel_time, rel_time + timedelta(hours=10))
+
+        buf = sc._array_buffers['id']
+        ids = sc['id'].copy()
+        sc['status_codes'][::3] = oil_status.to_be_removed
+        sc.model_step_is_done()
+
+        assert np.all(sc['id'] == np.delete(ids, np.s_[::3]))
+        assert sc['id'].base is buf
+        for name in sc.array_types:
+            assert len(sc[name]) == len(sc)
+
+    def test_rewind_clears_buffers(self):
+        sc = continuous_sc()
+        sc.release_elements(rel_time, rel_time + timedelta(hours=10))
+        sc.rewind()
+
+        assert len(sc) == 0
+        assert sc._array_buffers == {}
+
+
+class TestFatePartition:
+
+    def fate_sc(self):
+        sc = continuous_sc(arr_types=dict(non_weathering_array_types))
+        sc.release_elements(rel_time, rel_time + timedelta(hours=10))
+
+        sc['fate_status'][:] = fate.surface_weather
+        sc['fate_status'][1::4] = fate.subsurf_weather
+        sc['fate_status'][2::4] = fate.non_weather
+
+        return sc
+
+    def test_partition_by_fate(self):
+        sc = self.fate_sc()
+        surface_ids = sc['id'][sc['fate_status'] == fate.surface_weather]
+        sc.partition_by_fate()
+
+        key = sc._fate_partition_key()
+        assert np.all(key[:-1] <= key[1:])
+
+        # stable -- order is preserved within each fate
+        assert np.all(sc['id'][sc['fate_status'] == fate.surface_weather] ==
+                      surface_ids)
+        assert np.all(np.sort(sc['id']) == np.arange(len(sc)))
+
+    def test_fate_data_are_views(self):
+        sc = self.fate_sc()
+        sc.partition_by_fate()
+
+        ((_, data),) = sc.itersubstancedata({'mass', 'id'})
+        mask = sc['fate_status'] == fate.surface_weather
+
+        assert len(data['mass']) == np.count_nonzero(mask)
+        assert np.shares_memory(data['mass'], sc['mass'])
+
+        data['mass'][:] = 5.0
+        data['id'] = data['id'] + 10000
+        sc.update_from_fatedataview()
+
+        assert np.all(sc['mass'][mask] == 5.0)
+        assert np.all(sc['mass'][~mask] != 5.0)
+        assert np.all(sc['id'][mask] >= 10000)
+
+    def test_fate_data_copied_if_not_partitioned(self):
+        sc = self.fate_sc()
+
+        ((_, data),) = sc.itersubstancedata({'mass'})
+        mask = sc['fate_status'] == fate.surface_weather
+
+        assert not np.shares_memory(data['mass'], sc['mass'])
+
+        data['mass'][:] = 5.0
+        sc.update_from_fatedataview()
+
+        assert np.all(sc['mass'][mask] == 5.0)
+        assert np.all(sc['mass'][~mask] != 5.0)
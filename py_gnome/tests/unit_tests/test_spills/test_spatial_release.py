@@ -74,6 +74,33 @@ class TestPolygonRelease:
 
         assert all([a == b for a, b in zip(sr.thicknesses, [0.0005, 0.0001])])
 
+    def test_initialize_LEs_split(self):
+        """
+        the elements get positions from the random streams, keyed on their
+        ids -- the same whatever elements they are released with
+        """
+        sr = PolygonRelease(polygons=simplePolys)
+        sr.prepare_for_model_run(900)
+
+        def release(ids):
+            num = len(ids)
+            data = {'id': np.asarray(ids),
+                    'positions': np.zeros((num, 3)),
+                    'mass': np.zeros(num),
+                    'init_mass': np.zeros(num)}
+            sr.initialize_LEs(num, data, None, None)
+
+            return data['positions']
+
+        pos = release(np.arange(1000))
+
+        assert np.all(release(np.arange(500, 1000)) == pos[500:])
+
+        assert np.all(pos[:, 2] == 0)
+        in_polys = [any(p.buffer(1e-9).contains(shapely.geometry.Point(pt))
+                        for p in simplePolys) for pt in pos[:, :2]]
+        assert all(in_polys)
+
     def test_serialize(self):
         sr = PolygonRelease(filename=sample_nesdis_shapefile)
         ser = sr.serialize()
@@ -374,6 +374,188 @@ def test_rewind():
     c.save_timestep(0, scp)
 
 
+@pytest.mark.parametrize("async_write", (True, False))
+def test_write_options(async_write):
+    """
+    the cache should read back the same data however it is written
+    """
+    c = cache.ElementCache(async_write=async_write)
+
+    sc = sample_sc_release(num_elements=10, start_pos=(3.14, 2.72, 1.2))
+    sc.current_time_stamp = dt
+    scp = SpillContainerPairData(sc)
+
+    pos0 = sc['positions'].copy()
+    c.save_timestep(0, scp)
+
+    sc['positions'] += 1.1
+    c.save_timestep(1, scp)
+
+    # the snapshot is not changed by the spill container
+    assert np.array_equal(c.recent[1][0]['positions'], sc['positions'])
+
+    sc['positions'] += 1.1
+    c.flush()
+
+    # step 0 is read from disk
+    sc0 = c.load_timestep(0)
+    assert np.array_equal(sc0._spill_container['positions'], pos0)
+    assert sc0._spill_container.current_time_stamp == dt
+    assert isinstance(sc0._spill_container['positions'], np.memmap)
+
+
+def test_load_some_arrays():
+    c = cache.ElementCache()
+
+    sc = sample_sc_release(num_elements=10, start_pos=(3.14, 2.72, 1.2))
+    sc.current_time_stamp = dt
+    scp = SpillContainerPairData(sc)
+
+    c.save_timestep(0, scp)
+    c.save_timestep(1, scp)
+
+    for step_num in (0, 1):  # from disk and from memory
+        scp0 = c.load_timestep(step_num,
+                               array_names=('positions', 'status_codes'))
+        sc0 = scp0._spill_container
+
+        assert set(sc0.keys()) == {'positions', 'status_codes'}
+        assert np.array_equal(sc0['positions'], sc['positions'])
+        assert sc0.current_time_stamp == dt
+
+    sc0 = c.load_timestep(0, array_names=())._spill_container
+    assert len(sc0) == 0
+    assert sc0.current_time_stamp == dt
+
+
+def test_load_mass_balance():
+    c = cache.ElementCache()
+
+    sc = sample_sc_release(num_elements=10, start_pos=(3.14, 2.72, 1.2))
+    sc.current_time_stamp = dt
+    sc.mass_balance['evaporated'] = 1.5
+    scp = SpillContainerPairData(sc)
+
+    c.save_timestep(0, scp)
+
+    sc.current_time_stamp = dt + tdelta
+    sc.mass_balance['evaporated'] = 2.5
+    c.save_timestep(1, scp)
+
+    mass_balance, time_stamp = c.load_mass_balance(0)
+    assert mass_balance == {'evaporated': 1.5}
+    assert time_stamp == dt
+
+    # a copy
+    mass_balance['evaporated'] = 0.0
+    assert c.load_mass_balance(1) == ({'evaporated': 2.5}, dt + tdelta)
+
+    with pytest.raises(cache.CacheError):
+        c.load_mass_balance(0, uncertain=True)
+
+    with pytest.raises(cache.CacheError):
+        c.load_mass_balance(2)
+
+    c.rewind()
+    with pytest.raises(cache.CacheError):
+        c.load_mass_balance(0)
+
+
+def test_mass_balance_nested():
+    # nested entries (e.g. the ROC systems) are updated in place by the
+    # weatherers -- the cached steps keep their own values
+    c = cache.ElementCache()
+
+    sc = sample_sc_release(num_elements=10, start_pos=(3.14, 2.72, 1.2))
+    sc.current_time_stamp = dt
+    sc.mass_balance['systems'] = {'burn': {'burned': 1.0}}
+    scp = SpillContainerPairData(sc)
+
+    c.save_timestep(0, scp)
+
+    sc.current_time_stamp = dt + tdelta
+    sc.mass_balance['systems']['burn']['burned'] += 2.0
+    c.save_timestep(1, scp)
+
+    mass_balance = c.load_mass_balance(0)[0]
+    assert mass_balance['systems'] == {'burn': {'burned': 1.0}}
+    assert c.load_mass_balance(1)[0]['systems'] == {'burn': {'burned': 3.0}}
+
+    # changing what is loaded doesn't change the cache
+    mass_balance['systems']['burn']['burned'] = 0.0
+    assert c.load_mass_balance(0)[0]['systems'] == {'burn': {'burned': 1.0}}
+
+    # nor does the next step, in the element data
+    sc.mass_balance['systems']['burn']['burned'] += 2.0
+    sc1 = c.load_timestep(1)._spill_container
+    assert sc1.mass_balance['systems'] == {'burn': {'burned': 3.0}}
+
+    c.flush()
+    sc0 = c.load_timestep(0)._spill_container
+    assert sc0.mass_balance['systems'] == {'burn': {'burned': 1.0}}
+
+
+def test_mass_balance_only():
+    c = cache.ElementCache(cache_elements=False)
+
+    sc = sample_sc_release(num_elements=10, start_pos=(3.14, 2.72, 1.2))
+    sc.current_time_stamp = dt
+    sc.mass_balance['evaporated'] = 1.5
+    scp = SpillContainerPairData(sc)
+
+    c.save_timestep(0, scp)
+    c.save_timestep(1, scp)
+    c.flush()
+
+    # nothing written to disk
+    assert not os.path.exists(os.path.join(c._cache_dir, 'certain'))
+
+    assert c.load_mass_balance(0) == ({'evaporated': 1.5}, dt)
+
+    sc1 = c.load_timestep(1)._spill_container
+    assert len(sc1) == 0
+    assert sc1.mass_balance == {'evaporated': 1.5}
+
+
+def test_column_store(tmpdir):
+    store = cache.ColumnStore(str(tmpdir))
+
+    positions = [np.random.random((num, 3)) for num in (0, 5, 10)]
+    for step_num, pos in enumerate(positions):
+        store.append(step_num,
+                     {'positions': pos, 'id': np.arange(len(pos))},
+                     {'current_time_stamp': step_num})
+
+    # one file per array
+    assert sorted(os.listdir(str(tmpdir))) == ['id.dat', 'positions.dat']
+
+    for step_num, pos in enumerate(positions):
+        data = store.load(step_num, ['positions'])
+
+        assert set(data) == {'positions', 'current_time_stamp'}
+        assert np.array_equal(data['positions'], pos)
+        assert data['current_time_stamp'] == step_num
+
+    with pytest.raises(cache.CacheError):
+        store.load(3)
+
+    with pytest.raises(cache.CacheError):
+        store.append(3, {'positions': np.zeros((4, 2))})
+
+
+def test_snapshot_is_read_only():
+    c = cache.ElementCache()
+
+    sc = sample_sc_release(num_elements=10, start_pos=(3.14, 2.72, 1.2))
+    c.save_timestep(0, SpillContainerPairData(sc))
+
+    positions = c.load_timestep(0)._spill_container['positions']
+    assert not np.shares_memory(positions, sc['positions'])
+
+    with pytest.raises(ValueError):
+        positions += 1.0
+
+
 #    assert False
 
 if __name__ == '__main__':
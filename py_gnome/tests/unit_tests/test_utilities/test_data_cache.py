@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+"""
+Tests of the on-disk data cache
+"""
+
+import os
+
+import numpy as np
+
+from gnome.utilities.data_cache import DataCache, file_hash, make_key
+
+
+def test_make_key():
+    assert make_key('thing', 1, [1.0, 2.0]) == make_key('thing', 1, [1.0, 2.0])
+    assert make_key('thing', 1, [1.0, 2.0]) != make_key('thing', 2, [1.0, 2.0])
+    assert make_key('thing', 1) != make_key('other', 1)
+
+
+def test_file_hash(tmpdir):
+    filename = os.path.join(str(tmpdir), 'data.txt')
+    with open(filename, 'w') as outfile:
+        outfile.write('some data')
+    first = file_hash(filename)
+
+    assert file_hash(filename) == first
+
+    with open(filename, 'a') as outfile:
+        outfile.write('some more data')
+
+    assert file_hash(filename) != first
+
+
+class TestDataCache:
+
+    arrays = {'raster': np.arange(12, dtype=np.uint8).reshape(4, 3),
+              'dist': np.linspace(0, 1, 5)}
+
+    def test_round_trip(self, tmpdir):
+        cache = DataCache(str(tmpdir))
+        key = make_key('test', 1)
+
+        cache.save(key, self.arrays, {'size': [4, 3]})
+        arrays, meta = cache.load(key)
+
+        assert meta == {'size': [4, 3]}
+        assert set(arrays) == set(self.arrays)
+        for name, arr in self.arrays.items():
+            assert isinstance(arrays[name], np.memmap)
+            assert arrays[name].dtype == arr.dtype
+            assert np.array_equal(arrays[name], arr)
+
+    def test_copy_on_write(self, tmpdir):
+        cache = DataCache(str(tmpdir))
+        key = make_key('test', 1)
+        cache.save(key, self.arrays)
+
+        arrays, _meta = cache.load(key)
+        arrays['raster'][:] = 100
+
+        arrays, _meta = cache.load(key)
+        assert np.array_equal(arrays['raster'], self.arrays['raster'])
+
+    def test_not_there(self, tmpdir):
+        cache = DataCache(str(tmpdir))
+
+        assert cache.load(make_key('test', 1)) is None
+
+    def test_incomplete(self, tmpdir):
+        cache = DataCache(str(tmpdir))
+        key = make_key('test', 1)
+        cache.save(key, self.arrays)
+        os.remove(os.path.join(str(tmpdir), key, 'dist.npy'))
+
+        assert cache.load(key) is None
+
+    def test_already_saved(self, tmpdir):
+        cache = DataCache(str(tmpdir))
+        key = make_key('test', 1)
+        cache.save(key, self.arrays)
+        cache.save(key, {'raster': np.zeros((2, 2))})
+
+        arrays, _meta = cache.load(key)
+        assert np.array_equal(arrays['raster'], self.arrays['raster'])
+        # no temp dirs left behind
+        assert os.listdir(str(tmpdir)) == [key]
+
+    def test_disabled(self):
+        cache = DataCache()
+        key = make_key('test', 1)
+        cache.save(key, self.arrays)
+
+        assert not cache.enabled
+        assert cache.load(key) is None
@@ -4,9 +4,14 @@ tests for the distributions used for droplet size
 NOTE: not the least bit complete
 """
 
+import numpy as np
 import pytest
 
-from gnome.utilities.distributions import get_distribution_by_name
+from gnome.utilities.distributions import (get_distribution_by_name,
+                                           UniformDistribution,
+                                           NormalDistribution,
+                                           LogNormalDistribution,
+                                           WeibullDistribution)
 
 
 @pytest.mark.parametrize('name', ['UniformDistribution',
@@ -19,3 +24,38 @@ def test_get_dist_by_name(name):
 
     assert hasattr(dist, 'set_values')
 
+
+
+@pytest.mark.parametrize('dist', [UniformDistribution(low=1.0, high=3.0),
+                                  NormalDistribution(mean=2.0, sigma=0.5),
+                                  LogNormalDistribution(mean=0.0, sigma=0.5),
+                                  WeibullDistribution(alpha=1.8,
+                                                      lambda_=0.000248),
+                                  WeibullDistribution(alpha=1.8,
+                                                      lambda_=0.000248,
+                                                      min_=0.0001,
+                                                      max_=0.0004),
+                                  ])
+def test_set_values_element_ids(dist):
+    """
+    with element ids, the values don't depend on how the elements are split
+    """
+    ids = np.arange(10000)
+
+    values = np.zeros(len(ids))
+    dist.set_values(values, element_ids=ids, key=('test',))
+    assert len(np.unique(values)) == len(values)
+
+    for i in range(3):
+        split = np.zeros(len(ids[i::3]))
+        dist.set_values(split, element_ids=ids[i::3], key=('test',))
+        assert np.all(split == values[i::3])
+
+    # the same distribution as drawn without the ids
+    drawn = np.zeros(len(ids))
+    dist.set_values(drawn)
+    assert np.isclose(np.median(values), np.median(drawn), rtol=0.05)
+
+    if getattr(dist, 'min_', None) is not None:
+        assert values.min() >= dist.min_
+        assert values.max() <= dist.max_
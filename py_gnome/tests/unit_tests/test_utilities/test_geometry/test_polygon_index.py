@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""
+tests of the PolygonIndex -- it should always agree with points_in_poly
+"""
+
+import numpy as np
+import pytest
+
+from gnome.utilities.geometry import PolygonIndex, points_in_poly
+
+
+angles = np.linspace(0, 2 * np.pi, 41)[:-1]
+radii = 1 + 0.5 * (np.arange(40) % 2)
+star = np.c_[np.cos(angles) * radii, np.sin(angles) * radii]
+
+polygons = {'world': ((-360, -90), (-360, 90), (360, 90), (360, -90)),
+            'closed_rect': ((0, 0), (5, 0), (5, 5), (0, 5), (0, 0)),
+            'concave': ((-40.0, 50.0), (-40.0, 58.0), (-30.0, 58.0),
+                        (-35.0, 53.0), (-30.0, 50.0)),
+            'triangle': ((0, 0), (1, 0), (0, 1)),
+            'star': star,
+            'flat': ((0, 0), (1, 0), (2, 0)),
+            }
+
+
+def test_points():
+    """
+    random points, the vertices, and points on the edges
+    """
+    rng = np.random.default_rng(10)
+
+    for name, poly in polygons.items():
+        poly = np.array(poly, dtype=np.float64)
+        low = poly.min(axis=0) - 1
+        high = poly.max(axis=0) + 1
+
+        points = np.zeros((10000, 3))
+        points[:, :2] = rng.uniform(low, high, (10000, 2))
+        points[:len(poly), :2] = poly
+        points[len(poly):2 * len(poly), :2] = (poly +
+                                               np.roll(poly, 1, axis=0)) / 2
+        points[-1] = np.nan
+
+        assert np.array_equal(PolygonIndex(poly).contains(points),
+                              points_in_poly(poly, points)), name
+
+
+@pytest.mark.parametrize(('name', 'is_rectangle', 'has_grid'),
+                         [('world', True, False),
+                          ('closed_rect', True, False),
+                          ('concave', False, False),
+                          ('star', False, True),
+                          ('flat', False, False),
+                          ])
+def test_classify(name, is_rectangle, has_grid):
+    index = PolygonIndex(polygons[name])
+
+    assert index.is_rectangle is is_rectangle
+    assert (index.grid is not None) is has_grid
+
+
+def test_grid():
+    index = PolygonIndex(star, grid_size=16)
+
+    assert index.grid.shape == (16, 16)
+    assert index.grid[8, 8] == index.inside
+    assert index.grid[0, 0] == index.outside
+    assert np.any(index.grid == index.boundary)
+
+
+def test_scalar():
+    index = PolygonIndex(polygons['concave'])
+
+    assert index.contains((-35, 55, 0.)) is True
+    assert index.contains((-45, 55, 0.)) is False
@@ -0,0 +1,97 @@
+"""
+tests for the hulls and contours around the elements
+"""
+
+import numpy as np
+
+from shapely.geometry import Polygon
+
+from gnome.utilities.hull import (calculate_hull,
+                                  calculate_contours,
+                                  decimate_points)
+
+
+def get_sc(num=2000):
+    rng = np.random.default_rng(0)
+    positions = np.column_stack((rng.normal(size=num),
+                                 rng.normal(size=num),
+                                 np.zeros(num)))
+
+    return {'positions': positions,
+            'spill_num': np.arange(num) % 2,
+            'mass': np.linspace(0, 1, num),
+            'status_codes': np.full(num, 2)}
+
+
+def test_hull():
+    hull = calculate_hull(get_sc())
+
+    assert len(hull['hulls']) == 1
+    assert isinstance(hull['hulls'][0], Polygon)
+    assert hull['spill_num'] == [None]
+
+
+def test_hull_by_spill():
+    hull = calculate_hull(get_sc(), separate_by_spill=True,
+                          union_results=False)
+
+    assert hull['spill_num'] == [0, 1]
+    assert len(hull['hulls']) == 2
+
+
+def test_hull_no_elements():
+    sc = {'positions': np.zeros((0, 3)), 'spill_num': np.zeros(0)}
+
+    assert calculate_hull(sc) == {'hulls': [], 'spill_num': []}
+
+
+def test_decimate_points():
+    positions = get_sc()['positions']
+
+    assert decimate_points(positions, None) is positions
+    assert decimate_points(positions, 5000) is positions
+
+    fewer = decimate_points(positions, 100)
+    assert 0 < len(fewer) <= 100
+
+    # the extremes are kept
+    assert fewer[:, 0].max() == positions[:, 0].max()
+    assert fewer[:, 1].min() == positions[:, 1].min()
+
+
+def test_decimated_hull():
+    sc = get_sc()
+    full = calculate_hull(sc)['hulls'][0]
+    decimated = calculate_hull(sc, max_points=400)['hulls'][0]
+
+    assert abs(decimated.area - full.area) < 0.2 * full.area
+
+
+def test_contours():
+    cutoffs = [{'cutoff': c, 'cutoff_id': i, 'color': 'c', 'label': str(i)}
+               for i, c in enumerate((0.25, 0.5, 1.0))]
+    cutoff_struct = {0: {'param': 'mass', 'cutoffs': cutoffs},
+                     3: {'param': 'mass', 'cutoffs': cutoffs}}
+
+    contours = calculate_contours(get_sc(), cutoff_struct=cutoff_struct)
+
+    # nothing for the spill that isn't there
+    assert [c['spill_num'] for c in contours] == [0, 0, 0]
+    assert [c['cutoff_id'] for c in contours] == [0, 1, 2]
+
+    assert calculate_contours(get_sc(), cutoff_struct=None) == []
+
+
+def test_one_cutoff():
+    """
+    with one cutoff, only the values up to it are in the contour
+    """
+    sc = get_sc()
+    sc['positions'][:, 0] = sc['mass']
+
+    cutoffs = [{'cutoff': 0.25, 'cutoff_id': 0, 'color': 'c', 'label': '0'}]
+    contours = calculate_contours(sc, cutoff_struct={0: {'param': 'mass',
+                                                         'cutoffs': cutoffs}})
+
+    assert len(contours) == 1
+    assert contours[0]['contour'].bounds[2] <= 0.25
@@ -0,0 +1,80 @@
+"""
+tests for the fast JSON encoding of arrays
+"""
+
+import json
+
+import numpy as np
+
+from gnome.utilities import json_encoding
+
+import pytest
+
+
+@pytest.mark.parametrize('decimals', [0, 1, 4, 5])
+def test_encode_array_rounded(decimals):
+    values = np.concatenate((np.random.random(100) * 360 - 180,
+                             [0.0, -0.0, -1e-9, 100.0, 99.99999, 1e6, -0.5]))
+
+    text = json_encoding.encode_array(values, decimals)
+
+    # the same as the json module writes the rounded floats
+    assert json.loads(text) == values.round(decimals).tolist()
+    assert all(isinstance(v, float) for v in json.loads(text))
+
+
+def test_encode_array_types():
+    assert (json_encoding.encode_array(np.array([1.5, -2.25, 0.0]), 4) ==
+            '[1.5, -2.25, 0.0]')
+    assert (json_encoding.encode_array(np.array([1.5, np.nan, np.inf])) ==
+            '[1.5, NaN, Infinity]')
+    assert json_encoding.encode_array(np.array([1, -2, 3])) == '[1, -2, 3]'
+    assert (json_encoding.encode_array(np.array([True, False])) ==
+            '[true, false]')
+    assert json_encoding.encode_array(np.zeros(0), 2) == '[]'
+
+    with pytest.raises(TypeError):
+        json_encoding.format_values(np.array(['a', 'b']))
+
+
+def test_encode_2d():
+    assert (json_encoding.encode_array(np.array([[1.5, 2.0],
+                                                 [3.25, -4.0]]), 2) ==
+            '[[1.5, 2.0], [3.25, -4.0]]')
+    assert json_encoding.encode_array(np.zeros((0, 2)), 2) == '[]'
+
+
+def test_format_records():
+    ids = json_encoding.format_values(np.arange(3))
+    lon = json_encoding.format_values(np.array([1.5, 2.0, -3.25]), 4)
+
+    records = json_encoding.format_records(b'{"id": ', ids,
+                                           b', "lon": ', lon, b'}')
+    text = '[' + json_encoding.join_values(records).decode('ascii') + ']'
+
+    assert json.loads(text) == [{'id': 0, 'lon': 1.5},
+                                {'id': 1, 'lon': 2.0},
+                                {'id': 2, 'lon': -3.25}]
+
+
+def test_encode_document():
+    doc = {'a': np.arange(3),
+           'b': {'c': np.array([0.123456, 1.0])},
+           'n': 3,
+           's': 'x',
+           'l': [np.float64(1.5), None, (1, 2)]}
+
+    text = json_encoding.encode(doc, decimals={'c': 2})
+
+    assert json.loads(text) == {'a': [0, 1, 2],
+                                'b': {'c': [0.12, 1.0]},
+                                'n': 3,
+                                's': 'x',
+                                'l': [1.5, None, [1, 2]]}
+
+
+def test_write_sidecar(tmpdir):
+    filename = str(tmpdir.join('data.npz'))
+    json_encoding.write_sidecar(filename, {'mass': np.arange(4.0)})
+
+    assert np.all(np.load(filename)['mass'] == np.arange(4.0))
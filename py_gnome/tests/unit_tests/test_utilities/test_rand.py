@@ -11,7 +11,8 @@ Test gnome.utilities.rand.py
 import numpy as np
 import random
 
-from gnome.utilities.rand import random_with_persistance, seed
+from gnome.utilities.rand import (random_with_persistance, seed,
+                                  RandomStreams, streams)
 from gnome.cy_gnome.cy_helpers import rand
 
 import pytest
@@ -95,3 +96,91 @@ def test_set_seed():
     assert xi == xf
     assert np.all(ai == af)
     assert ci == cf
+    assert np.all(streams.element_uniform([1, 2, 3], 'test') ==
+                  RandomStreams(1).element_uniform([1, 2, 3], 'test'))
+
+
+def test_streams_reproducible():
+    """
+    the same seed and key give the same numbers, other keys and seeds don't
+    """
+    u = RandomStreams(42).element_uniform(np.arange(1000), 'test', 3)
+
+    assert np.all(RandomStreams(42).element_uniform(np.arange(1000),
+                                                    'test', 3) == u)
+    assert not np.any(RandomStreams(42).element_uniform(np.arange(1000),
+                                                        'test', 4) == u)
+    assert not np.any(RandomStreams(43).element_uniform(np.arange(1000),
+                                                        'test', 3) == u)
+
+    g1 = RandomStreams(42).generator('mover', 1)
+    g2 = RandomStreams(42).generator('mover', 1)
+    assert np.all(g1.random(10) == g2.random(10))
+
+
+def test_streams_split_elements():
+    """
+    the numbers for an element don't depend on what other elements are
+    drawn with it, or their order -- so the elements can be split up
+    """
+    rs = RandomStreams(42)
+    ids = np.arange(1000)
+    u = rs.element_uniform(ids, 'test', size=4)
+
+    parts = [rs.element_uniform(ids[i::3], 'test', size=4) for i in range(3)]
+    for i, part in enumerate(parts):
+        assert np.all(part == u[i::3])
+
+    assert np.all(rs.element_uniform(ids[::-1], 'test', size=4) == u[::-1])
+
+
+def test_random_with_persistance_element_ids():
+    """
+    with element ids, the values are from the streams -- the same for an
+    element whatever it's drawn with
+    """
+    ids = np.arange(100)
+    low = np.full(100, 0.01)
+    high = np.full(100, 0.04)
+
+    values = random_with_persistance(low, high, element_ids=ids,
+                                     key=('test', 1))
+
+    assert np.all((values >= 0.01) & (values < 0.04))
+    assert np.all(random_with_persistance(low[::2], high[::2],
+                                          element_ids=ids[::2],
+                                          key=('test', 1)) == values[::2])
+
+    # persistence: only the ones that change are drawn
+    persist = np.where(ids % 2 == 0, 900, -1)
+    array = np.zeros(100)
+    random_with_persistance(low, high, array, persist, 900,
+                            element_ids=ids, key=('test', 1))
+
+    assert np.all(array[::2] == values[::2])
+    assert np.all(array[1::2] == 0)
+
+
+def test_streams_distributions():
+    rs = RandomStreams(42)
+    ids = np.arange(100000)
+
+    u = rs.element_uniform(ids, 'test')
+    assert u.shape == (100000,)
+    assert np.all((u >= 0.0) & (u < 1.0))
+    assert np.isclose(u.mean(), 0.5, atol=0.01)
+
+    n = rs.element_normal(ids, 'test', size=2)
+    assert n.shape == (100000, 2)
+    assert np.allclose(n.mean(axis=0), 0.0, atol=0.02)
+    assert np.allclose(n.std(axis=0), 1.0, atol=0.02)
+
+
+def test_c_seed():
+    rs = RandomStreams(42)
+    c_seed = rs.c_seed('RandomMover.get_move', 'mover', 0)
+
+    assert c_seed == RandomStreams(42).c_seed('RandomMover.get_move',
+                                              'mover', 0)
+    assert c_seed != rs.c_seed('RandomMover.get_move', 'mover', 1)
+    assert 0 <= c_seed < 2 ** 31
@@ -0,0 +1,126 @@
+"""
+tests for the surface concentration code
+
+The grid algorithm is checked against the KDE one.
+"""
+
+import numpy as np
+
+from gnome.utilities.surface_concentration import (compute_surface_concentration,
+                                                   surface_conc_kde,
+                                                   surface_conc_grid)
+
+import pytest
+
+
+def make_sc(num=2000, spills=1, seed=1):
+    """
+    a dict with the arrays of a spill container: a slick stretched out to
+    the north-east, with a range of ages and masses
+    """
+    rs = np.random.RandomState(seed)
+
+    xy = rs.multivariate_normal((0, 0), ((4.0, 2.5), (2.5, 3.0)), num)
+    positions = np.zeros((num, 3))
+    positions[:, 0] = -88.0 + xy[:, 0] * 0.01
+    positions[:, 1] = 28.0 + xy[:, 1] * 0.01
+
+    return {'positions': positions,
+            'mass': rs.uniform(0.5, 1.5, num),
+            'age': rs.randint(0, 3 * 3600, num).astype(np.float64),
+            'spill_num': np.arange(num) % spills}
+
+
+def compare(sc_kde, sc_grid):
+    """
+    relative differences of the grid concentrations from the KDE ones
+    """
+    kde = sc_kde['surface_concentration']
+    grid = sc_grid['surface_concentration']
+
+    assert np.all(grid >= 0)
+
+    return np.abs(grid - kde) / kde
+
+
+@pytest.mark.parametrize('spills', [1, 3])
+def test_grid_matches_kde(spills):
+    sc_kde = make_sc(spills=spills)
+    sc_grid = make_sc(spills=spills)
+
+    surface_conc_kde(sc_kde)
+    surface_conc_grid(sc_grid)
+
+    diff = compare(sc_kde, sc_grid)
+
+    assert np.median(diff) < 0.01
+    assert np.percentile(diff, 99) < 0.05
+
+
+def test_grid_equal_mass():
+    sc_kde = make_sc()
+    sc_kde['mass'][:] = 2.0
+    sc_grid = make_sc()
+    sc_grid['mass'][:] = 2.0
+
+    surface_conc_kde(sc_kde)
+    surface_conc_grid(sc_grid)
+
+    assert np.median(compare(sc_kde, sc_grid)) < 0.01
+
+
+def test_grid_resolution():
+    # coarser cells are less accurate
+    sc_kde = make_sc()
+    surface_conc_kde(sc_kde)
+
+    errors = []
+    for cells in (1, 4):
+        sc_grid = make_sc()
+        surface_conc_grid(sc_grid, cells_per_bandwidth=cells)
+        errors.append(np.median(compare(sc_kde, sc_grid)))
+
+    assert errors[1] < errors[0]
+
+
+def test_grid_max_cells():
+    sc_kde = make_sc()
+    surface_conc_kde(sc_kde)
+
+    # one far away particle spreads the slick out over many kernel widths
+    sc_grid = make_sc()
+    sc_grid['positions'][0, :2] += 5.0
+    surface_conc_grid(sc_grid, max_cells=64)
+
+    assert np.all(np.isfinite(sc_grid['surface_concentration']))
+
+
+def test_too_few_points():
+    sc = make_sc(num=2)
+    surface_conc_grid(sc)
+
+    assert np.all(sc['surface_concentration'] == 0)
+
+
+def test_all_at_one_place():
+    sc = make_sc(num=10)
+    sc['positions'][:] = (-88.0, 28.0, 0.0)
+    sc['positions'][:3, 0] += (0.001, 0.002, 0.003)
+    sc['positions'][:3, 1] += (0.001, 0.002, 0.003)
+
+    with pytest.warns(UserWarning):
+        surface_conc_grid(sc)
+
+
+@pytest.mark.parametrize('algorithm', ['kde', 'grid'])
+def test_compute_surface_concentration(algorithm):
+    sc = make_sc(num=100)
+    compute_surface_concentration(sc, algorithm)
+
+    assert sc['surface_concentration'].shape == (100,)
+    assert np.all(sc['surface_concentration'] > 0)
+
+
+def test_compute_surface_concentration_bad_algorithm():
+    with pytest.raises(ValueError):
+        compute_surface_concentration(make_sc(num=10), 'fred')